@@ -1,31 +1,51 @@
-import os
 import shutil
 import time
-from datetime import datetime, timedelta
+from datetime import timedelta
+from pathlib import Path
 
+from fermo_gui.config.metrics import MetricsStore
+from fermo_gui.processing.antismash_cache import AntismashCache
+from fermo_gui.processing.blob_store import BlobStore
+from fermo_gui.processing.chunked_upload import ChunkedUpload
+from fermo_gui.processing.job_index import JobIndex
+from fermo_gui.processing.job_registry import JobRegistry
 
-def delete_old_directories(target_dir, age_limit):
-    """Remove directories older than n days
+
+def delete_old_jobs(registry: JobRegistry, target_dir: Path, age_limit: int):
+    """Remove job directories older than n days
+
+    Jobs are selected by their submission time in the job registry.
 
     Arguments:
+        registry: the job registry
         target_dir: the target directory in which dirs should be removed
         age_limit: the age limit of directories in days
     """
-    now = datetime.now()
-    age_limit_delta = timedelta(days=age_limit)
-
-    for dirname in os.listdir(target_dir):
-        dirpath = os.path.join(target_dir, dirname)
-        if os.path.isdir(dirpath) and not dirname.startswith("example"):
-            dir_mod_time = datetime.fromtimestamp(os.path.getmtime(dirpath))
-            if now - dir_mod_time > age_limit_delta:
-                shutil.rmtree(dirpath, ignore_errors=True)
+    for job_id in registry.expired(timedelta(days=age_limit).total_seconds()):
+        shutil.rmtree(target_dir.joinpath(job_id), ignore_errors=True)
+        registry.mark_removed(job_id)
 
 
 def main():
-    """Runs infinitive loop and executes cleanup every 24h"""
+    """Runs infinitive loop and executes cleanup every 24h
+
+    Job dirs without a registry record, e.g. from before the registry or left
+    by an interrupted request, are registered on each run, so they expire too.
+
+    Uploaded files no longer linked from any job dir are removed from the blob
+    store after the job dirs and expired chunked uploads, as are fingerprints of
+    removed jobs. Cached antiSMASH results are evicted beyond the default size,
+    and the metrics snapshots of exited processes are folded into one file.
+    """
+    registry = JobRegistry(path=Path("./fermo_gui/upload/.jobs.sqlite3"))
     while True:
-        delete_old_directories("./fermo_gui/upload", 30)
+        registry.register_existing(Path("./fermo_gui/upload"))
+        delete_old_jobs(registry, Path("./fermo_gui/upload"), 30)
+        ChunkedUpload.collect_garbage(root=Path("./fermo_gui/upload/.chunks"))
+        BlobStore(root=Path("./fermo_gui/upload/.blobs")).collect_garbage()
+        JobIndex(uploads=Path("./fermo_gui/upload"), registry=registry).prune()
+        AntismashCache(root=Path("./fermo_gui/upload/.antismash")).evict()
+        MetricsStore(root=Path("./fermo_gui/upload/.metrics")).prune()
         time.sleep(86400)
 
 
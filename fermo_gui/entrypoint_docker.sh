@@ -1,6 +1,7 @@
 #!/bin/bash
 
 redis-server &
-uv run celery -A make_celery worker --concurrency=8 --loglevel INFO &
+uv run celery -A make_celery worker -Q celery,light --hostname light@%h --concurrency="${LIGHT_WORKERS:-5}" --loglevel INFO &
+uv run celery -A make_celery worker -Q heavy --hostname heavy@%h --concurrency="${HEAVY_WORKERS:-3}" --loglevel INFO &
 uv run python3 ./cleanup_jobs.py &
 uv run gunicorn --worker-class gevent --workers 4 "fermo_gui:create_app()" --bind "0.0.0.0:8001"
@@ -24,6 +24,7 @@ SOFTWARE.
 import contextlib
 import logging
 import os
+import sqlite3
 import sys
 from importlib import metadata
 from pathlib import Path
@@ -32,7 +33,10 @@ import coloredlogs
 from flask import Flask
 from flask_wtf.csrf import CSRFProtect
 
+from fermo_gui.config.compression import configure_compression
 from fermo_gui.config.extensions import configure_celery, mail
+from fermo_gui.config.metrics import configure_metrics
+from fermo_gui.processing.job_registry import JobRegistry
 from fermo_gui.routes import bp
 
 
@@ -52,6 +56,8 @@ def create_app() -> Flask:
 
     mail.init_app(app)
     app = configure_celery(app)
+    app = configure_metrics(app)
+    app = configure_compression(app)
 
     return app
 
@@ -74,6 +80,21 @@ def configure_app(app: Flask) -> Flask:
     app.config["ONLINE"] = False
     app.config["ROOTURL"] = "fermo"
     app.config["MAX_RUN_TIME"] = None
+    app.config["MAX_DASHBOARD_SIZE"] = 500 * 1024 * 1024
+    app.config["DASHBOARD_ENGINE"] = "python"
+    app.config["MAX_NETWORK_NODES"] = 50
+    app.config["COMPRESS_LEVEL"] = 6
+    app.config["COMPRESS_MIN_SIZE"] = 1024
+    app.config["UPLOAD_CHUNK_SIZE"] = 8 * 1024 * 1024
+    app.config["LOG_POLL_WAIT"] = 20
+    app.config["ANTISMASH_URL"] = "https://antismash.secondarymetabolites.org/upload/"
+    app.config["ANTISMASH_WORKERS"] = 4
+    app.config["ANTISMASH_CACHE_SIZE"] = 10 * 1024 * 1024 * 1024
+    app.config["MAX_LIGHT_JOB_COST"] = 3000
+    app.config["JOB_TIME_LIMIT_FACTOR"] = 3.0
+    app.config["MIN_JOB_TIME_LIMIT"] = 600
+    app.config["MAX_JOB_TIME_LIMIT"] = None
+    app.config["METRICS_SAMPLE_RATE"] = 1.0
 
     config_file = Path(__file__).parent.parent.joinpath("instance/config.py")
     if config_file.exists():
@@ -152,11 +173,14 @@ def register_context_processors(app: Flask):
         app: The Flask app instance
     """
 
+    registry = JobRegistry(path=app.config["UPLOAD_FOLDER"].joinpath(".jobs.sqlite3"))
+    with contextlib.suppress(sqlite3.Error):
+        registry.import_counter(Path(__file__).parent.joinpath("job_counter.txt"))
+
     def get_job_count():
         try:
-            with open(Path(__file__).parent.joinpath("job_counter.txt")) as f:
-                return sum(1 for _ in f)
-        except (FileNotFoundError, ValueError):
+            return registry.count_runs()
+        except sqlite3.Error:
             return 0
 
     @app.context_processor
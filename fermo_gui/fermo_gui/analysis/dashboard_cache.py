@@ -0,0 +1,561 @@
+"""Stores prepared dashboard data next to the session file
+
+Copyright (c) 2026-present Mitja Maximilian Zdouc, PhD
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import copy
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Any, ClassVar, Self
+
+from pydantic import BaseModel
+
+from fermo_gui.analysis.dashboard_frame_manager import DashboardFrameManager
+from fermo_gui.analysis.dashboard_manager import DashboardManager
+from fermo_gui.analysis.filter_engine import FilterEngine, FilterSpec
+from fermo_gui.analysis.memo_cache import MemoCache
+from fermo_gui.analysis.network_service import NetworkService
+from fermo_gui.analysis.result_files import ResultFiles
+
+
+class DashboardCache(BaseModel):
+    """Builds, stores and serves the prepared dashboard data of a job
+
+    The output of DashboardManager.provide_data_get is split into parts (overview,
+    network summaries, features, one part per sample) and stored gzip-compressed
+    in a dir next to the session file. This allows the dashboard page to be
+    rendered from the overview only, while the remaining parts are requested on
+    demand. For lookups of single features and subnetworks, the feature table is
+    also stored in blocks of rows and the network index in blocks of
+    subnetworks, so that these stay memoized for large sessions too. A stamp
+    file records size, modification time and hash of the session file the data
+    was built from, and the version of the stored data layout; it is used for
+    invalidation.
+
+    Attributes:
+        data_version: version of the stored data layout, bumped on format changes
+        feature_block: the number of feature table rows per block
+        network_block: the number of nodes and edges per block of subnetworks
+        results: the results dir of the job
+        stream_size: session file size in bytes above which it is read iteratively
+        engine: "python" for DashboardManager, "pandas" for DashboardFrameManager
+        part_memo: decompressed parts, bounded by their size
+        index_memo: decoded feature IDs, blocks and filter indexes of recently
+            used jobs, bounded by their approximate size
+    """
+
+    data_version: ClassVar[int] = 3
+    feature_block: ClassVar[int] = 1000
+    network_block: ClassVar[int] = 5000
+    part_memo: ClassVar[MemoCache] = MemoCache(max_bytes=64 * 1024 * 1024)
+    index_memo: ClassVar[MemoCache] = MemoCache(max_bytes=128 * 1024 * 1024)
+
+    results: Path
+    stream_size: int = 50 * 1024 * 1024
+    engine: str = "python"
+
+    @property
+    def session_path(self: Self) -> Path:
+        name = "out.fermo.session.json"
+        return ResultFiles(results=self.results).locate(name) or self.results.joinpath(
+            name
+        )
+
+    @property
+    def cache_dir(self: Self) -> Path:
+        return self.results.joinpath("out.fermo.dashboard")
+
+    @property
+    def stamp_path(self: Self) -> Path:
+        return self.cache_dir.joinpath("stamp.json")
+
+    def part_path(self: Self, part: str) -> Path:
+        return self.cache_dir.joinpath(f"{part}.json.gz")
+
+    @staticmethod
+    def hash_file(path: Path) -> str:
+        """Calculate the sha256 hash of a file in chunks
+
+        Arguments:
+            path: the file to hash
+
+        Returns:
+            The hex digest of the file
+        """
+        sha = hashlib.sha256()
+        with open(path, "rb") as infile:
+            for chunk in iter(lambda: infile.read(1024 * 1024), b""):
+                sha.update(chunk)
+        return sha.hexdigest()
+
+    @staticmethod
+    def write_atomic(path: Path, content: bytes):
+        """Write to a temporary file first, then move it into place
+
+        Arguments:
+            path: the target file
+            content: the bytes to write
+        """
+        tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            with open(tmp_path, "wb") as out:
+                out.write(content)
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    @staticmethod
+    def decode_part(path: Path) -> Any:
+        """Read and decode a stored part
+
+        Arguments:
+            path: the part file
+
+        Returns:
+            The decoded part
+        """
+        with gzip.open(path, "rt", encoding="utf-8") as infile:
+            return json.load(infile)
+
+    @staticmethod
+    def read_part(path: Path, mtime_ns: int) -> Any:
+        """Read a stored part, memoized per process and file version
+
+        The decompressed part is memoized and decoded on every call, so each
+        caller receives its own copy.
+
+        Arguments:
+            path: the part file
+            mtime_ns: modification time of the part file, to key the memo
+
+        Returns:
+            The decoded part
+        """
+
+        def _load() -> tuple[bytes, int]:
+            content = gzip.decompress(path.read_bytes())
+            return content, len(content)
+
+        return json.loads(DashboardCache.part_memo.get((path, mtime_ns), _load))
+
+    @staticmethod
+    def read_block(path: Path, mtime_ns: int) -> Any:
+        """Read a block or lookup part, memoized
+
+        For use within this class only: the memoized part is shared.
+
+        Arguments:
+            path: the part file
+            mtime_ns: modification time of the part file, to key the memo
+
+        Returns:
+            The decoded part
+        """
+
+        def _load() -> tuple[Any, int]:
+            content = gzip.decompress(path.read_bytes())
+            return json.loads(content), 2 * len(content)
+
+        return DashboardCache.index_memo.get(("block", path, mtime_ns), _load)
+
+    @staticmethod
+    def read_feature_index(path: Path, mtime_ns: int) -> dict:
+        """Map feature IDs to their row in the feature table, memoized
+
+        Arguments:
+            path: the feature IDs part file
+            mtime_ns: modification time of the part file, to key the memo
+
+        Returns:
+            A dict of feature ID and row index
+        """
+
+        def _load() -> tuple[dict, int]:
+            content = gzip.decompress(path.read_bytes())
+            f_index = {str(f_id): idx for idx, f_id in enumerate(json.loads(content))}
+            return f_index, 4 * len(content)
+
+        return DashboardCache.index_memo.get(("f_index", path, mtime_ns), _load)
+
+    @staticmethod
+    def read_filter_engine(cache_dir: Path, mtime_ns: int) -> FilterEngine:
+        """Build the filter indexes from the stored parts, memoized
+
+        Arguments:
+            cache_dir: the dir of the stored parts
+            mtime_ns: modification time of the overview part, to key the memo
+
+        Returns:
+            A FilterEngine instance
+        """
+
+        def _load() -> tuple[FilterEngine, int]:
+            overview = DashboardCache.decode_part(
+                cache_dir.joinpath("overview.json.gz")
+            )
+            engine = FilterEngine.from_parts(
+                features=DashboardCache.decode_part(
+                    cache_dir.joinpath("features.json.gz")
+                ),
+                network_summary=DashboardCache.decode_part(
+                    cache_dir.joinpath("network_summary.json.gz")
+                ),
+                fgroups=overview["stats_fgroups"],
+                samples={
+                    sample: DashboardCache.decode_part(
+                        cache_dir.joinpath(f"sample_{idx}.json.gz")
+                    )["f_idx"]
+                    for idx, sample in enumerate(overview["stats_samples"])
+                },
+            )
+            return engine, engine.nbytes()
+
+        return DashboardCache.index_memo.get(("filter", cache_dir, mtime_ns), _load)
+
+    @staticmethod
+    def split_parts(data: dict) -> dict:
+        """Split the dashboard data into separately served parts
+
+        Arguments:
+            data: the output of DashboardManager.provide_data_get
+
+        Returns:
+            A dict of part name and part content
+        """
+        chromatogram = data.pop("stats_chromatogram")
+        networks = data.pop("stats_network")
+        network_summary = data.pop("stats_network_summary")
+        features = data.pop("stats_features")
+        samples = list(chromatogram)
+
+        parts = {
+            "overview": {
+                **data,
+                "stats_samples": samples,
+                "stats_network_types": list(networks),
+            },
+            "network_summary": network_summary,
+            "features": features,
+            "feature_ids": features.get("f_id", []),
+        }
+        for idx, sample in enumerate(samples):
+            parts[f"sample_{idx}"] = chromatogram[sample]
+
+        size = DashboardCache.feature_block
+        for block, start in enumerate(range(0, len(parts["feature_ids"]), size)):
+            parts[f"features_{block}"] = {
+                key: column[start : start + size] for key, column in features.items()
+            }
+
+        blocks = {}
+        block = elements = 0
+        for network_type, subnetworks in NetworkService.build_index(networks).items():
+            blocks[network_type] = {}
+            for n_id, subnetwork in subnetworks.items():
+                if elements >= DashboardCache.network_block:
+                    block += 1
+                    elements = 0
+                parts.setdefault(f"network_{block}", {}).setdefault(network_type, {})[
+                    n_id
+                ] = subnetwork
+                blocks[network_type][n_id] = block
+                elements += len(subnetwork["nodes"]) + len(subnetwork["edges"])
+        parts["network_blocks"] = blocks
+
+        return parts
+
+    def session_stamp(self: Self) -> dict:
+        """Stat-based fingerprint of the session file"""
+        stat = self.session_path.stat()
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def is_valid(self: Self) -> bool:
+        """Check if the stored dashboard data matches the session file
+
+        A changed modification time alone (e.g. the session file was rewritten
+        with identical content) is resolved by comparing hashes and refreshing the
+        stamp, avoiding a rebuild.
+
+        Returns:
+            Bool indicating if the stored data can be served
+        """
+        try:
+            with open(self.stamp_path) as infile:
+                stamp = json.load(infile)
+        except (OSError, ValueError):
+            return False
+
+        current = self.session_stamp()
+        if (
+            stamp.get("version") != self.data_version
+            or stamp.get("size") != current["size"]
+        ):
+            return False
+        elif stamp.get("mtime_ns") == current["mtime_ns"]:
+            return True
+        elif stamp.get("sha256") == self.hash_file(self.session_path):
+            stamp.update(current)
+            self.write_atomic(self.stamp_path, json.dumps(stamp).encode("utf-8"))
+            return True
+        else:
+            return False
+
+    def write_parts(self: Self, parts: dict, stamp: dict):
+        """Write all parts to a temporary dir, then swap it into place
+
+        Arguments:
+            parts: a dict of part name and part content
+            stamp: the fingerprint of the session file
+        """
+        token = uuid.uuid4().hex
+        tmp_dir = self.results.joinpath(f".{self.cache_dir.name}.{token}.tmp")
+        old_dir = self.results.joinpath(f".{self.cache_dir.name}.{token}.old")
+        tmp_dir.mkdir()
+
+        try:
+            for name, content in parts.items():
+                with open(tmp_dir.joinpath(f"{name}.json.gz"), "wb") as out:
+                    out.write(
+                        gzip.compress(
+                            json.dumps(content, separators=(",", ":")).encode("utf-8"),
+                            compresslevel=6,
+                        )
+                    )
+            with open(tmp_dir.joinpath(self.stamp_path.name), "w") as out:
+                json.dump(stamp, out)
+
+            if self.cache_dir.exists():
+                os.replace(self.cache_dir, old_dir)
+            try:
+                os.replace(tmp_dir, self.cache_dir)
+            except OSError:
+                # another build was swapped into place in the meantime
+                if not self.cache_dir.exists():
+                    raise
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            shutil.rmtree(old_dir, ignore_errors=True)
+
+    def build(self: Self) -> dict:
+        """Prepare the dashboard data from the session file and store it
+
+        Returns:
+            The overview part of the dashboard data
+        """
+        stamp = self.session_stamp()
+        stamp["sha256"] = self.hash_file(self.session_path)
+        stamp["version"] = self.data_version
+
+        match self.engine:
+            case "pandas":
+                manager = DashboardFrameManager()
+            case _:
+                manager = DashboardManager()
+
+        if ResultFiles.text_size(self.session_path) > self.stream_size:
+            manager.prepare_data_stream(self.session_path)
+        else:
+            with ResultFiles.open_text(self.session_path) as infile:
+                manager.prepare_data_get(json.load(infile))
+
+        parts = self.split_parts(manager.provide_data_get())
+        self.write_parts(parts, stamp)
+        return parts["overview"]
+
+    def current_part(self: Self, part: str) -> tuple[Path, int]:
+        """Locate a stored part, (re)building the data if missing or stale
+
+        Arguments:
+            part: the name of the part
+
+        Returns:
+            The part file and its modification time
+
+        Raises:
+            FileNotFoundError: no session file in results dir or unknown part
+        """
+        if not self.session_path.exists():
+            raise FileNotFoundError(f"No session file in '{self.results}'.")
+
+        if not self.is_valid():
+            self.build()
+
+        path = self.part_path(part)
+        return path, path.stat().st_mtime_ns
+
+    def read_stored_block(self: Self, part: str) -> Any:
+        """Read a block of the stored data, validated by an earlier current_part
+
+        Arguments:
+            part: the name of the block
+
+        Returns:
+            The decoded block, shared with the memo
+        """
+        path = self.part_path(part)
+        return self.read_block(path, path.stat().st_mtime_ns)
+
+    def provide(self: Self, part: str = "overview") -> Any:
+        """Serve a stored part, (re)building the data if missing or stale
+
+        Arguments:
+            part: the name of the part
+
+        Returns:
+            The decoded part, a copy owned by the caller
+
+        Raises:
+            FileNotFoundError: no session file in results dir or unknown part
+        """
+        return self.read_part(*self.current_part(part))
+
+    def validator(self: Self) -> str:
+        """Identify the version of the stored data, (re)building it if missing or stale
+
+        Returns:
+            The hash of the session file combined with the data layout version
+
+        Raises:
+            FileNotFoundError: no session file in results dir
+        """
+        if not self.session_path.exists():
+            raise FileNotFoundError(f"No session file in '{self.results}'.")
+
+        if not self.is_valid():
+            self.build()
+
+        with open(self.stamp_path) as infile:
+            stamp = json.load(infile)
+        return f"{stamp['sha256']}-{stamp['version']}"
+
+    def provide_sample(self: Self, sample: str) -> dict:
+        """Serve the chromatogram data of a single sample
+
+        Arguments:
+            sample: the sample name
+
+        Returns:
+            The columns of sample-specific feature information
+
+        Raises:
+            KeyError: sample not in session
+        """
+        samples = self.provide()["stats_samples"]
+        if sample not in samples:
+            raise KeyError(f"Sample '{sample}' not found.")
+        return self.provide(f"sample_{samples.index(sample)}")
+
+    def provide_feature_rows(self: Self, f_ids: list[str], keys: tuple) -> dict:
+        """Look up rows of the columnar feature table
+
+        Arguments:
+            f_ids: the feature IDs; unknown IDs are skipped
+            keys: the columns to include
+
+        Returns:
+            A dict of feature ID and feature information
+        """
+        f_index = self.read_feature_index(*self.current_part("feature_ids"))
+        rows = {}
+        for f_id in f_ids:
+            if f_id not in f_index:
+                continue
+            block, row = divmod(f_index[f_id], self.feature_block)
+            columns = self.read_stored_block(f"features_{block}")
+            rows[f_id] = {key: copy.deepcopy(columns[key][row]) for key in keys}
+        return rows
+
+    def provide_network(
+        self: Self,
+        network_type: str,
+        n_id: str,
+        f_id: str | None = None,
+        hops: int = 1,
+        max_nodes: int = 50,
+    ) -> dict:
+        """Serve a view of a subnetwork with the general information on its features
+
+        Arguments:
+            network_type: the network algorithm
+            n_id: the subnetwork ID
+            f_id: the selected feature, to center a view of a large subnetwork on
+            hops: the neighbourhood size around the selected feature
+            max_nodes: the maximum number of nodes in the view
+
+        Returns:
+            A dict with the subnetwork view and feature information per node ID
+
+        Raises:
+            KeyError: subnetwork or feature not in session
+        """
+        blocks = self.read_block(*self.current_part("network_blocks"))
+        view = NetworkService(
+            index=self.read_stored_block(f"network_{blocks[network_type][n_id]}"),
+            max_nodes=max_nodes,
+        ).view(network_type, n_id, f_id, hops)
+        view["network"] = copy.deepcopy(view["network"])
+        node_ids = [node["data"]["id"] for node in view["network"]["elements"]["nodes"]]
+        view["features"] = self.provide_feature_rows(
+            [str(node_id) for node_id in node_ids], ("mz", "rt_avg", "samples")
+        )
+        return view
+
+    def provide_feature(self: Self, f_id: str) -> dict:
+        """Serve the general information of a single feature
+
+        Arguments:
+            f_id: the feature ID
+
+        Returns:
+            The general information of the feature
+
+        Raises:
+            KeyError: feature not in session
+        """
+        f_index = self.read_feature_index(*self.current_part("feature_ids"))
+        if f_id not in f_index:
+            raise KeyError(f"Feature '{f_id}' not found.")
+        columns = self.read_stored_block(
+            f"features_{f_index[f_id] // self.feature_block}"
+        )
+        return self.provide_feature_rows([f_id], tuple(columns))[f_id]
+
+    def provide_filter(self: Self, spec: FilterSpec, sample: str | None) -> dict:
+        """Apply the dashboard filters to the features of all samples
+
+        Arguments:
+            spec: the filter settings
+            sample: the sample to return the retained feature IDs of
+
+        Returns:
+            A dict with the count per sample and the retained feature IDs of sample
+
+        Raises:
+            KeyError: sample not in session
+        """
+        _, mtime_ns = self.current_part("overview")
+        return self.read_filter_engine(self.cache_dir, mtime_ns).apply(spec, sample)
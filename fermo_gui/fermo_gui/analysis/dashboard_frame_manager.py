@@ -0,0 +1,313 @@
+"""Vectorized preparation of dashboard data using pandas
+
+Copyright (c) 2026-present Mitja Maximilian Zdouc, PhD
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from operator import methodcaller
+from typing import ClassVar, Self
+
+import pandas as pd
+
+from fermo_gui.analysis.dashboard_manager import DashboardManager
+
+
+class DashboardFrameManager(DashboardManager):
+    """Prepares the same dashboard data as DashboardManager using DataFrames
+
+    General features and sample-specific features are flattened into one
+    DataFrame each, from which chromatogram, feature table, distribution plot
+    and sample stats are derived by lookups, explodes and group-bys instead of
+    nested loops per sample and feature.
+    """
+
+    general_keys: ClassVar[tuple] = (
+        "f_id",
+        "mz",
+        "rt",
+        "samples",
+        "blank",
+        "area_per_sample",
+        "height_per_sample",
+        "group_factors",
+        "scores",
+        "annotations",
+        "networks",
+    )
+    sample_spec_keys: ClassVar[tuple] = (
+        "f_id",
+        "rt",
+        "trace_rt",
+        "trace_int",
+        "intensity",
+        "rel_intensity",
+    )
+
+    @staticmethod
+    def nested(series: pd.Series, *keys: str, default: object = None) -> pd.Series:
+        """Chained dict.get lookups on a series of dicts
+
+        Arguments:
+            series: a series of dicts
+            keys: the keys to look up, one per nesting level
+            default: the value for a missing last key
+
+        Returns:
+            A series of the looked up values
+        """
+        for key in keys[:-1]:
+            series = series.map(methodcaller("get", key, {}))
+        return series.map(methodcaller("get", keys[-1], default))
+
+    def general_frame(self: Self, f_sess: dict) -> pd.DataFrame:
+        """Flatten the general features into a DataFrame, one row per feature
+
+        Missing keys are set to None, missing nested dicts to an empty dict.
+
+        Arguments:
+            f_sess: fermo session file
+
+        Returns:
+            A DataFrame of general feature information
+        """
+        frame = pd.DataFrame(
+            list(f_sess.get("general_features", {}).values()),
+            columns=list(self.general_keys),
+            dtype=object,
+        )
+        frame = frame.where(frame.notna(), None)
+        for key in ("scores", "annotations", "networks"):
+            frame[key] = frame[key].map(lambda val: {} if val is None else val)
+        return frame
+
+    def sample_frame(self: Self, f_sess: dict) -> pd.DataFrame:
+        """Flatten the sample-specific features into a DataFrame
+
+        Rows are ordered by sample and by the feature IDs of each sample; feature
+        IDs without sample-specific information get None values.
+
+        Arguments:
+            f_sess: fermo session file
+
+        Returns:
+            A DataFrame with sample name and feature ID key per row
+        """
+        samples = f_sess.get("stats", {}).get("samples") or []
+        sample_data = {s: f_sess.get("samples", {}).get(s, {}) for s in samples}
+        ids = pd.DataFrame(
+            [
+                (sample, str(f_id))
+                for sample, data in sample_data.items()
+                for f_id in data.get("feature_ids", [])
+            ],
+            columns=["sample", "key"],
+            dtype=object,
+        )
+        spec = pd.DataFrame(
+            [
+                {**f_info, "sample": sample, "key": key}
+                for sample, data in sample_data.items()
+                for key, f_info in data.get("sample_spec_features", {}).items()
+            ],
+            columns=["sample", "key", *self.sample_spec_keys],
+            dtype=object,
+        ).drop_duplicates(subset=["sample", "key"])
+
+        frame = ids.merge(spec, how="left", on=["sample", "key"], sort=False)
+        return frame.where(frame.notna(), None)
+
+    def prepare_data_get(self: Self, f_sess: dict):
+        """Run methods to prepare the data required by GET method
+
+        Falls back to DashboardManager if the session file cannot be flattened.
+
+        Arguments:
+            f_sess: fermo session file
+        """
+        try:
+            general = self.general_frame(f_sess)
+            samples = self.sample_frame(f_sess)
+        except (TypeError, AttributeError, ValueError):
+            return super().prepare_data_get(f_sess)
+
+        self.extract_stats_analysis(f_sess)
+        self.frame_stats_samples_dyn(f_sess)
+        self.extract_network(f_sess)
+        self.frame_features(general)
+        self.frame_chromatogram(f_sess, samples)
+        self.frame_distplot(general)
+
+    def frame_features(self: Self, general: pd.DataFrame):
+        """Derive the columnar feature table from the general features
+
+        Arguments:
+            general: the output of general_frame
+        """
+        try:
+            novelty = self.nested(general["scores"], "novelty", default={})
+            self.stats_features = {
+                "f_id": general["f_id"].tolist(),
+                "mz": general["mz"].tolist(),
+                "rt_avg": general["rt"].tolist(),
+                "blank": general["blank"].tolist(),
+                "novelty": novelty.where(novelty.map(bool), 0).tolist(),
+                "samples": general["samples"].tolist(),
+                "f_group": general["group_factors"].tolist(),
+                "f_sample": general["height_per_sample"].tolist(),
+                "a_sample": general["area_per_sample"].tolist(),
+                "annotations": general["annotations"].tolist(),
+                "n_cos_id": self.nested(
+                    general["networks"], "modified_cosine", "network_id", default={}
+                ).tolist(),
+                "n_ms2d_id": self.nested(
+                    general["networks"], "ms2deepscore", "network_id", default={}
+                ).tolist(),
+            }
+        except (TypeError, AttributeError):
+            self.stats_features = {"error": "error during parsing of session file"}
+
+    def frame_chromatogram(self: Self, f_sess: dict, samples: pd.DataFrame):
+        """Derive the per-sample chromatogram columns from the sample features
+
+        Arguments:
+            f_sess: fermo session file
+            samples: the output of sample_frame
+        """
+        try:
+            f_index = {
+                str(f_id): idx for idx, f_id in enumerate(self.stats_features["f_id"])
+            }
+            for key in samples["key"][~samples["key"].isin(f_index)].unique():
+                f_id = samples["f_id"][samples["key"] == key].iloc[0]
+                f_index[key] = self.add_feature(f_id, {})
+
+            columns = {
+                "f_idx": samples["key"].map(f_index).tolist(),
+                "rt": samples["rt"].tolist(),
+                "trace_rt": samples["trace_rt"].tolist(),
+                "trace_int": samples["trace_int"].tolist(),
+                "abs_int": samples["intensity"].tolist(),
+                "rel_int": samples["rel_intensity"].tolist(),
+            }
+            counts = samples.groupby("sample", sort=False).size()
+            start = 0
+            for sample in f_sess.get("stats", {}).get("samples") or []:
+                end = start + counts.get(sample, 0)
+                self.stats_chromatogram[sample] = {
+                    key: column[start:end] for key, column in columns.items()
+                }
+                start = end
+
+            trace_rts = samples["trace_rt"].explode().dropna()
+            if not trace_rts.empty:
+                self.stats_rt_range = [trace_rts.min(), trace_rts.max()]
+
+        except (TypeError, KeyError):
+            self.stats_chromatogram = {"error": "error during parsing of session file"}
+
+    def frame_distplot(self: Self, general: pd.DataFrame):
+        """Derive the values for distribution plots from the general features
+
+        Arguments:
+            general: the output of general_frame
+        """
+        try:
+            scores = general["scores"][general["scores"].map(bool)]
+            matches = self.nested(general["annotations"], "matches")
+            matches = matches.where(matches.map(bool), None).explode()
+            values = {
+                "novelty": self.nested(scores, "novelty", default=0.0).tolist(),
+                "match": matches.map(
+                    lambda m: 0.0 if m is None else m.get("score", 0.0)
+                ).tolist(),
+                "phenotype": self.nested(scores, "phenotype", default=0.0).tolist(),
+            }
+            self.stats_distplots = {
+                key: self.bin_distplot(val) for key, val in values.items()
+            }
+        except (TypeError, AttributeError, ValueError):
+            self.stats_distplots = {"error": "error during parsing of session file"}
+
+    def frame_stats_samples_dyn(self: Self, f_sess: dict):
+        """Derive dynamic stats of samples and the group filters
+
+        Arguments:
+            f_sess: fermo session file
+        """
+        try:
+            groups = f_sess.get("stats", {}).get("groups", {}).get("categories", {})
+            group_list = [group_id.title() for group_id in groups]
+            categories = pd.DataFrame(
+                [
+                    (group_id.title(), category, details["f_ids"], details["s_ids"])
+                    for group_id, group in groups.items()
+                    for category, details in group.items()
+                ],
+                columns=["group", "category", "f_ids", "s_ids"],
+            )
+            for group_id, group in groups.items():
+                self.stats_groups.setdefault(group_id, []).extend(group)
+
+            self.stats_fgroups = (
+                categories.explode("f_ids")
+                .dropna(subset=["f_ids"])
+                .groupby("f_ids", sort=False)["category"]
+                .agg(list)
+                .to_dict()
+            )
+
+            names = f_sess.get("stats", {}).get("samples")
+            sample_data = [f_sess.get("samples", {}).get(s, {}) for s in names]
+            stats = pd.DataFrame(
+                [s.get("scores", {}) for s in sample_data],
+                columns=["diversity", "specificity", "mean_novelty"],
+                dtype=object,
+            )
+            stats = stats.where(stats.notna(), None)
+            totals = [len(s.get("feature_ids")) for s in sample_data]
+
+            sample_groups = (
+                categories.explode("s_ids")
+                .dropna(subset=["s_ids"])
+                .drop_duplicates(subset=["s_ids", "group"], keep="last")
+                .pivot(index="s_ids", columns="group", values="category")
+                .reindex(index=names, columns=group_list)
+                .fillna("N/A")
+            )
+
+            self.stats_samples_dyn = pd.concat(
+                [
+                    pd.DataFrame(
+                        {
+                            "Sample name": names,
+                            "Total features": totals,
+                            "Retained features": totals,
+                            "Diversity": stats["diversity"],
+                            "Specificity": stats["specificity"],
+                            "Mean novelty": stats["mean_novelty"],
+                        },
+                        dtype=object,
+                    ),
+                    sample_groups.reset_index(drop=True),
+                ],
+                axis=1,
+            ).to_dict("records")
+        except (TypeError, ValueError):
+            self.stats_samples_dyn = {"error": "error during parsing of session file"}
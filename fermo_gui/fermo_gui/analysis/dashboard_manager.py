@@ -21,10 +21,14 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
+from pathlib import Path
 from typing import Self
 
+import numpy as np
 from pydantic import BaseModel
 
+from fermo_gui.analysis.session_stream import SessionStream
+
 
 class DashboardManager(BaseModel):
     """Organizes data extraction and filtering for dashboard
@@ -32,22 +36,25 @@ class DashboardManager(BaseModel):
     Attributes:
         stats_analysis: static stats data from general analysis run
         stats_samples_dyn: mixed static and dynamic data on samples (overview)
-        stats_chromatogram: all feature information structured per sample. Used for all dashboard visualizations
+        stats_chromatogram: sample-specific feature information as columns per
+            sample. Used for all dashboard visualizations
         stats_network: network information ordered by network ID
         stats_groups: overview of group labels to be used for filter selection
+        stats_network_summary: feature IDs per network ID, ordered by network type
+        stats_features: columnar general feature information, referenced by index
+        stats_rt_range: min and max retention time over all sample traces
     """
 
     stats_analysis: dict = {}
     stats_samples_dyn: list = []
     stats_chromatogram: dict = {}
     stats_network: dict = {}
+    stats_network_summary: dict = {}
     stats_groups: dict = {}
     stats_fgroups: dict = {}
-    stats_distplots: dict = {
-        "novelty": [],
-        "match": [],
-        "phenotype": [],
-    }
+    stats_features: dict = {}
+    stats_rt_range: list = []
+    stats_distplots: dict = {}
 
     def prepare_data_get(self: Self, f_sess: dict):
         """Run methods to prepare the data required by GET method
@@ -58,9 +65,101 @@ class DashboardManager(BaseModel):
         self.extract_stats_analysis(f_sess)
         self.extract_stats_samples_dyn(f_sess)
         self.extract_network(f_sess)
+        self.extract_features(f_sess)
         self.create_chromatogram(f_sess)
         self.collect_distplot(f_sess)
 
+    def prepare_data_stream(self: Self, path: Path):
+        """Run methods to prepare the data required by GET method incrementally
+
+        For large session files: only the fields used by the dashboard are
+        retained while walking the file, instead of loading it as a whole.
+
+        Arguments:
+            path: path to the fermo session file
+        """
+        self.prepare_data_get(self.reduce_session(path))
+
+    @staticmethod
+    def reduce_session(path: Path) -> dict:
+        """Read the session file member-wise, keeping only dashboard fields
+
+        Subnetworks are read one at a time, like features and samples.
+
+        Arguments:
+            path: path to the fermo session file
+
+        Returns:
+            A stripped-down fermo session file
+        """
+        general_keys = (
+            "f_id",
+            "mz",
+            "rt",
+            "samples",
+            "blank",
+            "area_per_sample",
+            "height_per_sample",
+            "group_factors",
+            "scores",
+            "annotations",
+            "networks",
+        )
+        sample_keys = ("feature_ids", "scores")
+        sample_spec_keys = (
+            "f_id",
+            "rt",
+            "trace_rt",
+            "trace_int",
+            "intensity",
+            "rel_intensity",
+        )
+
+        f_sess = {"stats": {}, "general_features": {}, "samples": {}}
+        stream = SessionStream(path=path)
+        for key, val in stream.iter_members(
+            descend={
+                ("stats",),
+                ("stats", "networks"),
+                ("stats", "networks", "*"),
+                ("stats", "networks", "*", "subnetworks"),
+                ("general_features",),
+                ("samples",),
+            }
+        ):
+            match key:
+                case ("metadata",):
+                    f_sess["metadata"] = val
+                case ("stats", "active_features"):
+                    pass
+                case ("stats", "networks", network, "subnetworks", n_id):
+                    f_sess["stats"].setdefault("networks", {}).setdefault(
+                        network, {}
+                    ).setdefault("subnetworks", {})[n_id] = val
+                case ("stats", "networks", network, n_key):
+                    f_sess["stats"].setdefault("networks", {}).setdefault(network, {})[
+                        n_key
+                    ] = val
+                case ("stats", "networks", network):
+                    f_sess["stats"].setdefault("networks", {})[network] = val
+                case ("stats", stat):
+                    f_sess["stats"][stat] = val
+                case ("general_features", f_id):
+                    f_sess["general_features"][f_id] = {
+                        k: val[k] for k in general_keys if k in val
+                    }
+                case ("samples", s_id):
+                    sample = {k: val[k] for k in sample_keys if k in val}
+                    sample["sample_spec_features"] = {
+                        f_id: {k: f_info[k] for k in sample_spec_keys if k in f_info}
+                        for f_id, f_info in val.get("sample_spec_features", {}).items()
+                    }
+                    f_sess["samples"][s_id] = sample
+                case _:
+                    pass
+
+        return f_sess
+
     def provide_data_get(self: Self) -> dict:
         """Return data required by GET method
 
@@ -71,8 +170,11 @@ class DashboardManager(BaseModel):
             "stats_samples_dyn": self.stats_samples_dyn,
             "stats_chromatogram": self.stats_chromatogram,
             "stats_network": self.stats_network,
+            "stats_network_summary": self.stats_network_summary,
             "stats_groups": self.stats_groups,
             "stats_fgroups": self.stats_fgroups,
+            "stats_features": self.stats_features,
+            "stats_rt_range": self.stats_rt_range,
             "stats_distplots": self.stats_distplots,
         }
 
@@ -187,78 +289,117 @@ class DashboardManager(BaseModel):
     def create_chromatogram(self: Self, f_sess: dict):
         """Creates chromatogram from fermo.session file
 
+        Per sample, only the sample-specific feature information is stored in
+        columns. General feature information is referenced by the index of the
+        feature in stats_features.
+
         Arguments:
             f_sess: fermo session file
         """
         try:
+            f_index = {
+                str(f_id): idx for idx, f_id in enumerate(self.stats_features["f_id"])
+            }
             samples = f_sess.get("stats", {}).get("samples") or []
             for sample in samples:
                 sample_data = f_sess.get("samples", {}).get(sample, {})
-                feature_data = []
+                feature_data = {
+                    "f_idx": [],
+                    "rt": [],
+                    "trace_rt": [],
+                    "trace_int": [],
+                    "abs_int": [],
+                    "rel_int": [],
+                }
                 for f_id in sample_data.get("feature_ids", []):
                     f_info = sample_data.get("sample_spec_features", {}).get(
                         str(f_id), {}
                     )
-                    g_info = f_sess.get("general_features", {}).get(str(f_id), {})
-                    novelty = g_info.get("scores", {}).get("novelty", {})
-                    n_id_cosine = (
-                        g_info.get("networks", {})
-                        .get("modified_cosine", {})
-                        .get("network_id", {})
-                    )
-                    n_id_deepscore = (
-                        g_info.get("networks", {})
-                        .get("ms2deepscore", {})
-                        .get("network_id", {})
-                    )
-
-                    n_features_cosine = (
-                        f_sess.get("stats", {})
-                        .get("networks", {})
-                        .get("modified_cosine", {})
-                        .get("summary", {})
-                        .get(str(n_id_cosine), {})
-                    )
-                    n_features_deepscore = (
-                        f_sess.get("stats", {})
-                        .get("networks", {})
-                        .get("ms2deepscore", {})
-                        .get("summary", {})
-                        .get(str(n_id_deepscore), {})
-                    )
-                    if len(n_features_deepscore) >= 50:
-                        n_features_deepscore = {}
-                    if len(n_features_cosine) >= 50:
-                        n_features_cosine = {}
-
-                    feature_data.append(
-                        {
-                            "f_id": f_info.get("f_id"),
-                            "rt": f_info.get("rt"),
-                            "rt_avg": g_info.get("rt"),
-                            "trace_rt": f_info.get("trace_rt"),
-                            "trace_int": f_info.get("trace_int"),
-                            "abs_int": f_info.get("intensity"),
-                            "rel_int": f_info.get("rel_intensity"),
-                            "blank": g_info.get("blank"),
-                            "novelty": novelty if novelty else 0,
-                            "mz": g_info.get("mz"),
-                            "samples": g_info.get("samples"),
-                            "f_group": g_info.get("group_factors"),
-                            "f_sample": g_info.get("height_per_sample"),
-                            "a_sample": g_info.get("area_per_sample"),
-                            "annotations": g_info.get("annotations"),
-                            "n_cos_id": n_id_cosine,
-                            "n_ms2d_id": n_id_deepscore,
-                            "n_features_cosine": n_features_cosine,
-                            "n_features_deepscore": n_features_deepscore,
-                        }
-                    )
+                    if str(f_id) not in f_index:
+                        f_index[str(f_id)] = self.add_feature(f_info.get("f_id"), {})
+
+                    feature_data["f_idx"].append(f_index[str(f_id)])
+                    feature_data["rt"].append(f_info.get("rt"))
+                    feature_data["trace_rt"].append(f_info.get("trace_rt"))
+                    feature_data["trace_int"].append(f_info.get("trace_int"))
+                    feature_data["abs_int"].append(f_info.get("intensity"))
+                    feature_data["rel_int"].append(f_info.get("rel_intensity"))
                 self.stats_chromatogram[sample] = feature_data
 
-        except TypeError:
+            trace_rts = [
+                rt
+                for feature_data in self.stats_chromatogram.values()
+                for trace_rt in feature_data["trace_rt"]
+                for rt in trace_rt or []
+            ]
+            if trace_rts:
+                self.stats_rt_range = [min(trace_rts), max(trace_rts)]
+
+        except (TypeError, KeyError):
             self.stats_chromatogram = {"error": "error during parsing of session file"}
 
+    def add_feature(self: Self, f_id: int | None, g_info: dict) -> int:
+        """Append the general information of a feature to the feature table
+
+        Arguments:
+            f_id: the feature ID
+            g_info: the general feature information from the fermo session file
+
+        Returns:
+            The index of the feature in the feature table
+        """
+        novelty = g_info.get("scores", {}).get("novelty", {})
+        row = {
+            "f_id": f_id,
+            "mz": g_info.get("mz"),
+            "rt_avg": g_info.get("rt"),
+            "blank": g_info.get("blank"),
+            "novelty": novelty if novelty else 0,
+            "samples": g_info.get("samples"),
+            "f_group": g_info.get("group_factors"),
+            "f_sample": g_info.get("height_per_sample"),
+            "a_sample": g_info.get("area_per_sample"),
+            "annotations": g_info.get("annotations"),
+            "n_cos_id": g_info.get("networks", {})
+            .get("modified_cosine", {})
+            .get("network_id", {}),
+            "n_ms2d_id": g_info.get("networks", {})
+            .get("ms2deepscore", {})
+            .get("network_id", {}),
+        }
+        for key, val in row.items():
+            self.stats_features[key].append(val)
+        return len(self.stats_features["f_id"]) - 1
+
+    def extract_features(self: Self, f_sess: dict):
+        """Extracts general feature information into a columnar feature table
+
+        Arguments:
+            f_sess: fermo session file
+        """
+        try:
+            self.stats_features = {
+                key: []
+                for key in (
+                    "f_id",
+                    "mz",
+                    "rt_avg",
+                    "blank",
+                    "novelty",
+                    "samples",
+                    "f_group",
+                    "f_sample",
+                    "a_sample",
+                    "annotations",
+                    "n_cos_id",
+                    "n_ms2d_id",
+                )
+            }
+            for g_info in f_sess.get("general_features", {}).values():
+                self.add_feature(g_info.get("f_id"), g_info)
+        except (TypeError, AttributeError):
+            self.stats_features = {"error": "error during parsing of session file"}
+
     def extract_network(self: Self, f_sess: dict):
         """Extracts network data from fermo.session file
 
@@ -270,42 +411,71 @@ class DashboardManager(BaseModel):
 
             for network in networks:
                 n_info = networks.get(network, {})
-                network_data = {}
-                for n_id in n_info.get("subnetworks", {}):
-                    network_size = len(
-                        n_info.get("subnetworks", {})
-                        .get(n_id)
-                        .get("elements", {})
-                        .get("nodes", {})
-                    )
-                    if network_size >= 50:
-                        network_data[n_id] = "large_network"
-                    else:
-                        network_data[n_id] = n_info.get("subnetworks", {}).get(n_id)
-
-                self.stats_network[network] = network_data
+                self.stats_network[network] = dict(n_info.get("subnetworks", {}))
+                self.stats_network_summary[network] = {
+                    str(n_id): f_ids
+                    for n_id, f_ids in (n_info.get("summary") or {}).items()
+                }
 
         except TypeError:
             self.stats_network = {"error": "error during parsing of session file"}
+            self.stats_network_summary = {
+                "error": "error during parsing of session file"
+            }
+
+    @staticmethod
+    def bin_distplot(values: list) -> dict:
+        """Summarize score values as histograms and percentiles
+
+        Histograms span the score range of the dashboard sliders [0, 1.05] at bin
+        sizes of 0.05, 0.025 and 0.01, so the page size does not depend on the
+        number of values.
+
+        Arguments:
+            values: the score values
+
+        Returns:
+            A dict with value count, percentiles and histograms (coarse to fine)
+        """
+        scores = np.array([np.nan if v is None else v for v in values], dtype=float)
+        scores = scores[~np.isnan(scores)]
+
+        histograms = []
+        for size in (0.05, 0.025, 0.01):
+            counts, _ = np.histogram(scores, bins=round(1.05 / size), range=(0, 1.05))
+            histograms.append({"start": 0, "size": size, "counts": counts.tolist()})
+
+        percentiles = (0, 5, 25, 50, 75, 95, 100)
+        if scores.size:
+            values = np.percentile(scores, percentiles).tolist()
+        else:
+            values = [None] * len(percentiles)
+
+        return {
+            "count": int(scores.size),
+            "percentiles": dict(zip(map(str, percentiles), values, strict=True)),
+            "histograms": histograms,
+        }
 
     def collect_distplot(self: Self, f_sess: dict):
         """Parse values for distribution plots"""
         try:
+            values = {"novelty": [], "match": [], "phenotype": []}
             features = f_sess.get("general_features", {})
             for _k, v in features.items():
                 if v.get("scores"):
-                    self.stats_distplots["novelty"].append(
-                        v["scores"].get("novelty", 0.0)
-                    )
-                    self.stats_distplots["phenotype"].append(
-                        v["scores"].get("phenotype", 0.0)
-                    )
+                    values["novelty"].append(v["scores"].get("novelty", 0.0))
+                    values["phenotype"].append(v["scores"].get("phenotype", 0.0))
 
                 if matches := v.get("annotations", {}).get("matches"):
                     for m in matches:
-                        self.stats_distplots["match"].append(m.get("score", 0.0))
+                        values["match"].append(m.get("score", 0.0))
                 else:
-                    self.stats_distplots["match"].append(0.0)
+                    values["match"].append(0.0)
 
-        except TypeError:
+            self.stats_distplots = {
+                key: self.bin_distplot(val) for key, val in values.items()
+            }
+
+        except (TypeError, ValueError):
             self.stats_distplots = {"error": "error during parsing of session file"}
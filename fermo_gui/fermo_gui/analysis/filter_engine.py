@@ -0,0 +1,353 @@
+"""Indexed filtering of dashboard features
+
+Copyright (c) 2026-present Mitja Maximilian Zdouc, PhD
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import sys
+from typing import Self
+
+import numpy as np
+from pydantic import BaseModel, ConfigDict
+
+
+class FoldSpec(BaseModel):
+    """Minimum fold change between two categories of a group
+
+    Attributes:
+        group: the group label
+        group1: the first category
+        group2: the second category
+        factor: the minimum fold change factor
+    """
+
+    group: str
+    group1: str
+    group2: str
+    factor: float
+
+
+class FilterSpec(BaseModel):
+    """The settings of the dashboard filter panel; None disables a filter
+
+    Attributes:
+        novelty: min and max novelty score; None for an open bound
+        phenotype: min and max score of the first phenotype annotation
+        match: min and max score of the first library match
+        annotated: retain only features with adduct annotation
+        exclude_blanks: remove features detected in sample blanks
+        f_id: retain only the feature with this ID
+        mz: min and max precursor m/z
+        sample_count: min and max number of samples a feature was detected in
+        fold: minimum fold change between two categories
+        groups: retain features in any of these categories
+        network_exclude: remove features in networks with a member in any of these
+            categories (or "blanks")
+        network_type: the network type used by network_exclude
+    """
+
+    novelty: tuple[float | None, float | None] | None = None
+    phenotype: tuple[float | None, float | None] | None = None
+    match: tuple[float | None, float | None] | None = None
+    annotated: bool = False
+    exclude_blanks: bool = False
+    f_id: float | None = None
+    mz: tuple[float | None, float | None] | None = None
+    sample_count: tuple[float | None, float | None] | None = None
+    fold: FoldSpec | None = None
+    groups: list[str] | None = None
+    network_exclude: list[str] | None = None
+    network_type: str = "modified_cosine"
+
+
+class FilterEngine(BaseModel):
+    """Evaluates filter specs against per-session indexes of the feature table
+
+    Scores are kept as sorted arrays for range queries, membership (blanks,
+    categories, annotation) as boolean masks, and fold changes as precomputed
+    maximum factor per category pair. A filter spec is thus resolved to a mask
+    over all features, which is then applied to the features of each sample.
+
+    Attributes:
+        f_ids: feature ID per row of the feature table
+        ranges: row order and sorted values per score, without missing values
+        blank: mask of features detected in sample blanks
+        annotated: mask of features with adduct annotation
+        categories: mask of features per category
+        folds: maximum fold change factor per group and category pair
+        networks: per network type, network index per feature and member pairs
+        samples: feature table rows per sample
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    f_ids: np.ndarray
+    ranges: dict[str, tuple[np.ndarray, np.ndarray]]
+    blank: np.ndarray
+    annotated: np.ndarray
+    categories: dict[str, np.ndarray]
+    folds: dict[tuple[str, str, str], np.ndarray]
+    networks: dict[str, tuple[np.ndarray, np.ndarray, np.ndarray]]
+    samples: dict[str, np.ndarray]
+
+    @staticmethod
+    def first_score(annotations: dict | None, key: str) -> float:
+        """Return the score of the first annotation of a kind, or NaN"""
+        try:
+            score = (annotations or {}).get(key, [])[0].get("score")
+            return np.nan if score is None else float(score)
+        except (IndexError, KeyError, AttributeError, TypeError, ValueError):
+            return np.nan
+
+    @staticmethod
+    def sorted_index(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Create the row order and sorted values, dropping missing values"""
+        rows = np.flatnonzero(~np.isnan(values))
+        order = rows[np.argsort(values[rows], kind="stable")]
+        return order, values[order]
+
+    @classmethod
+    def from_parts(
+        cls,
+        features: dict,
+        network_summary: dict,
+        fgroups: dict,
+        samples: dict[str, list],
+    ) -> "FilterEngine":
+        """Build the indexes from the stored dashboard data
+
+        Arguments:
+            features: the columnar feature table
+            network_summary: feature IDs per network ID and network type
+            fgroups: categories per feature ID
+            samples: feature table rows per sample name
+
+        Returns:
+            A FilterEngine instance
+        """
+        f_ids = np.array(features["f_id"], dtype=object)
+        n_rows = len(f_ids)
+        f_index = {str(f_id): row for row, f_id in enumerate(features["f_id"])}
+
+        def as_float(values: list) -> np.ndarray:
+            return np.array(
+                [np.nan if val is None else float(val) for val in values], dtype=float
+            )
+
+        ranges = {
+            "novelty": as_float(features["novelty"]),
+            "mz": as_float(features["mz"]),
+            "phenotype": np.array(
+                [cls.first_score(ann, "phenotypes") for ann in features["annotations"]],
+                dtype=float,
+            ),
+            "match": np.array(
+                [cls.first_score(ann, "matches") for ann in features["annotations"]],
+                dtype=float,
+            ),
+            "sample_count": as_float(
+                [len(val) if val is not None else None for val in features["samples"]]
+            ),
+        }
+
+        categories = {}
+        for f_id, f_categories in fgroups.items():
+            if (row := f_index.get(str(f_id))) is None:
+                continue
+            for category in f_categories:
+                if category not in categories:
+                    categories[category] = np.zeros(n_rows, dtype=bool)
+                categories[category][row] = True
+
+        folds = {}
+        for row, group_factors in enumerate(features["f_group"]):
+            for group, factors in (group_factors or {}).items():
+                for factor in factors or []:
+                    key = (group, *sorted((factor["group1"], factor["group2"])))
+                    table = folds.setdefault(key, np.full(n_rows, -np.inf))
+                    table[row] = max(table[row], factor["factor"])
+
+        networks = {}
+        for network_type, id_column in (
+            ("modified_cosine", "n_cos_id"),
+            ("ms2deepscore", "n_ms2d_id"),
+        ):
+            summary = network_summary.get(network_type) or {}
+            if not isinstance(summary, dict):
+                continue
+            n_index = {n_id: pos for pos, n_id in enumerate(summary)}
+            member_net, member_row = [], []
+            for n_id, members in summary.items():
+                for member in members or []:
+                    if (row := f_index.get(str(member))) is not None:
+                        member_net.append(n_index[n_id])
+                        member_row.append(row)
+            networks[network_type] = (
+                np.array(
+                    [n_index.get(str(n_id), -1) for n_id in features[id_column]],
+                    dtype=int,
+                ),
+                np.array(member_net, dtype=int),
+                np.array(member_row, dtype=int),
+            )
+
+        return cls(
+            f_ids=f_ids,
+            ranges={key: cls.sorted_index(values) for key, values in ranges.items()},
+            blank=np.array([val is True for val in features["blank"]], dtype=bool),
+            annotated=np.array(
+                [
+                    (ann or {}).get("adducts") is not None
+                    for ann in features["annotations"]
+                ],
+                dtype=bool,
+            ),
+            categories=categories,
+            folds=folds,
+            networks=networks,
+            samples={
+                sample: np.array(rows, dtype=int) for sample, rows in samples.items()
+            },
+        )
+
+    def nbytes(self: Self) -> int:
+        """Approximate the memory held by the indexes in bytes"""
+        arrays = [
+            self.f_ids,
+            self.blank,
+            self.annotated,
+            *self.categories.values(),
+            *self.folds.values(),
+            *self.samples.values(),
+        ]
+        for index in (*self.ranges.values(), *self.networks.values()):
+            arrays.extend(index)
+        return sum(array.nbytes for array in arrays) + sum(
+            sys.getsizeof(f_id) for f_id in self.f_ids
+        )
+
+    def in_range(
+        self: Self, key: str, low: float | None, high: float | None
+    ) -> np.ndarray:
+        """Create the mask of features with a score within a range
+
+        Arguments:
+            key: the score
+            low: the inclusive lower bound, or None
+            high: the inclusive upper bound, or None
+
+        Returns:
+            A boolean mask over the feature table
+        """
+        order, values = self.ranges[key]
+        start = 0 if low is None else np.searchsorted(values, low, side="left")
+        end = len(values) if high is None else np.searchsorted(values, high, "right")
+        mask = np.zeros(len(self.f_ids), dtype=bool)
+        mask[order[start:end]] = True
+        return mask
+
+    def in_categories(self: Self, values: list[str]) -> np.ndarray:
+        """Create the mask of features in any of the categories"""
+        mask = np.zeros(len(self.f_ids), dtype=bool)
+        for value in values:
+            if value in self.categories:
+                mask |= self.categories[value]
+        return mask
+
+    def network_valid(self: Self, network_type: str, values: list[str]) -> np.ndarray:
+        """Create the mask of features in networks without excluded members
+
+        Arguments:
+            network_type: the network type
+            values: categories (or "blanks") to be absent from the network
+
+        Returns:
+            A boolean mask over the feature table
+        """
+        if network_type not in self.networks:
+            return np.zeros(len(self.f_ids), dtype=bool)
+
+        feature_net, member_net, member_row = self.networks[network_type]
+        excluded = self.in_categories(values)
+        if "blanks" in values:
+            excluded |= self.blank
+
+        n_networks = member_net.max() + 1 if len(member_net) else 0
+        size = np.bincount(member_net, minlength=n_networks)
+        tainted = np.bincount(
+            member_net, weights=excluded[member_row], minlength=n_networks
+        )
+        valid_net = np.append((size > 0) & (tainted == 0), False)
+        return valid_net[np.where(feature_net >= 0, feature_net, n_networks)]
+
+    def mask(self: Self, spec: FilterSpec) -> np.ndarray:
+        """Resolve a filter spec to the mask of retained features
+
+        Arguments:
+            spec: the filter settings
+
+        Returns:
+            A boolean mask over the feature table
+        """
+        mask = np.ones(len(self.f_ids), dtype=bool)
+        for key in ("novelty", "phenotype", "match", "mz", "sample_count"):
+            if (bounds := getattr(spec, key)) is not None:
+                mask &= self.in_range(key, *bounds)
+        if spec.annotated:
+            mask &= self.annotated
+        if spec.exclude_blanks:
+            mask &= ~self.blank
+        if spec.f_id is not None:
+            mask &= self.f_ids == spec.f_id
+        if spec.fold is not None:
+            key = (spec.fold.group, *sorted((spec.fold.group1, spec.fold.group2)))
+            if key in self.folds:
+                mask &= self.folds[key] >= spec.fold.factor
+            else:
+                mask[:] = False
+        if spec.groups:
+            mask &= self.in_categories(spec.groups)
+        if spec.network_exclude:
+            mask &= self.network_valid(spec.network_type, spec.network_exclude)
+        return mask
+
+    def apply(self: Self, spec: FilterSpec, sample: str | None = None) -> dict:
+        """Count the retained features per sample
+
+        Arguments:
+            spec: the filter settings
+            sample: the sample to return the retained feature IDs of
+
+        Returns:
+            A dict with the count per sample and the retained feature IDs of sample
+
+        Raises:
+            KeyError: sample not in session
+        """
+        mask = self.mask(spec)
+        result = {
+            "counts": {
+                name: int(mask[rows].sum()) for name, rows in self.samples.items()
+            }
+        }
+        if sample is not None:
+            rows = self.samples[sample]
+            result["f_ids"] = self.f_ids[rows[mask[rows]]].tolist()
+        return result
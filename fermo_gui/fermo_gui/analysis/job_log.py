@@ -0,0 +1,140 @@
+"""Incremental reading of job logs
+
+Copyright (c) 2026-present Mitja Maximilian Zdouc, PhD
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import time
+from pathlib import Path
+from typing import Self
+
+from pydantic import BaseModel
+
+from fermo_gui.analysis.result_files import ResultFiles
+from fermo_gui.processing.job_registry import JobRegistry
+
+
+class JobLog(BaseModel):
+    """Reads the log of a job from a byte offset on
+
+    Only complete lines are returned while the job is running, so a client
+    never receives a partial line or a split multi-byte character; the next
+    offset points after the last returned newline.
+
+    The job state is taken from the job registry if the job has a record, since
+    the session file exists before start_job finished its last stages; jobs
+    without a record are judged by their result files.
+
+    Attributes:
+        results: the results dir of the job
+        max_bytes: the maximum number of bytes returned per read
+        registry: the job registry, or None to judge by result files only
+    """
+
+    results: Path
+    max_bytes: int = 256 * 1024
+    registry: JobRegistry | None = None
+
+    @property
+    def log_path(self: Self) -> Path:
+        return self.results.joinpath("out.fermo.log")
+
+    def state(self: Self) -> str:
+        """Return 'failed', 'finished' or 'running'"""
+        if self.registry is not None and (
+            record := self.registry.get(self.results.parent.name)
+        ):
+            match record["state"]:
+                case "succeeded":
+                    return "finished"
+                case "failed":
+                    return "failed"
+                case _:
+                    return "running"
+
+        if self.results.joinpath("out.failed.txt").exists():
+            return "failed"
+        elif ResultFiles(results=self.results).locate("out.fermo.session.json"):
+            return "finished"
+        return "running"
+
+    def read(self: Self, offset: int) -> dict:
+        """Read the log from an offset on
+
+        A log that is shorter than the offset was rewritten, and is read from
+        the start again. A job that has not started yet has no log.
+
+        Arguments:
+            offset: the number of bytes the client already received
+
+        Returns:
+            A dict with new text, next offset, reset flag and job state
+
+        Raises:
+            FileNotFoundError: results dir not found
+        """
+        state = self.state()
+        try:
+            with open(self.log_path, "rb") as infile:
+                size = infile.seek(0, 2)
+                reset = offset > size or offset < 0
+                start = 0 if reset else offset
+                infile.seek(start)
+                chunk = infile.read(self.max_bytes)
+        except FileNotFoundError:
+            if not self.results.is_dir():
+                raise
+            return {"text": "", "offset": 0, "reset": offset != 0, "state": state}
+
+        if state == "running" or start + len(chunk) < size:
+            chunk = chunk[: chunk.rfind(b"\n") + 1]
+
+        return {
+            "text": chunk.decode("utf-8", errors="replace"),
+            "offset": start + len(chunk),
+            "reset": reset,
+            "state": state,
+        }
+
+    def wait(self: Self, offset: int, timeout: float, interval: float = 0.5) -> dict:
+        """Read the log once new lines arrived, the job ended or timeout passed
+
+        Arguments:
+            offset: the number of bytes the client already received
+            timeout: the maximum time to wait in seconds
+            interval: the time between checks in seconds
+
+        Returns:
+            The result of read
+
+        Raises:
+            FileNotFoundError: results dir not found
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            result = self.read(offset)
+            if (
+                result["text"]
+                or result["reset"]
+                or result["state"] != "running"
+                or time.monotonic() >= deadline
+            ):
+                return result
+            time.sleep(interval)
@@ -0,0 +1,75 @@
+"""Least-recently-used memo bounded by the size of its entries
+
+Copyright (c) 2026-present Mitja Maximilian Zdouc, PhD
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any, Self
+
+
+class MemoCache:
+    """Memoizes values per process, evicting the least recently used first
+
+    The memo is bounded by the summed size of its entries instead of their
+    number. Values larger than a quarter of the bound are not memoized, so that
+    a single large value cannot evict all others.
+
+    Attributes:
+        max_bytes: the maximum summed size of the memoized values
+        entries: the memoized values and their sizes, least recently used first
+        size: the summed size of the memoized values
+    """
+
+    def __init__(self: Self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.entries: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def get(self: Self, key: Hashable, load: Callable[[], tuple[Any, int]]) -> Any:
+        """Return the memoized value of a key, loading it on a miss
+
+        Arguments:
+            key: the key of the value
+            load: returns the value and its size in bytes
+
+        Returns:
+            The memoized or loaded value
+        """
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return self.entries[key][0]
+
+        value, nbytes = load()
+        if nbytes > self.max_bytes // 4:
+            return value
+
+        with self.lock:
+            if key not in self.entries:
+                self.entries[key] = (value, nbytes)
+                self.size += nbytes
+            while self.size > self.max_bytes:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.size -= evicted
+        return value
@@ -0,0 +1,201 @@
+"""Serves size-capped views of molecular networks
+
+Copyright (c) 2026-present Mitja Maximilian Zdouc, PhD
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from collections import deque
+from typing import Self
+
+from pydantic import BaseModel
+
+
+class NetworkService(BaseModel):
+    """Derives views of subnetworks from an adjacency index
+
+    Subnetworks up to max_nodes are served as a whole. Larger subnetworks are
+    served either as the k-hop neighbourhood of a feature or, without a feature,
+    as the nodes connected by the highest-scoring edges, both capped at max_nodes.
+
+    Attributes:
+        index: the network index of a session, as created by build_index
+        max_nodes: the maximum number of nodes in a served view
+    """
+
+    index: dict
+    max_nodes: int = 50
+
+    @staticmethod
+    def build_index(networks: dict) -> dict:
+        """Create the adjacency index of all subnetworks
+
+        Edges are sorted by descending weight; the adjacency lists of each node
+        hold edge positions in the same order.
+
+        Arguments:
+            networks: subnetworks per network type and network ID, as created by
+                DashboardManager.extract_network
+
+        Returns:
+            A dict of network type, network ID and subnetwork index
+        """
+        index = {}
+        for network_type, subnetworks in networks.items():
+            if not isinstance(subnetworks, dict):
+                continue
+
+            index[network_type] = {}
+            for n_id, subnetwork in subnetworks.items():
+                elements = subnetwork.get("elements", {})
+                nodes = {
+                    str(node["data"]["id"]): node for node in elements.get("nodes", [])
+                }
+                edges = sorted(
+                    elements.get("edges", []),
+                    key=lambda edge: edge["data"].get("weight", 0),
+                    reverse=True,
+                )
+                adjacency = {node_id: [] for node_id in nodes}
+                for pos, edge in enumerate(edges):
+                    for end in ("source", "target"):
+                        adjacency.setdefault(str(edge["data"][end]), []).append(pos)
+
+                index[network_type][n_id] = {
+                    "data": subnetwork.get("data"),
+                    "directed": subnetwork.get("directed", False),
+                    "multigraph": subnetwork.get("multigraph", False),
+                    "nodes": nodes,
+                    "edges": edges,
+                    "adjacency": adjacency,
+                }
+        return index
+
+    def neighbourhood(self: Self, subnetwork: dict, f_id: str, hops: int) -> list:
+        """Collect the nodes within a number of hops of a feature
+
+        Neighbours are visited breadth-first, via the highest-scoring edges first.
+
+        Arguments:
+            subnetwork: the subnetwork index
+            f_id: the feature ID to start from
+            hops: the maximum distance from the feature
+
+        Returns:
+            A list of node IDs, at most max_nodes long
+
+        Raises:
+            KeyError: feature not in subnetwork
+        """
+        if f_id not in subnetwork["nodes"]:
+            raise KeyError(f"Feature '{f_id}' not in subnetwork.")
+
+        visited = {f_id: 0}
+        queue = deque([f_id])
+        while queue and len(visited) < self.max_nodes:
+            node_id = queue.popleft()
+            if visited[node_id] >= hops:
+                continue
+            for pos in subnetwork["adjacency"].get(node_id, []):
+                edge = subnetwork["edges"][pos]["data"]
+                for end in (str(edge["source"]), str(edge["target"])):
+                    if end not in visited and len(visited) < self.max_nodes:
+                        visited[end] = visited[node_id] + 1
+                        queue.append(end)
+        return list(visited)
+
+    def top_edges(self: Self, subnetwork: dict) -> list:
+        """Collect the nodes connected by the highest-scoring edges
+
+        Arguments:
+            subnetwork: the subnetwork index
+
+        Returns:
+            A list of node IDs, at most max_nodes long
+        """
+        selected = {}
+        for edge in subnetwork["edges"]:
+            ends = [str(edge["data"]["source"]), str(edge["data"]["target"])]
+            new = [end for end in ends if end not in selected]
+            if len(selected) + len(new) > self.max_nodes:
+                continue
+            selected.update(dict.fromkeys(new))
+            if len(selected) == self.max_nodes:
+                break
+        return list(selected)
+
+    def view(
+        self: Self,
+        network_type: str,
+        n_id: str,
+        f_id: str | None = None,
+        hops: int = 1,
+    ) -> dict:
+        """Create a cytoscape-compatible view of a subnetwork
+
+        Arguments:
+            network_type: the network algorithm
+            n_id: the subnetwork ID
+            f_id: the selected feature, to center a view of a large subnetwork on
+            hops: the neighbourhood size around the selected feature
+
+        Returns:
+            A dict with the subnetwork view and the size of the full subnetwork
+
+        Raises:
+            KeyError: subnetwork or feature not found
+        """
+        subnetwork = self.index[network_type][n_id]
+        total_nodes = len(subnetwork["nodes"])
+
+        if total_nodes <= self.max_nodes:
+            node_ids = list(subnetwork["nodes"])
+            mode = "full"
+        elif f_id is not None:
+            node_ids = self.neighbourhood(subnetwork, f_id, hops)
+            mode = "neighbourhood"
+        else:
+            node_ids = self.top_edges(subnetwork)
+            mode = "top_edges"
+
+        selected = set(node_ids)
+        edges = [
+            edge
+            for edge in subnetwork["edges"]
+            if str(edge["data"]["source"]) in selected
+            and str(edge["data"]["target"]) in selected
+        ]
+        return {
+            "network": {
+                "data": subnetwork["data"],
+                "directed": subnetwork["directed"],
+                "multigraph": subnetwork["multigraph"],
+                "elements": {
+                    "nodes": [
+                        subnetwork["nodes"][node_id]
+                        for node_id in node_ids
+                        if node_id in subnetwork["nodes"]
+                    ],
+                    "edges": edges,
+                },
+            },
+            "mode": mode,
+            "total_nodes": total_nodes,
+            "total_edges": len(subnetwork["edges"]),
+        }
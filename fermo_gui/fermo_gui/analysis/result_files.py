@@ -0,0 +1,173 @@
+"""Stores large result files of a job gzip-compressed and reads them transparently
+
+Copyright (c) 2026-present Mitja Maximilian Zdouc, PhD
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import gzip
+import json
+import os
+import shutil
+import struct
+import uuid
+from pathlib import Path
+from typing import IO, Any, ClassVar, Self
+
+from pydantic import BaseModel
+
+
+class ResultFiles(BaseModel):
+    """Locates result files of a job, which may be stored as '<name>.gz'
+
+    Session, peak table and network files compress 10-20x and are kept
+    gzip-compressed after a job finished; all other files are kept as-is.
+
+    Attributes:
+        downloads: names of result files offered for download
+        compressible: names of result files stored compressed
+        results: the results dir of the job
+    """
+
+    downloads: ClassVar[tuple[str, ...]] = (
+        "out.fermo.session.json",
+        "out.fermo.full.csv",
+        "out.fermo.abbrev.csv",
+        "out.fermo.summary.txt",
+        "out.fermo.log",
+        "out.fermo.modified_cosine.graphml",
+        "out.fermo.ms2deepscore.graphml",
+    )
+
+    compressible: ClassVar[tuple[str, ...]] = (
+        "out.fermo.session.json",
+        "out.fermo.full.csv",
+        "out.fermo.modified_cosine.graphml",
+        "out.fermo.ms2deepscore.graphml",
+    )
+
+    results: Path
+
+    @staticmethod
+    def is_compressed(path: Path) -> bool:
+        return path.suffix == ".gz"
+
+    @staticmethod
+    def open_text(path: Path, mode: str = "r") -> IO[str]:
+        """Open a plain or gzip-compressed result file in text mode
+
+        Arguments:
+            path: the path as returned by locate
+            mode: "r" to read, "w" to write
+
+        Returns:
+            A text file object
+        """
+        if ResultFiles.is_compressed(path):
+            return gzip.open(path, f"{mode}t", encoding="utf-8")
+        return path.open(mode, encoding="utf-8")
+
+    @staticmethod
+    def text_size(path: Path) -> int:
+        """Return the uncompressed size of a plain or gzip-compressed file
+
+        The size of a gzip file is read from its trailer (modulo 4 GiB).
+
+        Arguments:
+            path: the path as returned by locate
+
+        Returns:
+            The size in bytes
+        """
+        if not ResultFiles.is_compressed(path):
+            return path.stat().st_size
+        with open(path, "rb") as infile:
+            infile.seek(-4, os.SEEK_END)
+            return struct.unpack("<I", infile.read(4))[0]
+
+    @staticmethod
+    def dump_json(path: Path, data: Any):
+        """Write JSON to a plain or gzip-compressed file via a temporary file
+
+        Arguments:
+            path: the path as returned by locate
+            data: the JSON-serializable data
+        """
+        tmp_path = path.with_name(f".{uuid.uuid4().hex}.{path.name}")
+        try:
+            with ResultFiles.open_text(tmp_path, "w") as out:
+                json.dump(data, out, indent=2)
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    def locate(self: Self, name: str) -> Path | None:
+        """Find a result file in its plain or compressed form
+
+        Arguments:
+            name: the file name, e.g. "out.fermo.session.json"
+
+        Returns:
+            The path of the existing file, or None
+        """
+        for path in (
+            self.results.joinpath(name),
+            self.results.joinpath(f"{name}.gz"),
+        ):
+            if path.exists():
+                return path
+        return None
+
+    def available(self: Self) -> list[str]:
+        """Return the names of the result files offered for download that exist"""
+        return [name for name in self.downloads if self.locate(name) is not None]
+
+    def compress(self: Self, level: int = 6):
+        """Replace the compressible result files by their gzip-compressed form
+
+        The compressed file is written to a temporary file first and keeps the
+        modification time of the original.
+
+        Arguments:
+            level: the gzip compression level
+        """
+        for name in self.compressible:
+            path = self.results.joinpath(name)
+            if not path.exists():
+                continue
+
+            target = self.results.joinpath(f"{name}.gz")
+            tmp_path = target.with_name(f".{target.name}.{uuid.uuid4().hex}.tmp")
+            stat = path.stat()
+            try:
+                with (
+                    open(path, "rb") as infile,
+                    open(tmp_path, "wb") as raw,
+                    gzip.GzipFile(
+                        filename=name, mode="wb", compresslevel=level, fileobj=raw
+                    ) as out,
+                ):
+                    shutil.copyfileobj(infile, out, 1024 * 1024)
+                os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+                os.replace(tmp_path, target)
+            except BaseException:
+                tmp_path.unlink(missing_ok=True)
+                raise
+            path.unlink()
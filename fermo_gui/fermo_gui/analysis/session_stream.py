@@ -0,0 +1,183 @@
+"""Iterative reading of large fermo session files
+
+Copyright (c) 2026-present Mitja Maximilian Zdouc, PhD
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import json
+import re
+from collections.abc import Iterator
+from pathlib import Path
+from typing import IO, Any, Self
+
+from pydantic import BaseModel
+
+from fermo_gui.analysis.result_files import ResultFiles
+
+
+class _JsonReader:
+    """Buffered reader decoding one JSON value at a time from a text stream"""
+
+    whitespace = " \t\n\r"
+    number_tail = re.compile(r"[0-9.eE+-]*")
+
+    def __init__(self, infile: IO[str], chunk_size: int):
+        self.infile = infile
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, size: int) -> bool:
+        """Append the next chunk to the buffer, dropping consumed characters"""
+        if self.eof:
+            return False
+
+        chunk = self.infile.read(size)
+        if not chunk:
+            self.eof = True
+            return False
+
+        self.buffer = self.buffer[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it"""
+        while True:
+            while (
+                self.pos < len(self.buffer) and self.buffer[self.pos] in self.whitespace
+            ):
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill(self.chunk_size):
+                return ""
+
+    def expect(self, char: str):
+        """Consume the next non-whitespace character
+
+        Raises:
+            ValueError: unexpected character
+        """
+        if self.peek() != char:
+            raise ValueError(
+                f"Malformed session file: expected '{char}', found '{self.peek()}'."
+            )
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value
+
+        The read size is doubled on every incomplete attempt, so large values
+        are decoded in amortized linear time.
+
+        Raises:
+            json.JSONDecodeError: malformed JSON
+        """
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                val, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # a number followed by number characters only might be truncated,
+                # e.g. '1' of '1.52' split after '1.'
+                if self.eof or not self.number_tail.fullmatch(self.buffer, end):
+                    self.pos = end
+                    return val
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self.fill(size)
+            size = max(size, len(self.buffer) - self.pos)
+
+
+class SessionStream(BaseModel):
+    """Walks a fermo session file member by member instead of loading it whole
+
+    Attributes:
+        path: the session file, plain or gzip-compressed
+        chunk_size: number of characters read per chunk
+    """
+
+    path: Path
+    chunk_size: int = 1024 * 1024
+
+    @staticmethod
+    def matches(path: tuple, patterns: set[tuple]) -> bool:
+        """Check if a member path matches any of the patterns ('*' as wildcard)"""
+        for pattern in patterns:
+            if len(pattern) == len(path) and all(
+                p in ("*", k) for p, k in zip(pattern, path, strict=True)
+            ):
+                return True
+        return False
+
+    def walk(
+        self: Self, reader: _JsonReader, path: tuple, descend: set[tuple]
+    ) -> Iterator[tuple[tuple, Any]]:
+        """Recursively yield members, entering only the objects to descend into
+
+        An empty object that is descended into is yielded as a whole.
+
+        Arguments:
+            reader: the positioned JSON reader
+            path: the path of keys leading to the current value
+            descend: paths of objects to be walked member-wise
+
+        Yields:
+            Tuples of member path and decoded value
+        """
+        if (not path or self.matches(path, descend)) and reader.peek() == "{":
+            reader.expect("{")
+            if reader.peek() == "}":
+                reader.expect("}")
+                if path:
+                    yield path, {}
+                return
+            while True:
+                key = reader.value()
+                reader.expect(":")
+                yield from self.walk(reader, (*path, key), descend)
+                if reader.peek() == ",":
+                    reader.expect(",")
+                else:
+                    reader.expect("}")
+                    return
+        else:
+            yield path, reader.value()
+
+    def iter_members(
+        self: Self, descend: set[tuple] | None = None
+    ) -> Iterator[tuple[tuple, Any]]:
+        """Iterate over the session file, holding only one member in memory
+
+        Arguments:
+            descend: paths of objects to be walked member-wise, e.g.
+                {("samples",)} yields every sample separately. Top-level members
+                are always yielded separately.
+
+        Yields:
+            Tuples of member path and decoded value
+        """
+        with ResultFiles.open_text(self.path) as infile:
+            reader = _JsonReader(infile, self.chunk_size)
+            yield from self.walk(reader, (), descend or set())
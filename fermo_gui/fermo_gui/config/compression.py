@@ -0,0 +1,131 @@
+"""Compresses text responses for clients accepting gzip
+
+Copyright (c) 2026-present Mitja Maximilian Zdouc, PhD
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import gzip
+import mimetypes
+import zlib
+from collections.abc import Iterable, Iterator
+
+from flask import Flask, Response, request
+
+COMPRESSIBLE_TYPES = {
+    "application/graphml+xml",
+    "application/javascript",
+    "application/json",
+    "application/xml",
+    "image/svg+xml",
+}
+
+mimetypes.add_type("application/graphml+xml", ".graphml")
+mimetypes.add_type("text/plain", ".log")
+
+
+def is_compressible(response: Response) -> bool:
+    """Check if the response is a text payload"""
+    mimetype = response.mimetype or ""
+    return mimetype.startswith("text/") or mimetype in COMPRESSIBLE_TYPES
+
+
+def gzip_stream(chunks: Iterable[bytes], level: int) -> Iterator[bytes]:
+    """Compress an iterable of chunks into a gzip stream
+
+    Arguments:
+        chunks: the uncompressed chunks, e.g. a file wrapper of send_file
+        level: the compression level
+
+    Yields:
+        The compressed chunks
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        if data := compressor.compress(chunk):
+            yield data
+    yield compressor.flush()
+
+
+def compress_response(response: Response, level: int, min_size: int) -> Response:
+    """Gzip-encode a text response if the client accepts it
+
+    Files served by send_file are compressed while streaming. The ETag is made
+    weak since the encoded body differs from the file; conditional requests
+    still match, since If-None-Match uses weak comparison. Partial requests
+    are left to send_file.
+
+    Arguments:
+        response: the response to compress
+        level: the gzip compression level
+        min_size: the size in bytes below which responses are sent as-is
+
+    Returns:
+        The (compressed) response
+    """
+    if not is_compressible(response) or "Content-Encoding" in response.headers:
+        return response
+
+    response.vary.add("Accept-Encoding")
+    if request.accept_encodings.quality("gzip") <= 0 or request.range is not None:
+        return response
+
+    etag, weak = response.get_etag()
+    if etag is not None and not weak:
+        response.set_etag(etag, weak=True)
+
+    if response.status_code != 200 or (
+        response.content_length is not None and response.content_length < min_size
+    ):
+        return response
+
+    if response.direct_passthrough:
+        chunks = response.response
+        if hasattr(chunks, "close"):
+            response.call_on_close(chunks.close)
+        response.response = gzip_stream(chunks, level)
+        response.direct_passthrough = False
+        response.headers.pop("Content-Length", None)
+        response.headers.pop("Accept-Ranges", None)
+    else:
+        response.set_data(gzip.compress(response.get_data(), level))
+
+    response.headers["Content-Encoding"] = "gzip"
+    return response
+
+
+def configure_compression(app: Flask) -> Flask:
+    """Register gzip compression of text responses
+
+    Arguments:
+        app: The Flask app instance
+
+    Returns:
+        The Flask app instance with compression of responses
+    """
+
+    @app.after_request
+    def compress(response: Response) -> Response:
+        return compress_response(
+            response,
+            level=app.config.get("COMPRESS_LEVEL", 6),
+            min_size=app.config.get("COMPRESS_MIN_SIZE", 1024),
+        )
+
+    return app
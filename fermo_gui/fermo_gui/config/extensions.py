@@ -23,7 +23,11 @@ SOFTWARE.
 
 from celery import Celery, Task
 from flask import Flask
+from flask.ctx import AppContext
 from flask_mail import Mail
+from kombu import Queue
+
+from fermo_gui.processing.job_router import JobRouter
 
 mail = Mail()
 
@@ -57,8 +61,17 @@ def configure_celery(app: Flask) -> Flask:
             with app.app_context():
                 return self.run(*args, **kwargs)
 
+        def app_context(self) -> AppContext:
+            """Return an app context, for handlers running outside of a task"""
+            return app.app_context()
+
     celery_app = Celery(app.name, task_cls=FlaskTask)
     celery_app.config_from_object(app.config["CELERY"])
+    if not celery_app.conf.task_queues:
+        # a worker started without '-Q' consumes the queues of all job classes
+        celery_app.conf.task_queues = [
+            Queue(name) for name in ("celery", *JobRouter.queues.values())
+        ]
     celery_app.set_default()
     app.extensions["celery"] = celery_app
     return app
@@ -0,0 +1,512 @@
+"""Collects operational metrics and renders them in the Prometheus text format
+
+Copyright (c) 2026-present Mitja Maximilian Zdouc, PhD
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import contextlib
+import json
+import os
+import resource
+import time
+from pathlib import Path
+from typing import ClassVar, Self
+
+from celery import Celery
+from celery.signals import task_postrun
+from flask import Flask, Response, g, request
+from kombu.exceptions import ChannelError
+from pydantic import BaseModel, PrivateAttr
+
+from fermo_gui.processing.job_registry import JOB_BUCKETS
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class MetricsStore(BaseModel):
+    """Counters and histograms of one process, merged with those of others
+
+    Samples are kept as series name with labels and value, so that histograms
+    are stored as their bucket, sum and count series. Gunicorn and Celery run
+    several processes: each writes a snapshot of its samples and memory to
+    '<root>/<pid>-<start time>.json', at most once per flush_interval, and a
+    scrape of any web process merges the snapshots of all processes. The start
+    time keeps a process that reuses the PID of an exited one from overwriting
+    its snapshot. Snapshots of exited processes still count towards the
+    samples, but not the memory gauges, and are folded into one file by prune.
+
+    Attributes:
+        families: metric type and help text per metric name
+        buckets: upper bounds of the histogram buckets per metric name
+        exited_name: the file of the summed samples of exited processes
+        root: the dir of the process snapshots, or None for this process only
+        role: 'web' or 'celery'
+        flush_interval: the minimum time between snapshots in seconds
+        samples: the value per series
+    """
+
+    families: ClassVar[dict[str, tuple[str, str]]] = {
+        "fermo_http_requests_total": (
+            "counter",
+            "HTTP requests by route, method and status.",
+        ),
+        "fermo_http_request_duration_seconds": (
+            "histogram",
+            "Time to create HTTP responses by route and method.",
+        ),
+        "fermo_upload_bytes_total": (
+            "counter",
+            "Request body bytes received by route.",
+        ),
+        "fermo_session_load_seconds": (
+            "histogram",
+            "Time to load the dashboard data of a session file in task_result.",
+        ),
+        "fermo_session_bytes": (
+            "histogram",
+            "Uncompressed size of the session files loaded in task_result.",
+        ),
+        "fermo_queue_up": (
+            "gauge",
+            "Whether the Celery broker could be reached.",
+        ),
+        "fermo_queue_messages": (
+            "gauge",
+            "Jobs waiting in a Celery queue.",
+        ),
+        "fermo_jobs": (
+            "gauge",
+            "Jobs in the job registry by state, without removed jobs.",
+        ),
+        "fermo_job_duration_seconds": (
+            "histogram",
+            "Run time of finished jobs by outcome and queue.",
+        ),
+        "fermo_process_resident_memory_bytes": (
+            "gauge",
+            "Resident memory of web and Celery worker processes.",
+        ),
+        "fermo_process_peak_memory_bytes": (
+            "gauge",
+            "Peak resident memory of web and Celery worker processes.",
+        ),
+    }
+    buckets: ClassVar[dict[str, tuple[float, ...]]] = {
+        "fermo_http_request_duration_seconds": LATENCY_BUCKETS,
+        "fermo_session_load_seconds": (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+        "fermo_session_bytes": tuple(
+            size * 1024 * 1024 for size in (1, 10, 50, 100, 250, 500, 1000)
+        ),
+        "fermo_job_duration_seconds": JOB_BUCKETS,
+    }
+
+    exited_name: ClassVar[str] = "exited.json"
+
+    root: Path | None = None
+    role: str = "web"
+    flush_interval: float = 5
+    samples: dict[str, float] = {}
+    _flushed: float = PrivateAttr(default=0)
+
+    @staticmethod
+    def series(name: str, **labels: object) -> str:
+        """Create the series name of a metric with labels"""
+        if not labels:
+            return name
+        pairs = ",".join(
+            '{}="{}"'.format(
+                key,
+                str(value)
+                .replace("\\", "\\\\")
+                .replace('"', '\\"')
+                .replace("\n", "\\n"),
+            )
+            for key, value in labels.items()
+        )
+        return f"{name}{{{pairs}}}"
+
+    @classmethod
+    def histogram(cls, name: str, values: list[float], **labels: object) -> dict:
+        """Create the bucket, sum and count series of a histogram
+
+        Arguments:
+            name: the metric name, with buckets defined in 'buckets'
+            values: the observed values
+            labels: the labels of the series
+
+        Returns:
+            A dict of series and value
+        """
+        samples = {
+            cls.series(f"{name}_bucket", **labels, le=bound): sum(
+                value <= bound for value in values
+            )
+            for bound in cls.buckets[name]
+        }
+        samples[cls.series(f"{name}_bucket", **labels, le="+Inf")] = len(values)
+        samples[cls.series(f"{name}_sum", **labels)] = sum(values)
+        samples[cls.series(f"{name}_count", **labels)] = len(values)
+        return samples
+
+    @staticmethod
+    def memory() -> tuple[int, int]:
+        """Return the current and peak resident memory of the process in bytes"""
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        try:
+            with open("/proc/self/statm") as infile:
+                pages = int(infile.read().split()[1])
+            return pages * os.sysconf("SC_PAGE_SIZE"), peak
+        except (OSError, ValueError, IndexError):
+            return peak, peak
+
+    @staticmethod
+    def start_time(pid: int) -> int | None:
+        """Return the start time of a process in clock ticks after boot, if known"""
+        try:
+            with open(f"/proc/{pid}/stat") as infile:
+                # fields after the parenthesized name, starting with the third
+                return int(infile.read().rsplit(")", 1)[1].split()[19])
+        except (OSError, ValueError, IndexError):
+            return None
+
+    @classmethod
+    def is_alive(cls, pid: int, start: int | None = None) -> bool:
+        """Check if a process exists, and is the one started at start if known
+
+        Arguments:
+            pid: the process ID
+            start: the start time of the process, see start_time
+
+        Returns:
+            Bool indicating if the process is running
+        """
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return start is None or cls.start_time(pid) in (None, start)
+
+    @staticmethod
+    def snapshot_name(snapshot: dict) -> str:
+        """Create the file name of a process snapshot"""
+        return f"{snapshot['pid']}-{snapshot.get('start') or 0}.json"
+
+    @classmethod
+    def render(cls, samples: dict[str, float]) -> str:
+        """Render samples in the Prometheus text format, grouped by metric
+
+        Arguments:
+            samples: the value per series
+
+        Returns:
+            The exposition text
+        """
+        grouped = {name: [] for name in cls.families}
+        for series, value in samples.items():
+            name = series.split("{", 1)[0]
+            if name not in grouped:
+                name = name.rsplit("_", 1)[0]
+            if name in grouped:
+                grouped[name].append(f"{series} {float(value)!r}")
+
+        lines = []
+        for name, series in grouped.items():
+            if not series:
+                continue
+            metric_type, help_text = cls.families[name]
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            lines.extend(series)
+        return "\n".join(lines) + "\n"
+
+    def inc(self: Self, name: str, value: float = 1, **labels: object):
+        """Increase a counter
+
+        Arguments:
+            name: the metric name
+            value: the increment
+            labels: the labels of the series
+        """
+        series = self.series(name, **labels)
+        self.samples[series] = self.samples.get(series, 0) + value
+
+    def observe(self: Self, name: str, value: float, **labels: object):
+        """Add an observation to a histogram
+
+        Arguments:
+            name: the metric name, with buckets defined in 'buckets'
+            value: the observed value
+            labels: the labels of the series
+        """
+        for series, count in self.histogram(name, [value], **labels).items():
+            self.samples[series] = self.samples.get(series, 0) + count
+
+    def snapshot(self: Self) -> dict:
+        """Create the snapshot of the samples and memory of this process"""
+        rss, peak = self.memory()
+        return {
+            "pid": os.getpid(),
+            "start": self.start_time(os.getpid()),
+            "role": self.role,
+            "rss": rss,
+            "peak_rss": peak,
+            "samples": self.samples,
+        }
+
+    def flush(self: Self, force: bool = False):
+        """Write the snapshot of this process, unless written recently
+
+        Failure is not fatal: the snapshot is written again on the next flush.
+
+        Arguments:
+            force: write regardless of flush_interval
+        """
+        now = time.monotonic()
+        if self.root is None or (
+            not force and now - self._flushed < self.flush_interval
+        ):
+            return
+
+        self._flushed = now
+        snapshot = self.snapshot()
+        path = self.root.joinpath(self.snapshot_name(snapshot))
+        tmp_path = path.with_name(f".{path.name}")
+        with contextlib.suppress(OSError):
+            self.root.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w") as out:
+                json.dump(snapshot, out)
+            os.replace(tmp_path, path)
+
+    def read_snapshots(self: Self) -> dict[str, dict]:
+        """Read the snapshots of all processes, except exited folded ones
+
+        Returns:
+            The snapshot per file name
+        """
+        snapshots = {}
+        for path in self.root.glob("*.json") if self.root is not None else ():
+            if path.name.startswith(".") or path.name == self.exited_name:
+                continue
+            try:
+                with open(path) as infile:
+                    snapshot = json.load(infile)
+                snapshot["pid"] = int(snapshot["pid"])
+                snapshots[path.name] = snapshot
+            except (OSError, ValueError, KeyError, TypeError):
+                continue
+        return snapshots
+
+    def read_exited(self: Self) -> dict:
+        """Read the summed samples of exited processes
+
+        Returns:
+            A dict with the samples and the names of the last folded snapshots
+        """
+        try:
+            with open(self.root.joinpath(self.exited_name)) as infile:
+                exited = json.load(infile)
+            return {"samples": exited["samples"], "folded": exited["folded"]}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return {"samples": {}, "folded": []}
+
+    def collect(self: Self) -> dict[str, float]:
+        """Merge the samples of all processes and add the memory gauges
+
+        Snapshots are read before the summed samples of exited processes, so a
+        snapshot folded in the meantime is not counted twice.
+
+        Returns:
+            The value per series
+        """
+        own = self.snapshot()
+        snapshots = self.read_snapshots()
+        exited = self.read_exited()
+        for name in exited["folded"]:
+            snapshots.pop(name, None)
+        snapshots[self.snapshot_name(own)] = own
+
+        samples = dict(exited["samples"])
+        for _, snapshot in sorted(snapshots.items()):
+            for series, value in snapshot["samples"].items():
+                samples[series] = samples.get(series, 0) + value
+            if self.is_alive(snapshot["pid"], snapshot.get("start")):
+                for name, key in (
+                    ("fermo_process_resident_memory_bytes", "rss"),
+                    ("fermo_process_peak_memory_bytes", "peak_rss"),
+                ):
+                    series = self.series(
+                        name, role=snapshot["role"], pid=snapshot["pid"]
+                    )
+                    samples[series] = snapshot[key]
+        return samples
+
+    def prune(self: Self) -> int:
+        """Fold the snapshots of exited processes into one file and remove them
+
+        The folded file names are kept until the next run, when any left over
+        snapshot of them is removed without being counted again.
+
+        Returns:
+            The number of folded snapshots
+        """
+        if self.root is None:
+            return 0
+
+        exited = self.read_exited()
+        for name in exited["folded"]:
+            self.root.joinpath(name).unlink(missing_ok=True)
+
+        folded = []
+        samples = exited["samples"]
+        for name, snapshot in sorted(self.read_snapshots().items()):
+            if self.is_alive(snapshot["pid"], snapshot.get("start")):
+                continue
+            for series, value in snapshot["samples"].items():
+                samples[series] = samples.get(series, 0) + value
+            folded.append(name)
+        if not folded:
+            return 0
+
+        path = self.root.joinpath(self.exited_name)
+        tmp_path = path.with_name(f".{path.name}")
+        with open(tmp_path, "w") as out:
+            json.dump({"samples": samples, "folded": folded}, out)
+        os.replace(tmp_path, path)
+        for name in folded:
+            self.root.joinpath(name).unlink(missing_ok=True)
+        return len(folded)
+
+
+def queue_samples(celery_app: Celery) -> dict[str, float]:
+    """Count the jobs waiting in each Celery queue
+
+    A scrape must not fail if the broker is unreachable: 'fermo_queue_up' is 0
+    then and no queue sizes are reported.
+
+    Arguments:
+        celery_app: the Celery app, with the queues in 'task_queues'
+
+    Returns:
+        A dict of series and value
+    """
+    samples = {}
+    try:
+        with celery_app.connection_for_read() as conn:
+            conn.ensure_connection(max_retries=0)
+            channel = conn.default_channel
+            for queue in celery_app.conf.task_queues or ():
+                try:
+                    _, messages, _ = channel.queue_declare(queue.name, passive=True)
+                except ChannelError:
+                    # the broker drops queues without messages
+                    messages = 0
+                samples[
+                    MetricsStore.series("fermo_queue_messages", queue=queue.name)
+                ] = messages
+    except Exception:
+        return {"fermo_queue_up": 0}
+    return {"fermo_queue_up": 1, **samples}
+
+
+def job_samples(
+    states: dict[str, int],
+    durations: dict[tuple[str, str], tuple[list[int], float]],
+) -> dict[str, float]:
+    """Create the job state gauges and the job duration histograms
+
+    Arguments:
+        states: the number of jobs per state
+        durations: jobs per bucket and summed run time, by outcome and queue
+
+    Returns:
+        A dict of series and value
+    """
+    samples = {
+        MetricsStore.series("fermo_jobs", state=state): count
+        for state, count in states.items()
+    }
+    name = "fermo_job_duration_seconds"
+    for (outcome, queue), (counts, total) in sorted(durations.items()):
+        labels = {"outcome": outcome, "queue": queue}
+        jobs = 0
+        for bound, count in zip((*JOB_BUCKETS, "+Inf"), counts, strict=True):
+            jobs += count
+            samples[MetricsStore.series(f"{name}_bucket", **labels, le=bound)] = jobs
+        samples[MetricsStore.series(f"{name}_sum", **labels)] = total
+        samples[MetricsStore.series(f"{name}_count", **labels)] = jobs
+    return samples
+
+
+def configure_metrics(app: Flask) -> Flask:
+    """Register the collection of request, upload and process metrics
+
+    Arguments:
+        app: The Flask app instance
+
+    Returns:
+        The Flask app instance with a MetricsStore in 'extensions'
+    """
+    metrics = MetricsStore(root=app.config["UPLOAD_FOLDER"].joinpath(".metrics"))
+    app.extensions["metrics"] = metrics
+
+    @app.before_request
+    def start_timer():
+        g.request_start = time.perf_counter()
+
+    def observe_request(status: int):
+        # unmatched URLs share one label, to keep the number of series bounded
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        if (start := g.get("request_start")) is not None:
+            metrics.observe(
+                "fermo_http_request_duration_seconds",
+                time.perf_counter() - start,
+                route=route,
+                method=request.method,
+            )
+        metrics.inc(
+            "fermo_http_requests_total",
+            route=route,
+            method=request.method,
+            status=status,
+        )
+        if request.method in ("POST", "PUT", "PATCH") and request.content_length:
+            metrics.inc("fermo_upload_bytes_total", request.content_length, route=route)
+        g.request_observed = True
+        metrics.flush()
+
+    @app.after_request
+    def record_request(response: Response) -> Response:
+        observe_request(response.status_code)
+        return response
+
+    @app.teardown_request
+    def record_error(exc: BaseException | None):
+        # exceptions propagated to the server skip after_request
+        if exc is not None and not g.get("request_observed"):
+            observe_request(500)
+
+    @task_postrun.connect(weak=False)
+    def record_worker(**kwargs: object):
+        metrics.role = "celery"
+        metrics.flush(force=True)
+
+    return app
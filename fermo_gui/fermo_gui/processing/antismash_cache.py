@@ -0,0 +1,208 @@
+"""Shared on-disk cache of antiSMASH results
+
+Copyright (c) 2026-present Mitja Maximilian Zdouc, PhD
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import json
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Self
+
+from pydantic import BaseModel
+from werkzeug.utils import secure_filename
+
+from fermo_gui.processing.antismash_client import AntismashClient
+
+
+class AntismashCache(BaseModel):
+    """Keeps extracted antiSMASH results once per antiSMASH job ID
+
+    An entry '<root>/<as_id>/' holds the extracted archives and '.entry.json'
+    with their total size; the mtime of '.entry.json' records the last use.
+    Job dirs symlink the extracted dirs of an entry, whose files are read-only.
+    Entries are evicted least recently used first once the cache exceeds
+    max_size, unless they were used within the grace period.
+
+    The archive listing of a job ID is cached separately in
+    '<root>/<as_id>.listing.json', so repeated submissions skip the round-trip
+    to the antiSMASH server.
+
+    Attributes:
+        root: the cache dir
+        max_size: the total size of all entries in bytes before eviction
+        listing_ttl: the time in seconds a cached listing stays valid
+        grace_period: the time in seconds after use an entry is not evicted
+    """
+
+    root: Path
+    max_size: int = 10 * 1024 * 1024 * 1024
+    listing_ttl: int = 86400
+    grace_period: int = 86400
+
+    def entry_path(self: Self, as_id: str) -> Path:
+        """Return the entry dir of an antiSMASH job ID
+
+        Raises:
+            ValueError: job ID not usable as dir name
+        """
+        if not as_id or secure_filename(as_id) != as_id:
+            raise ValueError(f"Invalid antiSMASH job ID '{as_id}'.")
+        return self.root.joinpath(as_id)
+
+    def listing(self: Self, as_id: str, client: AntismashClient) -> list[str]:
+        """Return the archive names of an antiSMASH job, from cache if possible
+
+        Only non-empty listings are cached, so a job ID not yet found on the
+        server is checked again on the next request.
+
+        Arguments:
+            as_id: the antiSMASH job ID
+            client: the client to query the server with on a cache miss
+
+        Returns:
+            The archive file names, empty if the job was not found
+        """
+        path = self.root.joinpath(f"{self.entry_path(as_id).name}.listing.json")
+        try:
+            if time.time() - path.stat().st_mtime < self.listing_ttl:
+                with open(path) as infile:
+                    return json.load(infile)
+        except (FileNotFoundError, ValueError):
+            pass
+
+        zips = client.list_zips(as_id)
+        if zips:
+            self.root.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f".{uuid.uuid4().hex}.tmp")
+            with open(tmp_path, "w") as out:
+                json.dump(zips, out)
+            os.replace(tmp_path, path)
+        return zips
+
+    def fetch(self: Self, as_id: str, client: AntismashClient) -> Path:
+        """Return the entry dir of an antiSMASH job, downloading it on a miss
+
+        Downloads are extracted into a temporary dir and renamed into place,
+        so concurrent jobs with the same job ID never see partial entries.
+
+        Arguments:
+            as_id: the antiSMASH job ID
+            client: the client to download the results with
+
+        Returns:
+            The entry dir
+
+        Raises:
+            ValueError: antiSMASH job ID not found
+        """
+        entry = self.entry_path(as_id)
+        marker = entry.joinpath(".entry.json")
+        if marker.exists():
+            os.utime(marker)
+            return entry
+
+        tmp_dir = self.root.joinpath(f".{uuid.uuid4().hex}.tmp")
+        tmp_dir.mkdir(parents=True)
+        try:
+            client.download(as_id, tmp_dir, self.listing(as_id, client))
+            size = 0
+            for path in tmp_dir.rglob("*"):
+                if path.is_file():
+                    size += path.stat().st_size
+                    path.chmod(0o444)
+            with open(tmp_dir.joinpath(".entry.json"), "w") as out:
+                json.dump({"as_id": as_id, "size": size}, out)
+            try:
+                tmp_dir.rename(entry)
+            except OSError:
+                if not marker.exists():
+                    raise
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        self.evict(keep=entry)
+        return entry
+
+    def link(self: Self, as_id: str, client: AntismashClient, job_path: Path):
+        """Symlink the extracted results of an antiSMASH job into a job dir
+
+        Arguments:
+            as_id: the antiSMASH job ID
+            client: the client to download the results with on a cache miss
+            job_path: the job dir
+        """
+        entry = self.fetch(as_id, client)
+        for path in entry.iterdir():
+            if path.is_dir():
+                job_path.joinpath(path.name).symlink_to(path.resolve())
+
+    def evict(self: Self, keep: Path | None = None) -> int:
+        """Remove least recently used entries until the cache fits max_size
+
+        Also removes expired listings and leftovers of interrupted downloads.
+
+        Arguments:
+            keep: an entry dir not to remove, e.g. the one just downloaded
+
+        Returns:
+            The number of removed entries
+        """
+        if not self.root.exists():
+            return 0
+
+        cutoff = time.time() - self.grace_period
+        for path in self.root.glob(".*.tmp"):
+            try:
+                if path.lstat().st_mtime >= cutoff:
+                    continue
+                if path.is_dir() and not path.is_symlink():
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    path.unlink()
+            except FileNotFoundError:
+                continue
+        for path in self.root.glob("*.listing.json"):
+            if path.stat().st_mtime < time.time() - self.listing_ttl:
+                path.unlink(missing_ok=True)
+
+        entries = []
+        for marker in self.root.glob("*/.entry.json"):
+            try:
+                with open(marker) as infile:
+                    size = json.load(infile).get("size", 0)
+                entries.append((marker.stat().st_mtime, size, marker.parent))
+            except (FileNotFoundError, ValueError):
+                continue
+
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for last_use, size, entry in sorted(entries):
+            if total <= self.max_size or last_use >= cutoff:
+                break
+            if entry == keep:
+                continue
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            removed += 1
+        return removed
@@ -0,0 +1,164 @@
+"""Streaming download of antiSMASH results
+
+Copyright (c) 2026-present Mitja Maximilian Zdouc, PhD
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import os
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Self
+
+import requests
+from pydantic import BaseModel
+from requests.exceptions import HTTPError, Timeout
+
+
+class AntismashClient(BaseModel):
+    """Fetches the result archives of an antiSMASH job
+
+    Archives are streamed to disk in chunks, several at a time, and each one is
+    extracted as soon as its download finished while the others are still in
+    flight. Failed requests are retried with exponential backoff.
+
+    Attributes:
+        base_url: the URL of the antiSMASH job listings, ending with '/'
+        timeout: the connect and read timeout of a request in seconds
+        retries: the number of retries of a failed request
+        backoff: the wait before the first retry in seconds, doubled each time
+        chunk_size: the size of the chunks written to disk in bytes
+        max_workers: the number of concurrent downloads
+    """
+
+    base_url: str = "https://antismash.secondarymetabolites.org/upload/"
+    timeout: float = 30
+    retries: int = 3
+    backoff: float = 1.0
+    chunk_size: int = 1024 * 1024
+    max_workers: int = 4
+
+    def request(self: Self, url: str, stream: bool = False) -> requests.Response:
+        """GET a URL, retrying on timeouts, connection and server errors
+
+        Arguments:
+            url: the URL to get
+            stream: stream the response body instead of reading it
+
+        Returns:
+            The response
+
+        Raises:
+            Timeout: no response after all retries
+            ConnectionError: no connection after all retries
+            HTTPError: error status after all retries
+        """
+        for attempt in range(self.retries + 1):
+            try:
+                response = requests.get(url, timeout=self.timeout, stream=stream)
+                if response.status_code < 500:
+                    return response
+                response.raise_for_status()
+            except (Timeout, requests.ConnectionError, HTTPError):
+                if attempt == self.retries:
+                    raise
+            time.sleep(self.backoff * 2**attempt)
+
+    def list_zips(self: Self, as_id: str) -> list[str]:
+        """List the result archives of an antiSMASH job
+
+        Arguments:
+            as_id: the antiSMASH job ID
+
+        Returns:
+            The archive file names, empty if the job was not found
+        """
+        response = self.request(f"{self.base_url}{as_id}/")
+        if not response.ok:
+            return []
+        return [
+            Path(line.split('"')[1]).name
+            for line in response.text.splitlines()
+            if ".zip" in line and line.count('"') >= 2
+        ]
+
+    def fetch(self: Self, url: str, target: Path) -> Path:
+        """Stream a file to disk
+
+        Arguments:
+            url: the URL of the file
+            target: the file path to write to
+
+        Returns:
+            The target path
+
+        Raises:
+            HTTPError: file not available
+        """
+        tmp_path = target.with_name(f".{target.name}.part")
+        with self.request(url, stream=True) as response:
+            response.raise_for_status()
+            with open(tmp_path, "wb") as out:
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    out.write(chunk)
+        os.replace(tmp_path, target)
+        return target
+
+    def download(
+        self: Self, as_id: str, job_path: Path, zips: list[str] | None = None
+    ) -> list[Path]:
+        """Download and extract all result archives of an antiSMASH job
+
+        Each archive '<name>.zip' is extracted to '<job_path>/<name>' and removed.
+
+        Arguments:
+            as_id: the antiSMASH job ID
+            job_path: the job dir
+            zips: the archive names, if already listed
+
+        Returns:
+            The extracted dirs
+
+        Raises:
+            ValueError: antiSMASH job ID not found
+        """
+        zips = zips or self.list_zips(as_id)
+        if not zips:
+            raise ValueError("antiSMASH JobID not found on antiSMASH server.")
+
+        extracted = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [
+                executor.submit(
+                    self.fetch,
+                    f"{self.base_url}{as_id}/{zip_file}",
+                    job_path.joinpath(zip_file),
+                )
+                for zip_file in zips
+            ]
+            for future in as_completed(futures):
+                archive = future.result()
+                out_dir = job_path.joinpath(archive.name.split(".")[0])
+                with zipfile.ZipFile(archive, "r") as infile:
+                    infile.extractall(out_dir)
+                archive.unlink()
+                extracted.append(out_dir)
+        return extracted
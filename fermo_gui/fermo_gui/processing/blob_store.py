@@ -0,0 +1,162 @@
+"""Content-addressed storage of uploaded input files shared across jobs
+
+Copyright (c) 2026-present Mitja Maximilian Zdouc, PhD
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import hashlib
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import IO, Self
+
+from pydantic import BaseModel
+
+
+class BlobStore(BaseModel):
+    """Stores each distinct uploaded file once and links it into job dirs
+
+    Uploads are hashed while written to a temporary file, then moved to
+    '<root>/<sha256[:2]>/<sha256>' unless already present. Job dirs receive a
+    hardlink (a copy if the filesystem does not support hardlinks), so the
+    filepaths in the job parameters stay regular files for fermo_core. A blob is
+    unused once its link count drops to one, i.e. all linking job dirs were
+    removed.
+
+    Attributes:
+        root: the dir holding the blobs
+        chunk_size: number of bytes read per chunk
+        grace_period: age in seconds below which unused blobs and temporary files
+            are kept, to not interfere with ongoing uploads
+    """
+
+    root: Path
+    chunk_size: int = 1024 * 1024
+    grace_period: int = 3600
+
+    @property
+    def tmp_dir(self: Self) -> Path:
+        return self.root.joinpath("tmp")
+
+    def blob_path(self: Self, sha256: str) -> Path:
+        return self.root.joinpath(sha256[:2], sha256)
+
+    def store(self: Self, stream: IO[bytes]) -> Path:
+        """Write a stream to the store, hashing it on the way
+
+        Arguments:
+            stream: a binary file object, read from its current position
+
+        Returns:
+            The path of the blob
+        """
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.tmp_dir.joinpath(f"{os.getpid()}.{time.time_ns()}")
+        sha = hashlib.sha256()
+        try:
+            with open(tmp_path, "wb") as out:
+                for chunk in iter(lambda: stream.read(self.chunk_size), b""):
+                    sha.update(chunk)
+                    out.write(chunk)
+
+            blob = self.blob_path(sha.hexdigest())
+            if blob.exists():
+                os.utime(blob)
+            else:
+                blob.parent.mkdir(exist_ok=True)
+                tmp_path.chmod(0o444)
+                os.replace(tmp_path, blob)
+            return blob
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    def adopt(self: Self, path: Path) -> Path:
+        """Move a file on the same filesystem into the store
+
+        Arguments:
+            path: the file to move, removed if its content is already stored
+
+        Returns:
+            The path of the blob
+        """
+        sha = hashlib.sha256()
+        with open(path, "rb") as infile:
+            for chunk in iter(lambda: infile.read(self.chunk_size), b""):
+                sha.update(chunk)
+
+        blob = self.blob_path(sha.hexdigest())
+        if blob.exists():
+            os.utime(blob)
+            path.unlink()
+        else:
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            path.chmod(0o444)
+            os.replace(path, blob)
+        return blob
+
+    @staticmethod
+    def link(blob: Path, target: Path):
+        """Hardlink a blob to the target location, or copy it
+
+        Arguments:
+            blob: the path of the blob
+            target: the file path in the job dir
+        """
+        try:
+            os.link(blob, target)
+        except OSError:
+            shutil.copyfile(blob, target)
+
+    def save(self: Self, stream: IO[bytes], target: Path) -> Path:
+        """Store a stream and link it to the target location
+
+        Arguments:
+            stream: a binary file object, e.g. FileStorage.stream of an upload
+            target: the file path in the job dir
+
+        Returns:
+            The path of the blob, named after the sha256 hash of the content
+        """
+        blob = self.store(stream)
+        self.link(blob, target)
+        return blob
+
+    def collect_garbage(self: Self) -> int:
+        """Remove blobs no longer linked from any job dir and stale temporary files
+
+        Returns:
+            The number of removed files
+        """
+        if not self.root.exists():
+            return 0
+
+        cutoff = time.time() - self.grace_period
+        removed = 0
+        for path in self.root.glob("*/*"):
+            try:
+                stat = path.stat()
+                unused = path.parent == self.tmp_dir or stat.st_nlink <= 1
+                if unused and stat.st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        return removed
@@ -0,0 +1,242 @@
+"""Resumable uploads of large input files in checksummed chunks
+
+Copyright (c) 2026-present Mitja Maximilian Zdouc, PhD
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import IO, Self
+
+from pydantic import BaseModel, Field
+from werkzeug.utils import secure_filename
+
+from fermo_gui.processing.blob_store import BlobStore
+
+
+class ChunkedUpload(BaseModel):
+    """An upload assembled from chunks sent in order, one request each
+
+    Chunks are appended to '<root>/<upload_id>.part'; the number of bytes
+    received is the size of that file, so an interrupted upload resumes from
+    there. A chunk is written under an exclusive lock and discarded if its
+    checksum does not match. Once complete, the file is moved into the blob
+    store and also linked as '<root>/<upload_id>.blob', which keeps the blob
+    until the upload expires.
+
+    Attributes:
+        root: the dir holding uploads in progress
+        upload_id: the upload ID, as created by create
+    """
+
+    root: Path
+    upload_id: str = Field(pattern=r"^[0-9a-f]{32}$")
+
+    @property
+    def state_path(self: Self) -> Path:
+        return self.root.joinpath(f"{self.upload_id}.json")
+
+    @property
+    def part_path(self: Self) -> Path:
+        return self.root.joinpath(f"{self.upload_id}.part")
+
+    @property
+    def blob_link(self: Self) -> Path:
+        return self.root.joinpath(f"{self.upload_id}.blob")
+
+    @classmethod
+    def create(cls, root: Path, filename: str, size: int) -> "ChunkedUpload":
+        """Register a new upload
+
+        Arguments:
+            root: the dir holding uploads in progress
+            filename: the name of the uploaded file
+            size: the size of the file in bytes
+
+        Returns:
+            A ChunkedUpload instance
+
+        Raises:
+            ValueError: invalid file name or size
+        """
+        if not secure_filename(filename) or size <= 0:
+            raise ValueError("Invalid file name or size.")
+
+        root.mkdir(parents=True, exist_ok=True)
+        upload = cls(root=root, upload_id=uuid.uuid4().hex)
+        upload.part_path.touch()
+        upload.write_state(
+            {
+                "filename": secure_filename(filename),
+                "size": size,
+                "blob": None,
+                "created": time.time(),
+            }
+        )
+        return upload
+
+    def read_state(self: Self) -> dict:
+        """Read the upload state
+
+        Raises:
+            FileNotFoundError: unknown upload ID
+        """
+        with open(self.state_path) as infile:
+            return json.load(infile)
+
+    def write_state(self: Self, state: dict):
+        tmp_path = self.state_path.with_name(f".{self.state_path.name}.tmp")
+        with open(tmp_path, "w") as out:
+            json.dump(state, out)
+        os.replace(tmp_path, self.state_path)
+
+    def status(self: Self) -> dict:
+        """Summarize the upload progress
+
+        Returns:
+            A dict with upload ID, file name, size, bytes received and completion
+
+        Raises:
+            FileNotFoundError: unknown upload ID
+        """
+        state = self.read_state()
+        complete = state["blob"] is not None
+        return {
+            "upload_id": self.upload_id,
+            "filename": state["filename"],
+            "size": state["size"],
+            "received": state["size"] if complete else self.part_path.stat().st_size,
+            "complete": complete,
+        }
+
+    def append(
+        self: Self,
+        stream: IO[bytes],
+        offset: int,
+        sha256: str | None,
+        blobs: BlobStore,
+        max_size: int | None = None,
+    ) -> dict:
+        """Append a chunk, completing the upload if all bytes were received
+
+        The chunk is counted while it is written, since a request body streamed
+        with chunked transfer encoding has no declared length.
+
+        Arguments:
+            stream: the chunk, e.g. the request body stream
+            offset: the position of the chunk in the file
+            sha256: the expected hex digest of the chunk, or None
+            blobs: the blob store receiving the completed file
+            max_size: the maximum size of a chunk in bytes, or None
+
+        Returns:
+            The upload status
+
+        Raises:
+            FileNotFoundError: unknown upload ID
+            BlockingIOError: another chunk of the upload is being written
+            ValueError: offset not at received bytes, checksum mismatch or
+                chunk exceeding the file size or max_size
+        """
+        state = self.read_state()
+        if state["blob"] is not None:
+            return self.status()
+
+        with open(self.part_path, "r+b") as out:
+            fcntl.flock(out, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            out.seek(0, os.SEEK_END)
+            if out.tell() != offset:
+                raise ValueError(f"Expected offset {out.tell()}, got {offset}.")
+
+            limit = state["size"] - offset
+            if max_size is not None:
+                limit = min(limit, max_size)
+
+            sha = hashlib.sha256()
+            written = 0
+            for chunk in iter(lambda: stream.read(1024 * 1024), b""):
+                written += len(chunk)
+                if written > limit:
+                    out.truncate(offset)
+                    raise ValueError("Chunk rejected: size exceeds file or chunk size.")
+                sha.update(chunk)
+                out.write(chunk)
+
+            if sha256 is not None and sha.hexdigest() != sha256.lower():
+                out.truncate(offset)
+                raise ValueError("Chunk rejected: checksum mismatch.")
+            received = out.tell()
+        os.utime(self.state_path)
+
+        if received == state["size"]:
+            blob = blobs.adopt(self.part_path)
+            BlobStore.link(blob, self.blob_link)
+            state["blob"] = blob.name
+            self.write_state(state)
+
+        return self.status()
+
+    def blob(self: Self, blobs: BlobStore) -> tuple[str, Path]:
+        """Return the file name and blob of a completed upload
+
+        Arguments:
+            blobs: the blob store holding the completed file
+
+        Returns:
+            A tuple of file name and blob path
+
+        Raises:
+            FileNotFoundError: unknown upload ID
+            RuntimeError: upload incomplete
+        """
+        state = self.read_state()
+        if state["blob"] is None:
+            raise RuntimeError(f"Upload of file '{state['filename']}' is incomplete.")
+        return state["filename"], blobs.blob_path(state["blob"])
+
+    @staticmethod
+    def collect_garbage(root: Path, max_age: int = 86400) -> int:
+        """Remove uploads older than max_age seconds
+
+        Arguments:
+            root: the dir holding uploads in progress
+            max_age: the age in seconds after which uploads expire
+
+        Returns:
+            The number of removed files
+        """
+        if not root.exists():
+            return 0
+
+        cutoff = time.time() - max_age
+        removed = 0
+        for path in root.iterdir():
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        return removed
@@ -21,21 +21,25 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
+import contextlib
+import copy
+import hashlib
 import json
 import logging
 import os
 import shutil
+import sqlite3
 import uuid
-import zipfile
 from datetime import datetime
+from functools import lru_cache
+from importlib import metadata
 from pathlib import Path
 from typing import Any
 
 import jsonschema
-import pandas as pd
-import requests
-from celery import shared_task
-from celery.exceptions import SoftTimeLimitExceeded
+from celery import Task, shared_task
+from celery.exceptions import SoftTimeLimitExceeded, TimeLimitExceeded
+from celery.signals import task_failure
 from fermo_core.input_output.class_parameter_manager import ParameterManager
 from fermo_core.input_output.class_validation_manager import ValidationManager
 from fermo_core.input_output.param_handlers import (
@@ -72,12 +76,25 @@ from flask import (
     url_for,
 )
 from flask_mail import Message
-from pydantic import BaseModel
-from requests.exceptions import Timeout
+from pydantic import BaseModel, ValidationError
+from requests.exceptions import RequestException
 from werkzeug.datastructures import FileStorage
 from werkzeug.utils import secure_filename
 
+from fermo_gui.analysis.dashboard_cache import DashboardCache
+from fermo_gui.analysis.result_files import ResultFiles
+from fermo_gui.analysis.session_stream import SessionStream
 from fermo_gui.config.extensions import mail
+from fermo_gui.processing.antismash_cache import AntismashCache
+from fermo_gui.processing.antismash_client import AntismashClient
+from fermo_gui.processing.blob_store import BlobStore
+from fermo_gui.processing.chunked_upload import ChunkedUpload
+from fermo_gui.processing.job_estimator import JobEstimator
+from fermo_gui.processing.job_index import JobIndex
+from fermo_gui.processing.job_metrics import JobMetrics
+from fermo_gui.processing.job_registry import JobRegistry
+from fermo_gui.processing.job_router import JobRouter
+from fermo_gui.processing.preflight import Preflight
 
 
 class JobManager(BaseModel):
@@ -89,6 +106,7 @@ class JobManager(BaseModel):
         job_id: the job uuid
         base: the resolved path where __init__.py resides
         root_url: the root url to construct the correct path
+        sess_schema: Path to the session file JSON Schema
     """
 
     params: dict
@@ -96,6 +114,7 @@ class JobManager(BaseModel):
     job_id: str
     base: str
     root_url: str
+    sess_schema: Path = Path(__file__).parent.parent.joinpath("schema.json")
 
     def email_fail(self):
         """Notify user that job failed"""
@@ -128,51 +147,35 @@ class JobManager(BaseModel):
         mail.send(msg)
 
     def download_antismash_job(self):
-        """Download antiSMASH job from antiSMASH website
+        """Link antiSMASH job results from the shared cache, downloading on a miss
 
         Raises:
             ValueError: antiSMASH JobID not found
-            RuntimeError: timeout of connection
+            RuntimeError: connection failed after retries
         """
         as_id = self.params["AsResultsParameters"].get("job_id")
         if not as_id:
             return
 
         try:
-            url = f"https://antismash.secondarymetabolites.org/upload/{as_id}/"
-            response = requests.get(url, timeout=5)
-            zips = [
-                line.split('"')[1]
-                for line in response.text.splitlines()
-                if ".zip" in line
-            ]
-
-            if not zips:
-                raise ValueError("antiSMASH JobID not found on antiSMASH server.")
-            else:
-                for zip_file in zips:
-                    response = requests.get(os.path.join(url, zip_file), timeout=120)
-
-                    job_path = Path(self.base).joinpath(f"upload/{self.job_id}")
-                    with open(job_path.joinpath(f"{zip_file}"), "wb") as f:
-                        f.write(response.content)
-
-                    with zipfile.ZipFile(job_path.joinpath(f"{zip_file}"), "r") as out:
-                        out.extractall(job_path.joinpath(f"{zip_file.split('.')[0]}"))
-
-                    if not Path(
-                        self.params["AsResultsParameters"].get("directory_path")
-                    ).exists():
-                        raise FileNotFoundError(
-                            "AntiSMASH results were not downloaded in the expected location - TERMINATE"
-                        )
-
-                    os.remove(job_path.joinpath(f"{zip_file}"))
+            AntismashCache(
+                root=Path(self.base).joinpath("upload/.antismash"),
+                max_size=current_app.config.get("ANTISMASH_CACHE_SIZE"),
+            ).link(
+                as_id,
+                AntismashClient(
+                    base_url=current_app.config.get("ANTISMASH_URL"),
+                    max_workers=current_app.config.get("ANTISMASH_WORKERS", 4),
+                ),
+                Path(self.base).joinpath(f"upload/{self.job_id}"),
+            )
+        except RequestException as e:
+            raise RuntimeError(f"Connection to antiSMASH server failed: {e!s}") from e
 
-        except Timeout as e:
-            raise RuntimeError(
-                f"Connection to antiSMASH server timed out: {e!s}"
-            ) from e
+        if not Path(self.params["AsResultsParameters"].get("directory_path")).exists():
+            raise FileNotFoundError(
+                "AntiSMASH results were not downloaded in the expected location - TERMINATE"
+            )
 
     def configure_logger(self) -> logging.Logger:
         """Set up logging parameters"""
@@ -191,15 +194,115 @@ class JobManager(BaseModel):
         logger.addHandler(file_handler)
         return logger
 
-    def write_job_counter(self):
-        """Write job ID to disk"""
-        location = Path(self.base).joinpath("job_counter.txt")
+    def write_failure(self, msg: str):
+        """Write the reason of the job failure to the results dir
+
+        Arguments:
+            msg: the error message
+        """
+        with open(
+            Path(self.base).joinpath(f"upload/{self.job_id}/results/out.failed.txt"),
+            "w",
+        ) as f:
+            f.write(msg)
+
+    def update_status(self, state: str, **kwargs: Any):
+        """Record a state transition in the job registry
+
+        Errors of the registry are logged and do not fail the job.
+
+        Arguments:
+            state: the new job state
+            kwargs: further arguments of JobRegistry.transition
+        """
+        if state in ("succeeded", "failed"):
+            results = Path(self.base).joinpath(f"upload/{self.job_id}/results")
+            kwargs["results"] = ResultFiles(results=results).available()
+            kwargs["result_bytes"] = JobRegistry.dir_size(results)
+        try:
+            JobRegistry(
+                path=Path(self.base).joinpath("upload/.jobs.sqlite3")
+            ).transition(self.job_id, state, **kwargs)
+        except sqlite3.Error as e:
+            current_app.logger.warning(
+                f"Could not record state '{state}' of job '{self.job_id}': {e!s}"
+            )
+
+    def store_metrics(self, metrics: JobMetrics, outcome: str):
+        """Write the stage measurements to the results dir and the job registry
+
+        Only a sample of jobs is recorded in the registry, see
+        METRICS_SAMPLE_RATE, selected by the hash of the job ID. Failure is not
+        fatal.
 
-        if not location.exists():
+        Arguments:
+            metrics: the measured stages
+            outcome: 'succeeded' or 'failed'
+        """
+        logger = logging.getLogger("fermo_core")
+        summary = metrics.summary(self.job_id, outcome)
+        try:
+            ResultFiles.dump_json(
+                Path(self.base).joinpath(
+                    f"upload/{self.job_id}/results/out.fermo.metrics.json"
+                ),
+                summary,
+            )
+        except OSError as e:
+            logger.warning(f"Could not write job metrics: {e!s}")
+
+        sample = int(hashlib.sha256(self.job_id.encode()).hexdigest()[:8], 16)
+        if sample / 0x100000000 >= current_app.config.get("METRICS_SAMPLE_RATE", 1.0):
             return
+        try:
+            JobRegistry(
+                path=Path(self.base).joinpath("upload/.jobs.sqlite3")
+            ).record_metrics(self.job_id, summary)
+        except sqlite3.Error as e:
+            current_app.logger.warning(
+                f"Could not record metrics of job '{self.job_id}': {e!s}"
+            )
+
+    def compress_results(self):
+        """Store the large result files gzip-compressed
+
+        Failure is not fatal: result files are served in either form.
+        """
+        logger = logging.getLogger("fermo_core")
+        try:
+            ResultFiles(
+                results=Path(self.base).joinpath(f"upload/{self.job_id}/results")
+            ).compress(level=current_app.config.get("COMPRESS_LEVEL", 6))
+        except OSError as e:
+            logger.warning(f"Could not compress result files: {e!s}")
+
+    def extract_parameters(self):
+        """Store the parameters of the session file in a sidecar file
 
-        with open(location, "a") as f:
-            f.write(f"{self.job_id}\n")
+        Failure is not fatal: the parameters are extracted again on demand.
+        """
+        logger = logging.getLogger("fermo_core")
+        try:
+            InputParser.read_parameters(
+                Path(self.base).joinpath(f"upload/{self.job_id}/results"),
+                self.sess_schema,
+            )
+        except (OSError, RuntimeError, ValueError) as e:
+            logger.warning(f"Could not extract session parameters: {e!s}")
+
+    def build_dashboard(self):
+        """Prepare the dashboard data once, to be served by the results page
+
+        Failure is not fatal: the results page rebuilds the data on demand.
+        """
+        logger = logging.getLogger("fermo_core")
+        try:
+            DashboardCache(
+                results=Path(self.base).joinpath(f"upload/{self.job_id}/results"),
+                engine=current_app.config.get("DASHBOARD_ENGINE", "python"),
+            ).build()
+        except Exception as e:
+            logger.warning(f"Could not prepare dashboard data: {e!s}")
 
     def run_fermo(self):
         """Run fermo_core on the respective job id
@@ -237,31 +340,84 @@ def start_job(job_id: str, email: str | None, base: str, root_url: str) -> bool:
     with open(job_path.joinpath(f"{job_id}.parameters.json")) as infile:
         params = json.load(infile)
 
-    def _write_fail_file(m: str):
-        with open(job_path.joinpath(f"results/out.failed.txt"), "w") as f:
-            f.write(m)
-
     manager = JobManager(
         params=params, job_id=job_id, email=email, base=base, root_url=root_url
     )
+    stages = (
+        ("antismash", manager.download_antismash_job),
+        ("fermo", manager.run_fermo),
+        ("compress", manager.compress_results),
+        ("parameters", manager.extract_parameters),
+        ("dashboard", manager.build_dashboard),
+        ("email", manager.email_success),
+    )
+    metrics = JobMetrics()
     try:
-        manager.download_antismash_job()
-        manager.run_fermo()
-        manager.write_job_counter()
-        manager.email_success()
+        for num, (stage, step) in enumerate(stages):
+            manager.update_status("running", stage=stage, progress=num / len(stages))
+            with metrics.measure(stage):
+                step()
+        manager.store_metrics(metrics, "succeeded")
+        manager.update_status("succeeded", progress=1.0, peak_rss=metrics.peak_rss())
         return True
     except SoftTimeLimitExceeded as e:
         msg = f"Job {job_id} surpassed maximum time limit and was terminated: {e!s}"
-        _write_fail_file(msg)
+        manager.write_failure(msg)
+        manager.store_metrics(metrics, "failed")
+        manager.update_status("failed", error=msg)
         manager.email_fail()
         raise
     except Exception as e:
         msg = f"Job {job_id} encountered an error and was terminated: {e!s}"
-        _write_fail_file(msg)
+        manager.write_failure(msg)
+        manager.store_metrics(metrics, "failed")
+        manager.update_status("failed", error=msg)
         manager.email_fail()
         raise
 
 
+@task_failure.connect
+def fail_killed_job(
+    sender: Task, exception: BaseException, kwargs: dict, **extra: object
+):
+    """Mark a job failed that was killed at the hard time limit
+
+    A killed job cannot record its failure itself; this handler runs in the
+    parent process of the worker pool instead.
+
+    Arguments:
+        sender: the failed task
+        exception: the exception the task failed with
+        kwargs: the keyword arguments of the task
+        extra: further arguments of the signal
+    """
+    if sender.name != start_job.name or not isinstance(exception, TimeLimitExceeded):
+        return
+
+    with sender.app_context():
+        manager = JobManager(params={}, **kwargs)
+        try:
+            record = JobRegistry(
+                path=Path(manager.base).joinpath("upload/.jobs.sqlite3")
+            ).get(manager.job_id)
+        except sqlite3.Error:
+            record = None
+        if record is not None and record["state"] == "failed":
+            return
+
+        msg = (
+            f"Job {manager.job_id} surpassed maximum time limit and was killed: "
+            f"{exception!s}"
+        )
+        current_app.logger.error(msg)
+        try:
+            manager.write_failure(msg)
+        except OSError as e:
+            current_app.logger.error(f"Could not write failure file: {e!s}")
+        manager.update_status("failed", error=msg)
+        manager.email_fail()
+
+
 class InputParser(BaseModel):
     """Converts raw user input into parameters file
 
@@ -271,6 +427,8 @@ class InputParser(BaseModel):
         params: the default params, to be updated
         uploads: the Path to the uploads dir
         sess_schema: Path to the session file JSON Schema
+        input_hashes: sha256 hash per saved input file or dir path
+        preflight: the pre-flight scan results per parameter key
     """
 
     uuid: str = str(uuid.uuid4())
@@ -278,6 +436,8 @@ class InputParser(BaseModel):
     params: dict
     uploads: Path
     sess_schema: Path = Path(__file__).parent.parent.joinpath("schema.json")
+    input_hashes: dict[str, str] = {}
+    preflight: dict = {}
 
     def return_error(self) -> str:
         """Default error redirect"""
@@ -300,6 +460,163 @@ class InputParser(BaseModel):
             else:
                 self.uuid = str(uuid.uuid4())
 
+    @staticmethod
+    @lru_cache(maxsize=4)
+    def session_validator(
+        schema_path: Path, member: str | None = None
+    ) -> jsonschema.protocols.Validator:
+        """Compile the validator of the session file JSON Schema once per process
+
+        Arguments:
+            schema_path: the session file JSON Schema
+            member: a top-level member of the session file, to validate only
+                this member against its sub-schema
+
+        Returns:
+            A jsonschema validator instance
+        """
+        with open(schema_path) as infile:
+            schema = json.load(infile)
+        if member is not None:
+            schema = {"$schema": schema["$schema"], **schema["properties"][member]}
+        validator_cls = jsonschema.validators.validator_for(schema)
+        validator_cls.check_schema(schema)
+        return validator_cls(schema)
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def validated_parameters(
+        session_path: Path, sha256: str, schema_path: Path
+    ) -> dict:
+        """Validate a session file and migrate legacy parameter keys
+
+        Memoized per process and file content; the session file is only rewritten
+        if legacy keys were found.
+
+        Arguments:
+            session_path: the session file, plain or gzip-compressed
+            sha256: the hash of the session file, to key the memo
+            schema_path: the session file JSON Schema
+
+        Returns:
+            The parameters of the session file
+
+        Raises:
+            jsonschema.exceptions.ValidationError: invalid session file format
+        """
+        with ResultFiles.open_text(session_path) as infile:
+            session = json.load(infile)
+
+        validator = InputParser.session_validator(schema_path)
+        if error := jsonschema.exceptions.best_match(validator.iter_errors(session)):
+            raise error
+
+        legacy_keys = set(session.get("parameters"))
+        session = InputParser.update_keys(session)
+        if set(session.get("parameters")) != legacy_keys:
+            ResultFiles.dump_json(session_path, session)
+
+        return session.get("parameters")
+
+    @staticmethod
+    def parameters_path(results: Path) -> Path:
+        return results.joinpath("out.fermo.parameters.json")
+
+    @staticmethod
+    def write_parameters(results: Path, session_path: Path, parameters: dict):
+        """Store the parameters in a sidecar file, unless it is up to date
+
+        Arguments:
+            results: the results dir of the job
+            session_path: the session file the parameters were taken from
+            parameters: the parameters of the session file
+        """
+        sidecar = InputParser.parameters_path(results)
+        if (
+            not sidecar.exists()
+            or sidecar.stat().st_mtime_ns < session_path.stat().st_mtime_ns
+        ):
+            ResultFiles.dump_json(sidecar, parameters)
+
+    @staticmethod
+    def check_parameters(parameters: object, schema_path: Path):
+        """Validate the parameters block against its sub-schema
+
+        Arguments:
+            parameters: the parameters of a session file
+            schema_path: the session file JSON Schema
+
+        Raises:
+            RuntimeError: invalid parameters format
+        """
+        validator = InputParser.session_validator(schema_path, "parameters")
+        if error := jsonschema.exceptions.best_match(validator.iter_errors(parameters)):
+            raise RuntimeError(
+                "Incorrect FERMO session file formatting: 'parameters': "
+                f"{str(error).splitlines()[0]}"
+            )
+
+    @staticmethod
+    def read_parameters(results: Path, schema_path: Path) -> dict:
+        """Read the parameters of a session without loading the session file
+
+        Uses the sidecar file if it is up to date and valid; otherwise the session
+        file is read iteratively up to its parameters, which are validated and
+        then stored in the sidecar file.
+
+        Arguments:
+            results: the results dir of the job
+            schema_path: the session file JSON Schema
+
+        Returns:
+            The parameters of the session file, legacy keys converted
+
+        Raises:
+            FileNotFoundError: session file not found
+            RuntimeError: no or invalid parameters in session file
+        """
+        session_path = ResultFiles(results=results).locate("out.fermo.session.json")
+        if session_path is None:
+            raise FileNotFoundError(
+                f"Could not find session ID on server: {results.parent.name}"
+            )
+
+        sidecar = InputParser.parameters_path(results)
+        if (
+            sidecar.exists()
+            and sidecar.stat().st_mtime_ns >= session_path.stat().st_mtime_ns
+        ):
+            with open(sidecar) as infile:
+                parameters = json.load(infile)
+            with contextlib.suppress(RuntimeError):
+                InputParser.check_parameters(parameters, schema_path)
+                return parameters
+
+        for path, value in SessionStream(path=session_path).iter_members():
+            if path == ("parameters",):
+                InputParser.check_parameters(value, schema_path)
+                parameters = InputParser.update_keys({"parameters": value})
+                ResultFiles.dump_json(sidecar, parameters["parameters"])
+                return parameters["parameters"]
+
+        raise RuntimeError(
+            "Incorrect FERMO session file formatting: 'parameters' is a required "
+            "property"
+        )
+
+    def apply_parameters(self, parameters: dict):
+        """Write parameters from a session file to self
+
+        Arguments:
+            parameters: the parameters of the session file
+        """
+        for key, val in copy.deepcopy(parameters).items():
+            if key in self.params:
+                if val.get("activate_module"):
+                    self.params[key] = val
+                else:
+                    self.params[key]["activate_module"] = False
+
     @staticmethod
     def update_keys(session: dict) -> dict:
         """Converts legacy parameter keys to current format"""
@@ -361,7 +678,8 @@ class InputParser(BaseModel):
     def check_session_id(self, s_id: str) -> None:
         """Check if job ID exists and sanitize the session file
 
-        Also writes parameters from session file to self
+        Also writes parameters from session file to self. Validation is memoized
+        per file content, and the file is only rewritten to migrate legacy keys.
 
         Args:
             s_id: a FERMO session UID
@@ -370,33 +688,49 @@ class InputParser(BaseModel):
             FileNotFoundError: session ID not found
             RunTimeError: invalid session file format
         """
-        session_path = self.uploads.joinpath(f"{s_id}/results/out.fermo.session.json")
-        with open(self.sess_schema) as infile:
-            schema = json.load(infile)
+        results = self.uploads.joinpath(f"{s_id}/results")
+        session_path = ResultFiles(results=results).locate("out.fermo.session.json")
+        if session_path is None:
+            raise FileNotFoundError(f"Could not find session ID on server: {s_id}")
 
         try:
-            if session_path.exists():
-                with open(session_path) as infile:
-                    session = json.load(infile)
-
-                jsonschema.validate(instance=session, schema=schema)
-                session = self.update_keys(session)
-
-                for key, val in session.get("parameters").items():
-                    if key in self.params:
-                        if val.get("activate_module"):
-                            self.params[key] = val
-                        else:
-                            self.params[key]["activate_module"] = False
-
-                with open(session_path, "w") as out:
-                    json.dump(session, out, indent=2)
-            else:
-                raise FileNotFoundError(f"Could not find session ID on server: {s_id}")
+            parameters = self.validated_parameters(
+                session_path, DashboardCache.hash_file(session_path), self.sess_schema
+            )
         except jsonschema.exceptions.ValidationError as e:
             msg = f"Incorrect FERMO session file formatting: {str(e).splitlines()[0]}"
             raise RuntimeError(msg) from e
 
+        self.write_parameters(results, session_path, parameters)
+        self.apply_parameters(parameters)
+
+    def chunked_uploads(self, blobs: BlobStore) -> dict[str, list[tuple[str, Path]]]:
+        """Resolve the completed chunked uploads referenced in the form data
+
+        Arguments:
+            blobs: the blob store holding the completed files
+
+        Returns:
+            The file names and blobs per file field
+
+        Raises:
+            RuntimeError: unknown or incomplete upload
+        """
+        uploads = {}
+        for key, value in self.data.items():
+            if not key.endswith("Upload") or not value:
+                continue
+            f_id = key.removesuffix("Upload")
+            for upload_id in str(value).split(","):
+                try:
+                    upload = ChunkedUpload(
+                        root=self.uploads / ".chunks", upload_id=upload_id.strip()
+                    )
+                    uploads.setdefault(f_id, []).append(upload.blob(blobs))
+                except (ValidationError, FileNotFoundError) as e:
+                    raise RuntimeError(f"Unknown upload ID '{upload_id}'.") from e
+        return uploads
+
     def save_files(self, files: Any):
         """Save the input files
 
@@ -408,24 +742,42 @@ class InputParser(BaseModel):
 
         Notes:
             speclibs must be parsed separately; else, only one speclibfile is stored
+            files are kept once in the blob store and hardlinked into the job dir
+            files sent as chunked uploads are referenced as '<field>Upload'
 
         """
         save_path = self.uploads / self.uuid
         save_path_speclib = self.uploads / self.uuid / "spec_lib"
+        blobs = BlobStore(root=self.uploads / ".blobs")
 
         try:
+            chunked = self.chunked_uploads(blobs)
             speclibs = files.getlist("SpecLibParametersFiles")
-            if any(secure_filename(f.filename) for f in speclibs):
+            if any(secure_filename(f.filename) for f in speclibs) or chunked.get(
+                "SpecLibParametersFiles"
+            ):
                 save_path_speclib.mkdir()
                 self.params["SpecLibParameters"]["dirpath"] = str(save_path_speclib)
+                speclib_hashes = []
                 for file in speclibs:
                     size = self.determine_file_size(file)
                     if size == 0:
                         continue
                     self.valid_file_size(size, secure_filename(file.filename))
-                    file.save(
-                        save_path_speclib.joinpath(secure_filename(file.filename))
+                    blob = blobs.save(
+                        file.stream,
+                        save_path_speclib.joinpath(secure_filename(file.filename)),
+                    )
+                    speclib_hashes.append(
+                        f"{secure_filename(file.filename)}:{blob.name}"
                     )
+                for filename, blob in chunked.pop("SpecLibParametersFiles", []):
+                    self.valid_file_size(blob.stat().st_size, filename)
+                    BlobStore.link(blob, save_path_speclib.joinpath(filename))
+                    speclib_hashes.append(f"{filename}:{blob.name}")
+                self.input_hashes[str(save_path_speclib)] = hashlib.sha256(
+                    "\n".join(sorted(speclib_hashes)).encode("utf-8")
+                ).hexdigest()
 
             for f_id in files:
                 file = files.get(f_id)
@@ -435,11 +787,22 @@ class InputParser(BaseModel):
                 self.valid_file_size(size, secure_filename(file.filename))
                 if f_id == "SpecLibParametersFiles":
                     continue
-                file.save(save_path.joinpath(secure_filename(file.filename)))
+                filepath = save_path.joinpath(secure_filename(file.filename))
+                blob = blobs.save(file.stream, filepath)
+                self.input_hashes[str(filepath)] = blob.name
                 key = f_id.removesuffix("File")
-                self.params[key]["filepath"] = str(
-                    save_path.joinpath(secure_filename(file.filename))
-                )
+                self.params[key]["filepath"] = str(filepath)
+
+            for f_id, uploads in chunked.items():
+                key = f_id.removesuffix("File")
+                if key not in self.params:
+                    continue
+                filename, blob = uploads[-1]
+                self.valid_file_size(blob.stat().st_size, filename)
+                filepath = save_path.joinpath(filename)
+                BlobStore.link(blob, filepath)
+                self.input_hashes[str(filepath)] = blob.name
+                self.params[key]["filepath"] = str(filepath)
 
         except Exception as e:
             msg = f"An error occurred during the upload file storage: {e!s}"
@@ -725,58 +1088,56 @@ class InputParser(BaseModel):
             raise RuntimeError(msg) from e
 
     def valid_antismash_id(self):
-        """Validate antiSMASH job on antiSMASH website
+        """Validate antiSMASH job on antiSMASH website, or by its cached listing
 
         Raises:
             ValueError: antiSMASH JobID not found
-            RuntimeError: timeout of connection
+            RuntimeError: connection failed
         """
         as_id = self.params["AsResultsParameters"].get("job_id")
         if not as_id:
             return
 
         try:
-            url = f"https://antismash.secondarymetabolites.org/upload/{as_id}/"
-            response = requests.get(url, timeout=5)
-            zips = [
-                line.split('"')[1]
-                for line in response.text.splitlines()
-                if ".zip" in line
-            ]
-
-            if not zips:
-                raise ValueError("antiSMASH JobID not found on antiSMASH server.")
-            else:
-                for zip_file in zips:
-                    save_path = self.uploads / self.uuid / zip_file.split(".")[0]
-                    self.params["AsResultsParameters"]["directory_path"] = str(
-                        save_path
-                    )
+            zips = AntismashCache(
+                root=self.uploads.joinpath(".antismash"),
+                max_size=current_app.config.get("ANTISMASH_CACHE_SIZE"),
+            ).listing(
+                as_id,
+                AntismashClient(
+                    base_url=current_app.config.get("ANTISMASH_URL"),
+                    timeout=5,
+                    retries=1,
+                ),
+            )
+        except RequestException as e:
+            raise RuntimeError(f"Connection to antiSMASH server failed: {e!s}") from e
 
-        except Timeout as e:
-            raise RuntimeError(
-                f"Connection to antiSMASH server timed out: {e!s}"
-            ) from e
+        if not zips:
+            raise ValueError("antiSMASH JobID not found on antiSMASH server.")
+        for zip_file in zips:
+            save_path = self.uploads / self.uuid / zip_file.split(".")[0]
+            self.params["AsResultsParameters"]["directory_path"] = str(save_path)
 
     def valid_params(self):
         """Validate submitted files and parameters with fermo_core
 
         AsResultsParameters separate: job not downloaded yet
+        Input files are scanned once beforehand, see Preflight
 
         Raises:
-            ValueError: number of features too high
+            ValueError: invalid input file or number of features too high
         """
-        PeaktableParameters(**self.params.get("PeaktableParameters"))
+        preflight = Preflight(
+            max_features=current_app.config.get("MAXFEATURENR")
+            if current_app.config.get("ONLINE")
+            else None
+        )
+        self.preflight = preflight.scan(self.params)
+        for warning in preflight.warnings:
+            current_app.logger.warning(f"Job '{self.uuid}': {warning}")
 
-        if current_app.config.get("ONLINE"):
-            df = pd.read_csv(
-                self.params.get("PeaktableParameters").get("filepath"), sep=","
-            )
-            if len(df) > current_app.config.get("MAXFEATURENR"):
-                raise ValueError(
-                    f"Too many features in peaktable (max: {self.max_features}). "
-                    f"Please reduce or run FERMO in offline mode."
-                )
+        PeaktableParameters(**self.params.get("PeaktableParameters"))
 
         map_files = {
             "MsmsParameters": MsmsParameters,
@@ -833,9 +1194,17 @@ class InputParser(BaseModel):
             return self.return_error()
 
     def load_param_id(self) -> str:
-        """Load parameters from a session file present on server"""
+        """Load parameters from a session file present on server
+
+        Only the parameters are read, from the sidecar file if available.
+        """
         try:
-            self.check_session_id(self.data.get("ParameterId"))
+            self.apply_parameters(
+                self.read_parameters(
+                    self.uploads.joinpath(f"{self.data.get('ParameterId')}/results"),
+                    self.sess_schema,
+                )
+            )
             return render_template(
                 template_name_or_list="forms.html",
                 job_id=self.data.get("ParameterId"),
@@ -858,6 +1227,20 @@ class InputParser(BaseModel):
             self.valid_file_size(size, secure_filename(file.filename))
             file.save(save_path)
             self.check_session_id(self.uuid)
+            ResultFiles(results=save_path.parent).compress(
+                level=current_app.config.get("COMPRESS_LEVEL", 6)
+            )
+            DashboardCache(
+                results=save_path.parent,
+                engine=current_app.config.get("DASHBOARD_ENGINE", "python"),
+            ).build()
+            JobRegistry(path=self.uploads.joinpath(".jobs.sqlite3")).transition(
+                self.uuid,
+                "succeeded",
+                progress=1.0,
+                results=ResultFiles(results=save_path.parent).available(),
+                result_bytes=JobRegistry.dir_size(save_path.parent),
+            )
             return redirect(url_for("routes.task_result", job_id=self.uuid))
         except Exception as e:
             current_app.logger.error(e)
@@ -868,6 +1251,9 @@ class InputParser(BaseModel):
     def load_param_file(self, file: FileStorage) -> str:
         """Load parameters from an uploaded session file
 
+        The session file is only stored until its parameters are read; like for
+        sessions on the server, only the parameters are streamed and validated.
+
         Arguments:
             file: the uploaded session file (Werkzeug file obj)
 
@@ -879,7 +1265,9 @@ class InputParser(BaseModel):
             size = self.determine_file_size(file)
             self.valid_file_size(size, secure_filename(file.filename))
             file.save(save_path)
-            self.check_session_id(self.uuid)
+            self.apply_parameters(
+                self.read_parameters(save_path.parent, self.sess_schema)
+            )
             return render_template(
                 template_name_or_list="forms.html",
                 job_id=secure_filename(file.filename),
@@ -890,8 +1278,29 @@ class InputParser(BaseModel):
         except Exception as e:
             current_app.logger.error(e)
             flash(f"{e!s}")
-            shutil.rmtree(self.uploads.joinpath(self.uuid))
             return self.return_error()
+        finally:
+            shutil.rmtree(self.uploads.joinpath(self.uuid), ignore_errors=True)
+
+    def fingerprint(self) -> str:
+        """Create the fingerprint of the job inputs
+
+        Paths of saved input files are replaced by the hash of their content and
+        the job dir is removed from remaining paths, so identical inputs and
+        parameters give the same fingerprint regardless of the job ID.
+
+        Returns:
+            The sha256 hex digest of the normalized parameters
+        """
+        params = json.dumps(self.params, sort_keys=True)
+        for path, sha256 in sorted(
+            self.input_hashes.items(), key=lambda item: len(item[0]), reverse=True
+        ):
+            params = params.replace(json.dumps(path), json.dumps(f"sha256:{sha256}"))
+        params = params.replace(str(self.uploads.joinpath(self.uuid)), "")
+        return hashlib.sha256(
+            f"{metadata.version('fermo_gui')}\n{params}".encode()
+        ).hexdigest()
 
     def new_analysis(self, files: Any) -> Response | str:
         """Prepare input params, init new analysis
@@ -913,24 +1322,110 @@ class InputParser(BaseModel):
             )
             with open(save_path.joinpath(f"{self.uuid}.parameters.json"), "w") as out:
                 json.dump(self.params, out, indent=2)
+            with open(save_path.joinpath(f"{self.uuid}.preflight.json"), "w") as out:
+                json.dump(self.preflight, out, indent=2)
 
             email = None
             if self.data.get("emailInput") and self.data.get("emailInput") != "":
                 email = str(self.data.get("emailInput"))
 
+            fingerprint = self.fingerprint()
         except Exception as e:
             current_app.logger.error(e)
             flash(f"{e!s}")
             shutil.rmtree(self.uploads.joinpath(self.uuid))
             return self.return_error()
 
-        start_job.apply_async(
-            kwargs={
-                "job_id": self.uuid,
-                "email": email,
-                "base": str(current_app.config.get("UPLOAD_FOLDER").parent),
-                "root_url": str(current_app.config.get("ROOTURL")),
-            }
+        registry = JobRegistry(path=self.uploads.joinpath(".jobs.sqlite3"))
+        index = JobIndex(
+            uploads=self.uploads,
+            registry=registry,
+            max_run_time=current_app.config.get("MAX_RUN_TIME"),
+        )
+        try:
+            owner = index.claim(fingerprint, self.uuid)
+            if owner != self.uuid and index.clone(owner, self.uuid):
+                registry.transition(
+                    self.uuid,
+                    "succeeded",
+                    progress=1.0,
+                    results=ResultFiles(
+                        results=self.uploads.joinpath(self.uuid, "results")
+                    ).available(),
+                    input_bytes=JobRegistry.dir_size(save_path, exclude=("results",)),
+                    result_bytes=JobRegistry.dir_size(save_path.joinpath("results")),
+                )
+                current_app.logger.info(
+                    f"Job '{self.uuid}' reuses results of '{owner}'."
+                )
+                return redirect(url_for("routes.task_result", job_id=self.uuid))
+        except (OSError, sqlite3.Error) as e:
+            current_app.logger.error(e)
+            flash(f"{e!s}")
+            shutil.rmtree(save_path, ignore_errors=True)
+            return self.return_error()
+
+        if owner != self.uuid:
+            current_app.logger.info(f"Job '{self.uuid}' attaches to job '{owner}'.")
+            if email is not None:
+                flash(
+                    "A job with identical inputs is already running. Only its "
+                    "submitter will be notified by email: please check back later."
+                )
+            shutil.rmtree(save_path)
+            return redirect(url_for("routes.job_submitted", job_id=owner))
+
+        queue = JobRouter(
+            max_light_cost=current_app.config.get("MAX_LIGHT_JOB_COST", 3000)
+        ).queue(self.params, self.preflight)
+        inputs = JobEstimator.job_inputs(self.params, self.preflight)
+        # the estimated limit must not exceed the limit configured for all jobs
+        max_limit = current_app.config.get("MAX_JOB_TIME_LIMIT")
+        if max_limit is None:
+            max_limit = (
+                current_app.config.get("MAX_RUN_TIME")
+                or current_app.extensions["celery"].conf.task_soft_time_limit
+            )
+        try:
+            estimator = JobEstimator(
+                factor=current_app.config.get("JOB_TIME_LIMIT_FACTOR", 3.0),
+                min_limit=current_app.config.get("MIN_JOB_TIME_LIMIT", 600),
+                max_limit=max_limit,
+            ).fit(registry.runs())
+        except sqlite3.Error as e:
+            current_app.logger.warning(f"Could not fit job estimator: {e!s}")
+            estimator = JobEstimator()
+        estimate = estimator.estimate(inputs)
+        soft_limit, hard_limit = estimator.limits(
+            estimate, default=current_app.config.get("MAX_RUN_TIME")
         )
+        try:
+            registry.transition(
+                self.uuid,
+                "queued",
+                input_bytes=JobRegistry.dir_size(save_path, exclude=("results",)),
+                queue=queue,
+            )
+            registry.record_estimate(self.uuid, inputs, estimate, soft_limit)
+            start_job.apply_async(
+                kwargs={
+                    "job_id": self.uuid,
+                    "email": email,
+                    "base": str(current_app.config.get("UPLOAD_FOLDER").parent),
+                    "root_url": str(current_app.config.get("ROOTURL")),
+                },
+                queue=queue,
+                soft_time_limit=soft_limit,
+                time_limit=hard_limit,
+            )
+        except Exception as e:
+            current_app.logger.error(e)
+            flash(f"{e!s}")
+            with contextlib.suppress(OSError, sqlite3.Error):
+                index.release(fingerprint, self.uuid)
+                registry.transition(self.uuid, "failed", error=f"Job not queued: {e!s}")
+                registry.mark_removed(self.uuid)
+            shutil.rmtree(save_path, ignore_errors=True)
+            return self.return_error()
 
         return redirect(url_for("routes.job_submitted", job_id=self.uuid))
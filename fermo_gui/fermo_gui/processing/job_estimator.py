@@ -0,0 +1,172 @@
+"""Estimates run time and memory of jobs from past runs
+
+Copyright (c) 2026-present Mitja Maximilian Zdouc, PhD
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from typing import ClassVar, Self
+
+import numpy as np
+from pydantic import BaseModel, ConfigDict
+
+from fermo_gui.processing.job_router import JobRouter
+
+
+class JobEstimator(BaseModel):
+    """Predicts duration and peak memory of a job by linear least squares
+
+    The model is fitted on the recorded runs of succeeded jobs, with the
+    feature, spectrum and sample count and the feature count times the weight
+    of the active spectrum-based modules (see JobRouter) as inputs. The soft
+    time limit of a job is a multiple of its estimated duration, so runaway jobs
+    are stopped early while large jobs get the time they need. Until min_runs
+    runs are recorded, jobs get the default limit.
+
+    Attributes:
+        inputs: the job inputs used as model variables
+        min_runs: the number of recorded runs needed to fit the model
+        factor: the soft time limit as multiple of the estimated duration
+        min_limit: the lower bound of the soft time limit in seconds
+        max_limit: the upper bound of the soft time limit in seconds, or None
+        grace: the time between soft and hard time limit in seconds
+        coef: the fitted coefficients per target, or None if not fitted
+        bounds: the minimum and maximum observed value per target
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    inputs: ClassVar[tuple[str, ...]] = ("features", "spectra", "samples", "cost")
+
+    min_runs: int = 10
+    factor: float = 3.0
+    min_limit: float = 600
+    max_limit: float | None = None
+    grace: float = 60
+    coef: dict[str, np.ndarray] | None = None
+    bounds: dict[str, tuple[float, float]] = {}
+
+    @staticmethod
+    def job_inputs(params: dict, preflight: dict) -> dict:
+        """Collect the model variables of a job
+
+        Arguments:
+            params: the job parameters
+            preflight: the pre-flight scan results of the job
+
+        Returns:
+            A dict with feature, spectrum and sample count and active modules
+        """
+        peaktable = preflight.get("PeaktableParameters", {})
+        return {
+            "features": peaktable.get("features", 0),
+            "spectra": preflight.get("MsmsParameters", {}).get("spectra", 0),
+            "samples": peaktable.get("samples", 0),
+            "modules": JobRouter().active_modules(params),
+        }
+
+    def design(self: Self, runs: list[dict]) -> np.ndarray:
+        """Create the design matrix, with an intercept column
+
+        Arguments:
+            runs: dicts with the model variables, as created by job_inputs
+
+        Returns:
+            A matrix with one row per run
+        """
+        rows = []
+        for run in runs:
+            weight = sum(JobRouter.weights.get(key, 0) for key in run["modules"])
+            values = {
+                "features": run["features"] or 0,
+                "spectra": run["spectra"] or 0,
+                "samples": run["samples"] or 0,
+                "cost": (run["features"] or 0) * weight,
+            }
+            rows.append([1.0, *(float(values[key]) for key in self.inputs)])
+        return np.array(rows, dtype=float).reshape(-1, len(self.inputs) + 1)
+
+    def fit(self: Self, runs: list[dict]) -> Self:
+        """Fit the model on recorded runs
+
+        Runs without a recorded peak memory only count towards the duration.
+
+        Arguments:
+            runs: dicts with the model variables, 'duration' and 'peak_rss'
+
+        Returns:
+            The instance, with coef None if there were too few runs
+        """
+        coef, bounds = {}, {}
+        for target in ("duration", "peak_rss"):
+            subset = [run for run in runs if run.get(target) is not None]
+            if len(subset) < self.min_runs:
+                continue
+            values = np.array([run[target] for run in subset], dtype=float)
+            coef[target] = np.linalg.lstsq(self.design(subset), values, rcond=None)[0]
+            bounds[target] = (values.min(), values.max())
+
+        self.coef = coef if "duration" in coef else None
+        self.bounds = bounds
+        return self
+
+    def estimate(self: Self, job: dict) -> dict | None:
+        """Predict the duration and peak memory of a job
+
+        Predictions are clipped to the smallest observed value, as a linear fit
+        can fall below it for small jobs.
+
+        Arguments:
+            job: the model variables, as created by job_inputs
+
+        Returns:
+            A dict with 'duration' in seconds and 'peak_rss' in bytes (None if
+            not fitted), or None if the model is not fitted
+        """
+        if self.coef is None:
+            return None
+
+        row = self.design([job])[0]
+        estimate = {"duration": None, "peak_rss": None}
+        for target, coef in self.coef.items():
+            estimate[target] = max(float(row @ coef), self.bounds[target][0])
+        return estimate
+
+    def limits(
+        self: Self, estimate: dict | None, default: float | None = None
+    ) -> tuple[float | None, float | None]:
+        """Derive the soft and hard time limit of a job
+
+        Arguments:
+            estimate: the output of estimate
+            default: the soft time limit without estimate, or None for no limit
+
+        Returns:
+            The soft and hard time limit in seconds, or None for no limit
+        """
+        if estimate is None:
+            soft = default
+        else:
+            soft = max(self.factor * estimate["duration"], self.min_limit)
+            if self.max_limit is not None:
+                soft = min(soft, self.max_limit)
+
+        if soft is None:
+            return None, None
+        return soft, soft + self.grace
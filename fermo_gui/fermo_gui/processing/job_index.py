@@ -0,0 +1,246 @@
+"""Index of job input fingerprints, to reuse results of identical jobs
+
+Copyright (c) 2026-present Mitja Maximilian Zdouc, PhD
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Self
+
+from pydantic import BaseModel
+
+from fermo_gui.analysis.result_files import ResultFiles
+from fermo_gui.processing.job_registry import JobRegistry
+
+
+class JobIndex(BaseModel):
+    """Maps fingerprints of job inputs to the job computing their results
+
+    Each fingerprint is a file in '<uploads>/.fingerprints' holding a job ID. It
+    is created atomically, so of several identical submissions only one claims
+    the fingerprint and is run; the others attach to it. Entries pointing to
+    failed, removed or stale jobs are taken over by the next submission, under
+    a lock file so that only one submission takes over.
+
+    Attributes:
+        uploads: the dir holding the job dirs
+        registry: the job registry, to recognize failed and stale jobs
+        max_run_time: seconds after which an unfinished job is considered stale
+        stale_margin: seconds past its time limit after which a job is stale
+        lock_timeout: seconds after which a lock file is considered abandoned
+    """
+
+    uploads: Path
+    registry: JobRegistry | None = None
+    max_run_time: int | None = None
+    stale_margin: float = 300
+    lock_timeout: float = 30
+
+    @property
+    def root(self: Self) -> Path:
+        return self.uploads.joinpath(".fingerprints")
+
+    def state(self: Self, job_id: str) -> str:
+        """Determine the state of a job from its registry record and job dir
+
+        A job is finished once its registry record is 'succeeded', after the
+        dashboard data was prepared. Jobs without a record, e.g. of a missing
+        registry, are finished once the parameters sidecar file was extracted
+        from the session file. A job killed by its hard time limit leaves no
+        files behind: it is recognized by its registry record, as failed or as
+        running for longer than its time limit.
+
+        Arguments:
+            job_id: the job ID
+
+        Returns:
+            One of "finished", "running", "failed" or "missing"
+        """
+        job_path = self.uploads.joinpath(job_id)
+        results = job_path.joinpath("results")
+        if not job_id or not job_path.is_dir():
+            return "missing"
+        elif results.joinpath("out.failed.txt").exists():
+            return "failed"
+
+        record = self.registry.get(job_id) if self.registry is not None else None
+        if record is not None and record["state"] == "succeeded":
+            return "finished"
+        elif record is not None and record["state"] == "failed":
+            return "failed"
+        elif (
+            record is None
+            and results.joinpath("out.fermo.parameters.json").exists()
+            and ResultFiles(results=results).locate("out.fermo.session.json")
+        ):
+            return "finished"
+        elif self.is_stale(job_path, record):
+            return "missing"
+        else:
+            return "running"
+
+    def is_stale(self: Self, job_path: Path, record: dict | None) -> bool:
+        """Check if an unfinished job ran past its time limit or max_run_time
+
+        Arguments:
+            job_path: the job dir
+            record: the registry record of the job, or None
+
+        Returns:
+            True if the job is not expected to finish anymore
+        """
+        now = time.time()
+        if (
+            record is not None
+            and record["started_at"] is not None
+            and record["time_limit"] is not None
+        ):
+            return now - record["started_at"] > record["time_limit"] + self.stale_margin
+        return (
+            self.max_run_time is not None
+            and now - job_path.stat().st_mtime > self.max_run_time
+        )
+
+    def claim(self: Self, fingerprint: str, job_id: str) -> str:
+        """Register a job for a fingerprint unless a usable job is registered
+
+        Arguments:
+            fingerprint: the fingerprint of the job inputs
+            job_id: the ID of the submitted job
+
+        Returns:
+            The ID of the job computing the results, job_id if claimed
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.root.joinpath(fingerprint)
+        tmp_path = self.root.joinpath(f".{job_id}.tmp")
+        tmp_path.write_text(job_id)
+        try:
+            while True:
+                try:
+                    os.link(tmp_path, path)
+                    return job_id
+                except FileExistsError:
+                    pass
+                try:
+                    owner = path.read_text().strip()
+                except FileNotFoundError:
+                    continue
+                if self.state(owner) in ("finished", "running"):
+                    return owner
+                if self.take_over(fingerprint, owner, tmp_path):
+                    return job_id
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    def take_over(self: Self, fingerprint: str, owner: str, tmp_path: Path) -> bool:
+        """Replace the entry of an unusable job, unless replaced meanwhile
+
+        Arguments:
+            fingerprint: the fingerprint of the job inputs
+            owner: the unusable job the entry was read with
+            tmp_path: the new entry
+
+        Returns:
+            True if the entry was replaced, False if it has to be read again
+        """
+        path = self.root.joinpath(fingerprint)
+        lock_path = self.root.joinpath(f".{fingerprint}.lock")
+        try:
+            os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            try:
+                if time.time() - lock_path.stat().st_mtime > self.lock_timeout:
+                    lock_path.unlink(missing_ok=True)
+            except FileNotFoundError:
+                pass
+            time.sleep(0.05)
+            return False
+
+        try:
+            try:
+                if path.read_text().strip() != owner:
+                    return False
+            except FileNotFoundError:
+                return False
+            os.replace(tmp_path, path)
+            return True
+        finally:
+            lock_path.unlink(missing_ok=True)
+
+    def release(self: Self, fingerprint: str, job_id: str):
+        """Remove the entry of a fingerprint if registered to the job"""
+        path = self.root.joinpath(fingerprint)
+        try:
+            if path.read_text().strip() == job_id:
+                path.unlink()
+        except FileNotFoundError:
+            return
+
+    def clone(self: Self, source_id: str, target_id: str) -> bool:
+        """Hardlink the results of a finished job into another job dir
+
+        Arguments:
+            source_id: the ID of the finished job
+            target_id: the ID of the job to receive the results
+
+        Returns:
+            True if cloned, False if the source job has not finished yet
+        """
+
+        def _link(src: str, dst: str):
+            try:
+                os.link(src, dst)
+            except OSError:
+                shutil.copy2(src, dst)
+
+        if self.state(source_id) != "finished":
+            return False
+        shutil.copytree(
+            self.uploads.joinpath(source_id, "results"),
+            self.uploads.joinpath(target_id, "results"),
+            copy_function=_link,
+            dirs_exist_ok=True,
+        )
+        return True
+
+    def prune(self: Self) -> int:
+        """Remove entries of failed or removed jobs
+
+        Returns:
+            The number of removed entries
+        """
+        if not self.root.exists():
+            return 0
+
+        removed = 0
+        for path in self.root.iterdir():
+            if path.name.startswith("."):
+                continue
+            try:
+                if self.state(path.read_text().strip()) in ("failed", "missing"):
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        return removed
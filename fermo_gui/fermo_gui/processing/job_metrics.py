@@ -0,0 +1,117 @@
+"""Wall time, CPU time and peak memory of the stages of a job
+
+Copyright (c) 2026-present Mitja Maximilian Zdouc, PhD
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import contextlib
+import resource
+import time
+from collections.abc import Iterator
+from importlib import metadata
+from typing import ClassVar, Self
+
+from pydantic import BaseModel
+
+
+class JobMetrics(BaseModel):
+    """Measures the stages of start_job with getrusage
+
+    CPU time includes waited-for child processes. Peak memory is the high-water
+    mark of the worker process, which runs many jobs: a stage only gets a peak
+    if it raised the mark, otherwise its peak is below that of an earlier job
+    and unknown. The metrics are stored as 'out.fermo.metrics.json'.
+
+    Attributes:
+        packages: the packages whose versions are recorded with the metrics
+        stages: the measurements per stage, in order of execution
+    """
+
+    packages: ClassVar[tuple[str, ...]] = ("fermo_gui", "fermo_core")
+
+    stages: list[dict] = []
+
+    @staticmethod
+    def usage() -> tuple[float, int]:
+        """Return the CPU time in seconds and the peak memory in bytes"""
+        own = resource.getrusage(resource.RUSAGE_SELF)
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        cpu = own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+        return cpu, own.ru_maxrss * 1024
+
+    @contextlib.contextmanager
+    def measure(self: Self, stage: str) -> Iterator[None]:
+        """Measure a stage, also if it raises
+
+        Arguments:
+            stage: the name of the stage
+        """
+        cpu_before, rss_before = self.usage()
+        start = time.perf_counter()
+        completed = False
+        try:
+            yield
+            completed = True
+        finally:
+            wall = time.perf_counter() - start
+            cpu_after, rss_after = self.usage()
+            self.stages.append(
+                {
+                    "stage": stage,
+                    "wall": round(wall, 3),
+                    "cpu": round(cpu_after - cpu_before, 3),
+                    "peak_rss": rss_after if rss_after > rss_before else None,
+                    "completed": completed,
+                }
+            )
+
+    def peak_rss(self: Self) -> int | None:
+        """Return the highest recorded stage peak in bytes, or None"""
+        return max(
+            (stage["peak_rss"] for stage in self.stages if stage["peak_rss"]),
+            default=None,
+        )
+
+    def summary(self: Self, job_id: str, outcome: str) -> dict:
+        """Create the content of the metrics file
+
+        Arguments:
+            job_id: the job ID
+            outcome: 'succeeded' or 'failed'
+
+        Returns:
+            A dict with package versions, totals and stage measurements
+        """
+        versions = {}
+        for package in self.packages:
+            try:
+                versions[package] = metadata.version(package)
+            except metadata.PackageNotFoundError:
+                versions[package] = None
+
+        return {
+            "job_id": job_id,
+            "outcome": outcome,
+            "versions": versions,
+            "wall": round(sum(stage["wall"] for stage in self.stages), 3),
+            "cpu": round(sum(stage["cpu"] for stage in self.stages), 3),
+            "peak_rss": self.peak_rss(),
+            "stages": self.stages,
+        }
@@ -0,0 +1,541 @@
+"""Status records of jobs in a SQLite database
+
+Copyright (c) 2026-present Mitja Maximilian Zdouc, PhD
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import bisect
+import contextlib
+import json
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import ClassVar, Self
+
+from pydantic import BaseModel
+
+JOB_BUCKETS = (60, 300, 600, 1800, 3600, 7200, 14400, 43200, 86400)
+
+
+class JobRegistry(BaseModel):
+    """Records the state of each job as it moves through submission and start_job
+
+    A job is 'queued' on submission, 'running' while start_job works through
+    its stages and 'succeeded' or 'failed' at the end. Records are kept after
+    the job dir was removed, marked by 'removed_at', so they also serve as the
+    job counter. The database runs in WAL mode, so status reads of the web app
+    do not wait for Celery workers writing transitions.
+
+    Attributes:
+        states: the valid job states
+        migrations: the schema changes, applied in order by schema version
+        path: the SQLite database file
+    """
+
+    states: ClassVar[tuple[str, ...]] = ("queued", "running", "succeeded", "failed")
+    migrations: ClassVar[tuple[str, ...]] = (
+        "CREATE TABLE IF NOT EXISTS jobs ("
+        "job_id TEXT PRIMARY KEY, "
+        "state TEXT NOT NULL, "
+        "stage TEXT, "
+        "progress REAL NOT NULL DEFAULT 0, "
+        "submitted_at REAL, "
+        "started_at REAL, "
+        "finished_at REAL, "
+        "error TEXT, "
+        "results TEXT)",
+        "ALTER TABLE jobs ADD COLUMN input_bytes INTEGER; "
+        "ALTER TABLE jobs ADD COLUMN result_bytes INTEGER; "
+        "ALTER TABLE jobs ADD COLUMN last_access REAL; "
+        "ALTER TABLE jobs ADD COLUMN removed_at REAL; "
+        "CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state); "
+        "CREATE INDEX IF NOT EXISTS jobs_submitted ON jobs (submitted_at) "
+        "WHERE removed_at IS NULL",
+        "ALTER TABLE jobs ADD COLUMN queue TEXT",
+        "ALTER TABLE jobs ADD COLUMN features INTEGER; "
+        "ALTER TABLE jobs ADD COLUMN spectra INTEGER; "
+        "ALTER TABLE jobs ADD COLUMN samples INTEGER; "
+        "ALTER TABLE jobs ADD COLUMN modules TEXT; "
+        "ALTER TABLE jobs ADD COLUMN peak_rss INTEGER; "
+        "ALTER TABLE jobs ADD COLUMN est_duration REAL; "
+        "ALTER TABLE jobs ADD COLUMN est_peak_rss INTEGER; "
+        "ALTER TABLE jobs ADD COLUMN time_limit REAL",
+        "CREATE TABLE IF NOT EXISTS stage_metrics ("
+        "job_id TEXT NOT NULL, "
+        "stage TEXT NOT NULL, "
+        "wall REAL, "
+        "cpu REAL, "
+        "peak_rss INTEGER, "
+        "completed INTEGER, "
+        "fermo_core TEXT, "
+        "recorded_at REAL, "
+        "PRIMARY KEY (job_id, stage))",
+        "UPDATE jobs SET started_at = submitted_at "
+        "WHERE state = 'succeeded' AND started_at IS NULL AND results IS NULL",
+        "CREATE TABLE IF NOT EXISTS job_durations ("
+        "outcome TEXT NOT NULL, "
+        "queue TEXT NOT NULL, "
+        "bucket INTEGER NOT NULL, "
+        "jobs INTEGER NOT NULL, "
+        "seconds REAL NOT NULL, "
+        "PRIMARY KEY (outcome, queue, bucket)); "
+        "INSERT INTO job_durations "
+        "SELECT state, COALESCE(queue, 'unknown'), "
+        "CASE WHEN finished_at - started_at <= 60 THEN 0 "
+        "WHEN finished_at - started_at <= 300 THEN 1 "
+        "WHEN finished_at - started_at <= 600 THEN 2 "
+        "WHEN finished_at - started_at <= 1800 THEN 3 "
+        "WHEN finished_at - started_at <= 3600 THEN 4 "
+        "WHEN finished_at - started_at <= 7200 THEN 5 "
+        "WHEN finished_at - started_at <= 14400 THEN 6 "
+        "WHEN finished_at - started_at <= 43200 THEN 7 "
+        "WHEN finished_at - started_at <= 86400 THEN 8 ELSE 9 END, "
+        "COUNT(*), SUM(finished_at - started_at) FROM jobs "
+        "WHERE state IN ('succeeded', 'failed') "
+        "AND started_at IS NOT NULL AND finished_at IS NOT NULL "
+        "GROUP BY 1, 2, 3",
+    )
+
+    path: Path
+
+    @staticmethod
+    def dir_size(path: Path, exclude: tuple[str, ...] = ()) -> int:
+        """Sum up the size of all files in a dir
+
+        Arguments:
+            path: the dir
+            exclude: names of top-level entries to skip
+
+        Returns:
+            The size in bytes
+        """
+        size = 0
+        for entry in path.iterdir() if path.is_dir() else ():
+            if entry.name in exclude or entry.is_symlink():
+                continue
+            elif entry.is_dir():
+                size += JobRegistry.dir_size(entry)
+            else:
+                size += entry.stat().st_size
+        return size
+
+    def connect(self: Self) -> sqlite3.Connection:
+        """Open the database, migrating the schema if needed"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < len(self.migrations):
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                version = conn.execute("PRAGMA user_version").fetchone()[0]
+                for migration in self.migrations[version:]:
+                    for statement in migration.split("; "):
+                        conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {len(self.migrations)}")
+        return conn
+
+    def transition(
+        self: Self,
+        job_id: str,
+        state: str,
+        stage: str | None = None,
+        progress: float | None = None,
+        error: str | None = None,
+        results: list[str] | None = None,
+        input_bytes: int | None = None,
+        result_bytes: int | None = None,
+        queue: str | None = None,
+        peak_rss: int | None = None,
+    ):
+        """Record a state transition of a job
+
+        Entering 'queued' sets the submission time, 'running' the start time
+        (once) and 'succeeded' or 'failed' the finish time. The run time of a
+        started job is added to the job duration histogram once it finishes.
+
+        Arguments:
+            job_id: the job ID
+            state: the new state
+            stage: the stage of start_job the job is in
+            progress: the fraction of stages completed
+            error: the error message of a failed job
+            results: the names of the available result files
+            input_bytes: the size of the input files
+            result_bytes: the size of the result files
+            queue: the Celery queue the job was sent to
+            peak_rss: the peak memory of the job in bytes
+
+        Raises:
+            ValueError: unknown state
+        """
+        if state not in self.states:
+            raise ValueError(f"Unknown job state '{state}'.")
+
+        now = time.time()
+        with closing(self.connect()) as conn, conn:
+            previous = conn.execute(
+                "SELECT state FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+            conn.execute(
+                "INSERT INTO jobs (job_id, state, submitted_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(job_id) DO NOTHING",
+                (job_id, state, now),
+            )
+            conn.execute(
+                "UPDATE jobs SET state = :state, "
+                "stage = COALESCE(:stage, stage), "
+                "progress = COALESCE(:progress, progress), "
+                "error = COALESCE(:error, error), "
+                "results = COALESCE(:results, results), "
+                "input_bytes = COALESCE(:input_bytes, input_bytes), "
+                "result_bytes = COALESCE(:result_bytes, result_bytes), "
+                "queue = COALESCE(:queue, queue), "
+                "peak_rss = COALESCE(:peak_rss, peak_rss), "
+                "started_at = CASE WHEN :state = 'running' "
+                "THEN COALESCE(started_at, :now) ELSE started_at END, "
+                "finished_at = CASE WHEN :state IN ('succeeded', 'failed') "
+                "THEN :now ELSE finished_at END "
+                "WHERE job_id = :job_id",
+                {
+                    "state": state,
+                    "stage": stage,
+                    "progress": progress,
+                    "error": error,
+                    "results": None if results is None else json.dumps(results),
+                    "input_bytes": input_bytes,
+                    "result_bytes": result_bytes,
+                    "queue": queue,
+                    "peak_rss": peak_rss,
+                    "now": now,
+                    "job_id": job_id,
+                },
+            )
+            if state in ("succeeded", "failed") and (
+                previous is None or previous[0] not in ("succeeded", "failed")
+            ):
+                self.record_duration(conn, job_id)
+
+    @staticmethod
+    def record_duration(conn: sqlite3.Connection, job_id: str):
+        """Add the run time of a finished job to the job duration histogram
+
+        Arguments:
+            conn: the open database connection, in the transaction finishing it
+            job_id: the job ID
+        """
+        row = conn.execute(
+            "SELECT state, COALESCE(queue, 'unknown'), finished_at - started_at "
+            "FROM jobs WHERE job_id = ? AND started_at IS NOT NULL",
+            (job_id,),
+        ).fetchone()
+        if row is None:
+            return
+
+        outcome, queue, duration = row
+        conn.execute(
+            "INSERT INTO job_durations VALUES (?, ?, ?, 1, ?) "
+            "ON CONFLICT(outcome, queue, bucket) DO UPDATE SET "
+            "jobs = jobs + 1, seconds = seconds + excluded.seconds",
+            (outcome, queue, bisect.bisect_left(JOB_BUCKETS, duration), duration),
+        )
+
+    def get(self: Self, job_id: str) -> dict | None:
+        """Return the status record of a job
+
+        Arguments:
+            job_id: the job ID
+
+        Returns:
+            The record as dict, or None if the job is not registered or removed;
+            'results' is None if the result files were not recorded
+        """
+        if not self.path.exists():
+            return None
+
+        with closing(self.connect()) as conn:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE job_id = ? AND removed_at IS NULL",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+
+        record = dict(row)
+        for key in ("results", "modules"):
+            if record[key] is not None:
+                record[key] = json.loads(record[key])
+        return record
+
+    def record_estimate(
+        self: Self,
+        job_id: str,
+        inputs: dict,
+        estimate: dict | None,
+        time_limit: float | None,
+    ):
+        """Record the model variables, the estimate and the time limit of a job
+
+        Arguments:
+            job_id: the job ID
+            inputs: the model variables, as created by JobEstimator.job_inputs
+            estimate: the estimated duration and peak memory, or None
+            time_limit: the soft time limit in seconds, or None
+        """
+        estimate = estimate or {}
+        with closing(self.connect()) as conn, conn:
+            conn.execute(
+                "UPDATE jobs SET features = ?, spectra = ?, samples = ?, "
+                "modules = ?, est_duration = ?, est_peak_rss = ?, time_limit = ? "
+                "WHERE job_id = ?",
+                (
+                    inputs.get("features"),
+                    inputs.get("spectra"),
+                    inputs.get("samples"),
+                    json.dumps(inputs.get("modules", [])),
+                    estimate.get("duration"),
+                    estimate.get("peak_rss"),
+                    time_limit,
+                    job_id,
+                ),
+            )
+
+    def record_metrics(self: Self, job_id: str, metrics: dict):
+        """Record the stage measurements of a job
+
+        Arguments:
+            job_id: the job ID
+            metrics: the content of the metrics file, see JobMetrics.summary
+        """
+        now = time.time()
+        version = metrics.get("versions", {}).get("fermo_core")
+        with closing(self.connect()) as conn, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO stage_metrics (job_id, stage, wall, cpu, "
+                "peak_rss, completed, fermo_core, recorded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        job_id,
+                        stage["stage"],
+                        stage["wall"],
+                        stage["cpu"],
+                        stage["peak_rss"],
+                        stage["completed"],
+                        version,
+                        now,
+                    )
+                    for stage in metrics.get("stages", [])
+                ],
+            )
+
+    def runs(self: Self, limit: int = 500) -> list[dict]:
+        """Return the recorded runs of the most recent succeeded jobs
+
+        Jobs that reused the results of another job have no start time and are
+        skipped, as are jobs submitted before the inputs were recorded.
+
+        Arguments:
+            limit: the maximum number of runs
+
+        Returns:
+            Dicts with the model variables, 'duration' and 'peak_rss'
+        """
+        if not self.path.exists():
+            return []
+
+        with closing(self.connect()) as conn:
+            rows = conn.execute(
+                "SELECT features, spectra, samples, modules, peak_rss, "
+                "finished_at - started_at AS duration FROM jobs "
+                "WHERE state = 'succeeded' AND started_at IS NOT NULL "
+                "AND finished_at IS NOT NULL AND features IS NOT NULL "
+                "ORDER BY finished_at DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [{**dict(row), "modules": json.loads(row["modules"])} for row in rows]
+
+    def count_runs(self: Self) -> int:
+        """Count the succeeded jobs run by start_job, including removed ones
+
+        Uploaded session files and jobs reusing the results of an identical job
+        succeed without being started and are not counted.
+        """
+        if not self.path.exists():
+            return 0
+
+        with closing(self.connect()) as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM jobs "
+                "WHERE state = 'succeeded' AND started_at IS NOT NULL"
+            ).fetchone()[0]
+
+    def state_counts(self: Self) -> dict[str, int]:
+        """Count the jobs per state, without removed ones"""
+        if not self.path.exists():
+            return {}
+
+        with closing(self.connect()) as conn:
+            return dict(
+                conn.execute(
+                    "SELECT state, COUNT(*) FROM jobs WHERE removed_at IS NULL "
+                    "GROUP BY state"
+                ).fetchall()
+            )
+
+    def durations(self: Self) -> dict[tuple[str, str], tuple[list[int], float]]:
+        """Return the job duration histogram of all finished jobs
+
+        The histogram is kept up to date as jobs finish, so it is read without
+        scanning the jobs. Jobs that reused the results of another job have no
+        start time and are skipped.
+
+        Returns:
+            Jobs per bucket of JOB_BUCKETS and '+Inf' and the summed run time,
+            by outcome and queue
+        """
+        if not self.path.exists():
+            return {}
+
+        histograms = {}
+        with closing(self.connect()) as conn:
+            for outcome, queue, bucket, jobs, seconds in conn.execute(
+                "SELECT outcome, queue, bucket, jobs, seconds FROM job_durations"
+            ):
+                counts, total = histograms.get(
+                    (outcome, queue), ([0] * (len(JOB_BUCKETS) + 1), 0.0)
+                )
+                counts[bucket] += jobs
+                histograms[(outcome, queue)] = (counts, total + seconds)
+        return histograms
+
+    def touch(self: Self, job_id: str, interval: float = 60):
+        """Record an access to the results of a job, at most once per interval
+
+        Arguments:
+            job_id: the job ID
+            interval: the minimum time between recorded accesses in seconds
+        """
+        now = time.time()
+        with closing(self.connect()) as conn, conn:
+            conn.execute(
+                "UPDATE jobs SET last_access = ? WHERE job_id = ? "
+                "AND COALESCE(last_access, 0) < ?",
+                (now, job_id, now - interval),
+            )
+
+    def expired(self: Self, max_age: float) -> list[str]:
+        """Return the IDs of jobs submitted more than max_age seconds ago
+
+        Arguments:
+            max_age: the age in seconds after which jobs are removed
+
+        Returns:
+            The job IDs whose dirs are not yet removed
+        """
+        with closing(self.connect()) as conn:
+            return [
+                row[0]
+                for row in conn.execute(
+                    "SELECT job_id FROM jobs "
+                    "WHERE removed_at IS NULL AND submitted_at < ?",
+                    (time.time() - max_age,),
+                )
+            ]
+
+    def mark_removed(self: Self, job_id: str):
+        """Record that the dir of a job was removed"""
+        with closing(self.connect()) as conn, conn:
+            conn.execute(
+                "UPDATE jobs SET removed_at = ? WHERE job_id = ?",
+                (time.time(), job_id),
+            )
+
+    def import_counter(self: Self, path: Path) -> int:
+        """Import the job IDs of a legacy 'job_counter.txt' as succeeded jobs
+
+        The counted jobs were run, so they are recorded as started. The file is
+        renamed to '<name>.imported' afterwards.
+
+        Arguments:
+            path: the job counter file
+
+        Returns:
+            The number of imported job IDs
+        """
+        try:
+            with open(path) as infile:
+                job_ids = [line.strip() for line in infile if line.strip()]
+        except FileNotFoundError:
+            return 0
+
+        now = time.time()
+        with closing(self.connect()) as conn, conn:
+            conn.executemany(
+                "INSERT INTO jobs (job_id, state, progress, submitted_at, started_at) "
+                "VALUES (?, 'succeeded', 1.0, ?, ?) ON CONFLICT(job_id) DO UPDATE "
+                "SET started_at = COALESCE(started_at, excluded.started_at)",
+                [(job_id, now, now) for job_id in job_ids],
+            )
+        with contextlib.suppress(FileNotFoundError):
+            path.rename(path.with_name(f"{path.name}.imported"))
+        return len(job_ids)
+
+    def register_existing(self: Self, uploads: Path) -> int:
+        """Register job dirs that have no record, e.g. from before the registry
+
+        The submission time is taken from the dir mtime, the state from the
+        result files. Example and hidden dirs are skipped.
+
+        Arguments:
+            uploads: the uploads dir
+
+        Returns:
+            The number of registered job dirs
+        """
+        with closing(self.connect()) as conn:
+            known = {row[0] for row in conn.execute("SELECT job_id FROM jobs")}
+
+        rows = []
+        for path in uploads.iterdir() if uploads.is_dir() else ():
+            if (
+                not path.is_dir()
+                or path.name.startswith(("example", "."))
+                or path.name in known
+            ):
+                continue
+            results = path.joinpath("results")
+            if any(results.glob("out.fermo.session.json*")):
+                state = "succeeded"
+            elif results.joinpath("out.failed.txt").exists():
+                state = "failed"
+            else:
+                state = "running"
+            rows.append((path.name, state, path.stat().st_mtime))
+
+        with closing(self.connect()) as conn, conn:
+            conn.executemany(
+                "INSERT INTO jobs (job_id, state, submitted_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(job_id) DO NOTHING",
+                rows,
+            )
+        return len(rows)
@@ -0,0 +1,100 @@
+"""Routing of jobs to Celery queues by their expected cost
+
+Copyright (c) 2026-present Mitja Maximilian Zdouc, PhD
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from typing import ClassVar, Self
+
+from pydantic import BaseModel
+
+
+class JobRouter(BaseModel):
+    """Classifies jobs as 'light' or 'heavy' to send them to separate queues
+
+    The cost of a job is its number of features, weighted by the spectrum-based
+    modules it runs: each module adds its weight to a base weight of 1. These
+    modules only run with an MS/MS file (and a spectral library or antiSMASH
+    job, respectively). Jobs above max_light_cost go to the heavy queue, so
+    small jobs do not wait behind large ones.
+
+    Attributes:
+        weights: the added weight per module
+        queues: the queue name per job class
+        max_light_cost: the maximum cost of a light job
+    """
+
+    weights: ClassVar[dict[str, float]] = {
+        "SpecSimNetworkCosineParameters": 0.5,
+        "SpecSimNetworkDeepscoreParameters": 2.0,
+        "SpectralLibMatchingCosineParameters": 1.0,
+        "SpectralLibMatchingDeepscoreParameters": 3.0,
+        "AsKcbCosineMatchingParameters": 1.0,
+        "AsKcbDeepscoreMatchingParameters": 2.0,
+    }
+    queues: ClassVar[dict[str, str]] = {"light": "light", "heavy": "heavy"}
+
+    max_light_cost: float = 3000
+
+    def active_modules(self: Self, params: dict) -> list[str]:
+        """Return the weighted modules that will run with the given inputs
+
+        Arguments:
+            params: the job parameters
+
+        Returns:
+            The parameter keys of the active weighted modules
+        """
+        if not params.get("MsmsParameters", {}).get("filepath"):
+            return []
+
+        has_speclib = bool(params.get("SpecLibParameters", {}).get("dirpath"))
+        has_antismash = bool(params.get("AsResultsParameters", {}).get("job_id"))
+        return [
+            key
+            for key in self.weights
+            if params.get(key, {}).get("activate_module")
+            and (has_speclib or not key.startswith("SpectralLib"))
+            and (has_antismash or not key.startswith("AsKcb"))
+        ]
+
+    def cost(self: Self, params: dict, preflight: dict) -> float:
+        """Estimate the cost of a job
+
+        Arguments:
+            params: the job parameters
+            preflight: the pre-flight scan results of the job
+
+        Returns:
+            The number of features times the module weight
+        """
+        features = preflight.get("PeaktableParameters", {}).get("features", 0)
+        weight = 1 + sum(self.weights[key] for key in self.active_modules(params))
+        return features * weight
+
+    def classify(self: Self, params: dict, preflight: dict) -> str:
+        """Return 'light' or 'heavy'"""
+        return (
+            "heavy" if self.cost(params, preflight) > self.max_light_cost else "light"
+        )
+
+    def queue(self: Self, params: dict, preflight: dict) -> str:
+        """Return the name of the queue to send a job to"""
+        return self.queues[self.classify(params, preflight)]
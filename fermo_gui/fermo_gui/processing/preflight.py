@@ -0,0 +1,227 @@
+"""Streaming pre-flight scan of input files
+
+Copyright (c) 2026-present Mitja Maximilian Zdouc, PhD
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import csv
+from pathlib import Path
+from typing import ClassVar, Self
+
+from pydantic import BaseModel
+
+
+class Preflight(BaseModel):
+    """Scans the input files of a job once, line by line, before validation
+
+    Only counters and value ranges are kept in memory, so the memory used does
+    not grow with the file size. The summary is stored as
+    '<job_id>.preflight.json' in the job dir.
+
+    Attributes:
+        max_features: the maximum number of peaktable features, or None
+        summary: the scan results per parameter key
+        warnings: inconsistencies that do not prevent the job from running
+    """
+
+    required_columns: ClassVar[tuple] = ("id", "mz", "rt")
+
+    max_features: int | None = None
+    summary: dict = {}
+    warnings: list[str] = []
+
+    @staticmethod
+    def update_range(mz_range: list, value: float) -> list:
+        """Extend a [min, max] range by a value"""
+        if not mz_range:
+            return [value, value]
+        return [min(mz_range[0], value), max(mz_range[1], value)]
+
+    def scan_peaktable(self: Self, path: Path) -> dict:
+        """Count features and samples of a MZmine-style peaktable
+
+        Arguments:
+            path: the peaktable file
+
+        Returns:
+            A dict with layout, feature and sample count and m/z range
+
+        Raises:
+            ValueError: missing columns, invalid values or too many features
+        """
+        with open(path, newline="", encoding="utf-8-sig", errors="replace") as infile:
+            reader = csv.reader(infile)
+            header = next(reader, [])
+            missing = [col for col in self.required_columns if col not in header]
+            if missing:
+                raise ValueError(
+                    f"Peaktable is missing the required column(s): "
+                    f"{', '.join(missing)}."
+                )
+            samples = {
+                col.split(":")[1]
+                for col in header
+                if col.startswith("datafile:") and col.count(":") >= 2
+            }
+            if not samples:
+                raise ValueError(
+                    "Peaktable has no sample columns ('datafile:<sample>:<value>')."
+                )
+
+            mz_col = header.index("mz")
+            features = 0
+            mz_range = []
+            for row in reader:
+                if not any(row):
+                    continue
+                features += 1
+                if self.max_features is not None and features > self.max_features:
+                    raise ValueError(
+                        f"Too many features in peaktable (max: {self.max_features}). "
+                        f"Please reduce or run FERMO in offline mode."
+                    )
+                try:
+                    mz_range = self.update_range(mz_range, float(row[mz_col]))
+                except (IndexError, ValueError) as e:
+                    raise ValueError(
+                        f"Peaktable row {features} has no valid m/z value."
+                    ) from e
+
+        if features == 0:
+            raise ValueError("Peaktable contains no features.")
+
+        return {
+            "format": "mzmine",
+            "features": features,
+            "samples": len(samples),
+            "mz_range": mz_range,
+        }
+
+    def scan_mgf(self: Self, path: Path) -> dict:
+        """Count spectra of an MGF file and detect their polarity
+
+        Polarity is taken from 'IONMODE' or the sign of 'CHARGE' entries.
+
+        Arguments:
+            path: the MGF file
+
+        Returns:
+            A dict with spectrum count, polarity and precursor m/z range
+
+        Raises:
+            ValueError: unbalanced ion blocks or invalid precursor m/z
+        """
+        spectra = 0
+        in_ions = False
+        polarities = set()
+        mz_range = []
+        with open(path, encoding="utf-8", errors="replace") as infile:
+            for num, line in enumerate(infile, start=1):
+                line = line.strip()
+                upper = line.upper()
+                if upper == "BEGIN IONS":
+                    if in_ions:
+                        raise ValueError(
+                            f"{path.name}: unclosed ion block at line {num}."
+                        )
+                    in_ions = True
+                    spectra += 1
+                elif upper == "END IONS":
+                    if not in_ions:
+                        raise ValueError(
+                            f"{path.name}: unopened ion block at line {num}."
+                        )
+                    in_ions = False
+                elif not in_ions or "=" not in line:
+                    continue
+                elif upper.startswith("PEPMASS="):
+                    try:
+                        mz_range = self.update_range(
+                            mz_range, float(line.split("=", 1)[1].split()[0])
+                        )
+                    except (IndexError, ValueError) as e:
+                        raise ValueError(
+                            f"{path.name}: invalid precursor m/z at line {num}."
+                        ) from e
+                elif upper.startswith("CHARGE=") and upper[-1] in "+-":
+                    polarities.add("positive" if upper[-1] == "+" else "negative")
+                elif upper.startswith("IONMODE="):
+                    mode = upper.split("=", 1)[1].strip()
+                    if mode.startswith(("POS", "NEG")):
+                        polarities.add("positive" if mode[0] == "P" else "negative")
+
+        if in_ions:
+            raise ValueError(f"{path.name}: unclosed ion block at end of file.")
+
+        return {
+            "spectra": spectra,
+            "polarity": polarities.pop() if len(polarities) == 1 else None,
+            "mz_range": mz_range,
+        }
+
+    def scan_speclib(self: Self, dirpath: Path) -> dict:
+        """Count spectra of all MGF files in a spectral library dir
+
+        Arguments:
+            dirpath: the spectral library dir
+
+        Returns:
+            A dict with file and spectrum count and precursor m/z range
+        """
+        files = spectra = 0
+        mz_range = []
+        for path in sorted(dirpath.iterdir()):
+            if not path.is_file():
+                continue
+            scan = self.scan_mgf(path)
+            files += 1
+            spectra += scan["spectra"]
+            for value in scan["mz_range"]:
+                mz_range = self.update_range(mz_range, value)
+        return {"files": files, "spectra": spectra, "mz_range": mz_range}
+
+    def scan(self: Self, params: dict) -> dict:
+        """Scan the input files referenced in the job parameters
+
+        Arguments:
+            params: the job parameters
+
+        Returns:
+            The scan results per parameter key
+
+        Raises:
+            ValueError: an input file is invalid
+        """
+        if path := params.get("PeaktableParameters", {}).get("filepath"):
+            self.summary["PeaktableParameters"] = self.scan_peaktable(Path(path))
+        if path := params.get("MsmsParameters", {}).get("filepath"):
+            self.summary["MsmsParameters"] = self.scan_mgf(Path(path))
+        if path := params.get("SpecLibParameters", {}).get("dirpath"):
+            self.summary["SpecLibParameters"] = self.scan_speclib(Path(path))
+
+        polarity = params.get("PeaktableParameters", {}).get("polarity")
+        detected = self.summary.get("MsmsParameters", {}).get("polarity")
+        if polarity and detected and polarity != detected:
+            self.warnings.append(
+                f"Peaktable polarity '{polarity}' differs from MS/MS polarity "
+                f"'{detected}'."
+            )
+
+        return self.summary
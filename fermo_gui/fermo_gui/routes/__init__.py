@@ -26,6 +26,7 @@ from flask import Blueprint
 bp = Blueprint("routes", __name__)
 
 from fermo_gui.routes import (
+    routes_api,
     routes_general,
     routes_results,
     routes_submission,
@@ -0,0 +1,159 @@
+"""Conditional and partial GET handling for views serving job results
+
+Copyright (c) 2026-present Mitja Maximilian Zdouc, PhD
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+from collections.abc import Callable
+from functools import wraps
+from importlib import metadata
+from pathlib import Path
+
+from flask import Response, current_app, make_response, request, send_file
+from flask.typing import ResponseReturnValue
+from werkzeug.wsgi import FileWrapper
+
+from fermo_gui.analysis.dashboard_cache import DashboardCache
+from fermo_gui.analysis.result_files import ResultFiles
+
+
+def get_cache(job_id: str) -> DashboardCache:
+    """Create the dashboard cache instance of the given job id"""
+    return DashboardCache(
+        results=current_app.config.get("UPLOAD_FOLDER") / job_id / "results",
+        engine=current_app.config.get("DASHBOARD_ENGINE", "python"),
+    )
+
+
+def respond_conditionally(
+    job_id: str, view: Callable[[], ResponseReturnValue], *extra: str
+) -> Response:
+    """Answer a GET request with 304 if the data it is based on did not change
+
+    The ETag combines the version of the stored dashboard data, the app version
+    and the request path and query, so the view is only called if the client
+    holds no current copy.
+
+    Arguments:
+        job_id: the job id of the dashboard data
+        view: creates the response if the client copy is outdated
+        extra: further values the response depends on
+
+    Returns:
+        The response of view, or an empty response with status 304
+    """
+    try:
+        validator = get_cache(job_id).validator()
+    except FileNotFoundError:
+        return make_response(view())
+
+    etag = hashlib.sha256(
+        "\n".join(
+            (validator, metadata.version("fermo_gui"), request.full_path, *extra)
+        ).encode("utf-8")
+    ).hexdigest()
+
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = make_response(view())
+        if response.status_code != 200:
+            return response
+
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response
+
+
+def conditional(view: Callable[..., ResponseReturnValue]) -> Callable:
+    """Decorate a GET view with a job_id argument to respond conditionally"""
+
+    @wraps(view)
+    def wrapper(job_id: str, **kwargs: str) -> Response:
+        return respond_conditionally(job_id, lambda: view(job_id=job_id, **kwargs))
+
+    return wrapper
+
+
+def send_result_file(results: Path, name: str) -> Response:
+    """Send a result file for download, which may be stored compressed
+
+    Compressed files are sent as stored to clients accepting gzip, and are
+    otherwise decompressed while streaming, with support for range requests to
+    resume downloads. Both share the ETag of the stored file.
+
+    Arguments:
+        results: the results dir of the job
+        name: the file name, e.g. "out.fermo.session.json"
+
+    Returns:
+        A Response object containing the file
+
+    Raises:
+        FileNotFoundError: file not in results dir
+    """
+    path = ResultFiles(results=results).locate(name)
+    if path is None:
+        raise FileNotFoundError(f"No file '{name}' in '{results}'.")
+    elif path.name == name:
+        return send_file(path.resolve(), as_attachment=True)
+
+    stat = path.stat()
+    etag = f"{stat.st_mtime_ns}-{stat.st_size}-gz"
+    mimetype = mimetypes.guess_type(name)[0] or "application/octet-stream"
+
+    if request.accept_encodings.quality("gzip") > 0 and request.range is None:
+        response = send_file(
+            path.resolve(),
+            mimetype=mimetype,
+            as_attachment=True,
+            download_name=name,
+            etag=etag,
+        )
+        if response.status_code == 200:
+            response.headers["Content-Encoding"] = "gzip"
+        response.set_etag(etag, weak=True)
+    else:
+        size = ResultFiles.text_size(path)
+        # closed with the response, after streaming
+        infile = gzip.open(path, "rb")
+        try:
+            # werkzeug's FileWrapper, since a server's wsgi.file_wrapper may send
+            # the compressed bytes of the underlying file descriptor
+            response = current_app.response_class(
+                FileWrapper(infile),
+                mimetype=mimetype,
+                direct_passthrough=True,
+            )
+            response.call_on_close(infile.close)
+            response.content_length = size
+            response.headers.set("Content-Disposition", "attachment", filename=name)
+            response.last_modified = stat.st_mtime
+            response.set_etag(etag)
+            response.make_conditional(request, accept_ranges=True, complete_length=size)
+        except BaseException:
+            infile.close()
+            raise
+
+    response.vary.add("Accept-Encoding")
+    return response
@@ -0,0 +1,176 @@
+"""JSON routes serving dashboard data on demand.
+
+Copyright (c) 2026-present Mitja Maximilian Zdouc, PhD
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from flask import Response, current_app, jsonify, request
+from pydantic import ValidationError
+
+from fermo_gui.analysis.filter_engine import FilterSpec
+from fermo_gui.analysis.job_log import JobLog
+from fermo_gui.analysis.result_files import ResultFiles
+from fermo_gui.processing.job_registry import JobRegistry
+from fermo_gui.routes import bp
+from fermo_gui.routes.conditional import conditional, get_cache
+
+
+@bp.route("/api/results/<job_id>/samples/<path:sample>")
+@conditional
+def api_sample(job_id: str, sample: str) -> Response | tuple[Response, int]:
+    """Return the chromatogram data of a single sample"""
+    try:
+        return jsonify(get_cache(job_id).provide_sample(sample))
+    except (FileNotFoundError, KeyError):
+        return jsonify({"error": "Sample not found"}), 404
+
+
+@bp.route("/api/results/<job_id>/networks")
+@conditional
+def api_network_summary(job_id: str) -> Response | tuple[Response, int]:
+    """Return the feature IDs per network ID of all network types"""
+    try:
+        return jsonify(get_cache(job_id).provide("network_summary"))
+    except FileNotFoundError:
+        return jsonify({"error": "Results not found"}), 404
+
+
+@bp.route("/api/results/<job_id>/networks/<network_type>/<n_id>")
+@conditional
+def api_network(
+    job_id: str, network_type: str, n_id: str
+) -> Response | tuple[Response, int]:
+    """Return a view of a subnetwork together with the information on its features
+
+    Subnetworks above MAX_NETWORK_NODES are reduced to the neighbourhood of the
+    feature given by the 'f_id' query parameter (within 'hops' edges), or to
+    the nodes connected by the highest-scoring edges.
+    """
+    max_nodes = current_app.config.get("MAX_NETWORK_NODES", 50)
+    try:
+        hops = min(max(request.args.get("hops", 1, type=int), 1), 5)
+        return jsonify(
+            get_cache(job_id).provide_network(
+                network_type,
+                n_id,
+                f_id=request.args.get("f_id"),
+                hops=hops,
+                max_nodes=max_nodes,
+            )
+        )
+    except (FileNotFoundError, KeyError, TypeError):
+        return jsonify({"error": "Network not found"}), 404
+
+
+@bp.route("/api/results/<job_id>/features")
+@conditional
+def api_features(job_id: str) -> Response | tuple[Response, int]:
+    """Return the columnar table of general feature information"""
+    try:
+        return jsonify(get_cache(job_id).provide("features"))
+    except FileNotFoundError:
+        return jsonify({"error": "Results not found"}), 404
+
+
+@bp.route("/api/results/<job_id>/features/<f_id>")
+@conditional
+def api_feature(job_id: str, f_id: str) -> Response | tuple[Response, int]:
+    """Return the general information of a single feature"""
+    try:
+        return jsonify(get_cache(job_id).provide_feature(f_id))
+    except (FileNotFoundError, KeyError):
+        return jsonify({"error": "Feature not found"}), 404
+
+
+@bp.route("/api/results/<job_id>/filter", methods=["POST"])
+def api_filter(job_id: str) -> Response | tuple[Response, int]:
+    """Return the retained features per sample for the dashboard filter settings
+
+    Expects a JSON body with the filter settings as 'spec' (see FilterSpec) and
+    optionally a 'sample' to return the retained feature IDs of.
+    """
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        body = {}
+    try:
+        spec = FilterSpec.model_validate(body.get("spec") or {})
+    except ValidationError:
+        return jsonify({"error": "Invalid filter settings"}), 400
+
+    try:
+        return jsonify(get_cache(job_id).provide_filter(spec, body.get("sample")))
+    except (FileNotFoundError, KeyError, TypeError, ValueError):
+        return jsonify({"error": "Results not found"}), 404
+
+
+@bp.route("/api/jobs/<job_id>/log")
+def api_job_log(job_id: str) -> Response | tuple[Response, int]:
+    """Return the lines added to the job log since the 'offset' query parameter
+
+    Long-polls for up to 'wait' seconds (at most LOG_POLL_WAIT) until new lines
+    arrive or the job ends. The returned 'offset' is passed with the next call.
+    """
+    timeout = min(
+        max(request.args.get("wait", 0, type=float), 0),
+        current_app.config.get("LOG_POLL_WAIT", 20),
+    )
+    uploads = current_app.config.get("UPLOAD_FOLDER")
+    log = JobLog(
+        results=uploads / job_id / "results",
+        registry=JobRegistry(path=uploads / ".jobs.sqlite3"),
+    )
+    try:
+        return jsonify(log.wait(request.args.get("offset", 0, type=int), timeout))
+    except FileNotFoundError:
+        return jsonify({"error": "Log not found"}), 404
+
+
+@bp.route("/api/jobs/<job_id>")
+def api_job(job_id: str) -> Response | tuple[Response, int]:
+    """Return the status record of a job with its available result files
+
+    Jobs without a registry record (e.g. the examples) are reported from their
+    result files, as are the result files of records that lack them.
+    """
+    uploads = current_app.config.get("UPLOAD_FOLDER")
+    results = uploads / job_id / "results"
+    record = JobRegistry(path=uploads / ".jobs.sqlite3").get(job_id)
+    if record is not None:
+        if record["results"] is None:
+            record["results"] = ResultFiles(results=results).available()
+        return jsonify(record)
+
+    if not results.is_dir():
+        return jsonify({"error": "Job not found"}), 404
+
+    state = JobLog(results=results).state()
+    return jsonify(
+        {
+            "job_id": job_id,
+            "state": "succeeded" if state == "finished" else state,
+            "stage": None,
+            "progress": 1.0 if state == "finished" else 0.0,
+            "submitted_at": None,
+            "started_at": None,
+            "finished_at": None,
+            "error": None,
+            "results": ResultFiles(results=results).available(),
+        }
+    )
@@ -21,12 +21,17 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
+import sqlite3
 from pathlib import Path
 from typing import Union
 
-from flask import Response, current_app, jsonify, render_template, send_file
+from flask import Response, current_app, jsonify, render_template
 
+from fermo_gui.analysis.result_files import ResultFiles
+from fermo_gui.config.metrics import job_samples, queue_samples
+from fermo_gui.processing.job_registry import JobRegistry
 from fermo_gui.routes import bp
+from fermo_gui.routes.conditional import send_result_file
 
 
 @bp.route("/")
@@ -47,28 +52,42 @@ def contact() -> str:
 
 @bp.route("/download/<job_id>/<filename>")
 def download_file(job_id: str, filename: str) -> Union[Response, tuple[Response, int]]:
-    download_f = (
-        Path(current_app.config.get("UPLOAD_FOLDER"))
-        .joinpath(job_id)
-        .joinpath("results")
-        .joinpath(filename)
-    )
-    if not download_f.exists():
+    results = Path(current_app.config.get("UPLOAD_FOLDER")).joinpath(job_id, "results")
+    try:
+        return send_result_file(results, filename)
+    except FileNotFoundError:
         return jsonify({"error": "File not found"}), 404
 
-    return send_file(download_f.resolve(), as_attachment=True)
-
 
 @bp.route("/check_file/<job_id>/<filename>")
 def check_file(job_id: str, filename: str) -> Response:
     """Check if the given file exists for the given job id"""
-    download_f = (
-        Path(current_app.config.get("UPLOAD_FOLDER"))
-        .joinpath(job_id)
-        .joinpath("results")
-        .joinpath(filename)
-    )
-    if download_f.exists():
+    results = Path(current_app.config.get("UPLOAD_FOLDER")).joinpath(job_id, "results")
+    if ResultFiles(results=results).locate(filename) is not None:
         return jsonify({"exists": True})
     else:
         return jsonify({"exists": False})
+
+
+@bp.route("/metrics")
+def metrics() -> Response:
+    """Serve operational metrics in the Prometheus text format
+
+    Request, upload and session metrics are merged from all web processes;
+    queue sizes are read from the Celery broker and job states and run times
+    from the job registry at the time of the scrape.
+    """
+    samples = current_app.extensions["metrics"].collect()
+    samples.update(queue_samples(current_app.extensions["celery"]))
+    registry = JobRegistry(
+        path=current_app.config.get("UPLOAD_FOLDER") / ".jobs.sqlite3"
+    )
+    try:
+        samples.update(job_samples(registry.state_counts(), registry.durations()))
+    except sqlite3.Error as e:
+        current_app.logger.warning(f"Could not read job metrics: {e!s}")
+
+    return Response(
+        current_app.extensions["metrics"].render(samples),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
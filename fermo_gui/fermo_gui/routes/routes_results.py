@@ -21,8 +21,7 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
-import json
-from pathlib import Path
+import time
 from typing import Union
 
 from flask import (
@@ -32,12 +31,26 @@ from flask import (
     redirect,
     render_template,
     request,
-    send_file,
+    session,
     url_for,
 )
 
-from fermo_gui.analysis.dashboard_manager import DashboardManager
+from fermo_gui.analysis.result_files import ResultFiles
+from fermo_gui.processing.job_registry import JobRegistry
 from fermo_gui.routes import bp
+from fermo_gui.routes.conditional import (
+    get_cache,
+    respond_conditionally,
+    send_result_file,
+)
+
+
+def job_state(job_id: str) -> str | None:
+    """Return the state of a job from the job registry, or None if unregistered"""
+    record = JobRegistry(
+        path=current_app.config.get("UPLOAD_FOLDER") / ".jobs.sqlite3"
+    ).get(job_id)
+    return None if record is None else record["state"]
 
 
 @bp.route("/results/job_failed/<job_id>/")
@@ -61,20 +74,14 @@ def job_failed(job_id: str) -> str | Response:
 
 @bp.route("/results/job_running/<job_id>/")
 def job_running(job_id: str) -> str | Response:
-    """Render the job_running html."""
+    """Render the job_running html; the log is streamed by api_job_log."""
     job_path = current_app.config.get("UPLOAD_FOLDER") / job_id
     log_path = job_path / "results" / "out.fermo.log"
 
-    if not log_path.exists():
+    if not log_path.exists() and job_state(job_id) not in ("queued", "running"):
         return redirect(url_for("routes.job_not_found", job_id=job_id))
 
-    try:
-        with open(log_path) as f:
-            log = f.read().split("\n")
-    except FileNotFoundError:
-        log = []
-
-    return render_template("job_running.html", job_id=job_id, log=log)
+    return render_template("job_running.html", job_id=job_id)
 
 
 @bp.route("/results/job_not_found/<job_id>/")
@@ -96,36 +103,23 @@ def download(job_id: str, identifier: str) -> Response:
         A Response object containing the file or None
     """
 
-    def _route(file: Path):
-        if file.exists():
-            return send_file(f, as_attachment=True)
-        else:
-            raise FileNotFoundError
-
-    job_path = current_app.config.get("UPLOAD_FOLDER") / job_id
+    results = current_app.config.get("UPLOAD_FOLDER") / job_id / "results"
     try:
         match identifier:
             case "session":
-                f = job_path.joinpath("results/out.fermo.session.json")
-                return _route(f)
+                return send_result_file(results, "out.fermo.session.json")
             case "peak_mod":
-                f = job_path.joinpath("results/out.fermo.full.csv")
-                return _route(f)
+                return send_result_file(results, "out.fermo.full.csv")
             case "summary":
-                f = job_path.joinpath("results/out.fermo.summary.txt")
-                return _route(f)
+                return send_result_file(results, "out.fermo.summary.txt")
             case "log":
-                f = job_path.joinpath("results/out.fermo.log")
-                return _route(f)
+                return send_result_file(results, "out.fermo.log")
             case "peak_abbr":
-                f = job_path.joinpath("results/out.fermo.abbrev.csv")
-                return _route(f)
+                return send_result_file(results, "out.fermo.abbrev.csv")
             case "sim_cosine":
-                f = job_path.joinpath("results/out.fermo.modified_cosine.graphml")
-                return _route(f)
+                return send_result_file(results, "out.fermo.modified_cosine.graphml")
             case "sim_deep":
-                f = job_path.joinpath("results/out.fermo.ms2deepscore.graphml")
-                return _route(f)
+                return send_result_file(results, "out.fermo.ms2deepscore.graphml")
             case _:
                 raise FileNotFoundError
     except FileNotFoundError:
@@ -136,7 +130,10 @@ def download(job_id: str, identifier: str) -> Response:
 def task_result(job_id: str) -> Union[str, Response]:
     """Render the result dashboard page for the given job id if found.
 
-    If the response is POST, force-load the results
+    If the response is POST, force-load the results. Results are served whenever
+    the session file exists, also while start_job runs its last stages or if
+    one of them failed. Otherwise, queued, running and failed jobs are
+    recognized by the job registry; unregistered jobs by their files.
 
     Arguments:
         job_id: the job identifier, provided by the URL variable
@@ -144,37 +141,57 @@ def task_result(job_id: str) -> Union[str, Response]:
     Returns:
         The dashboard page or the job_not_found page
     """
-    size_tol = 50 * 1024 * 1024
+    size_tol = current_app.config.get("MAX_DASHBOARD_SIZE")
     job_path = current_app.config.get("UPLOAD_FOLDER") / job_id
-    sess_path = job_path / "results" / "out.fermo.session.json"
+    files = ResultFiles(results=job_path / "results")
+    sess_path = files.locate("out.fermo.session.json")
     fail_path = job_path / "results" / "out.failed.txt"
     log_path = job_path / "results" / "out.fermo.log"
 
-    if sess_path.exists():
-        sess_size = sess_path.stat().st_size
+    if sess_path is not None:
+        sess_size = ResultFiles.text_size(sess_path)
         if request.method == "GET" and sess_size > size_tol:
             sess_size = sess_size / 1024 / 1024
             return render_template(
                 "job_download.html",
                 job_id=job_id,
                 size=f"{sess_size:.2f}",
-                log=job_path.joinpath("results/out.fermo.log").exists(),
-                sim_cosine=job_path.joinpath(
-                    "results/out.fermo.modified_cosine.graphml"
-                ).exists(),
-                sim_deep=job_path.joinpath(
-                    "results/out.fermo.ms2deepscore.graphml"
-                ).exists(),
+                log=files.locate("out.fermo.log") is not None,
+                sim_cosine=files.locate("out.fermo.modified_cosine.graphml")
+                is not None,
+                sim_deep=files.locate("out.fermo.ms2deepscore.graphml") is not None,
             )
 
-        with open(sess_path) as infile:
-            session = json.load(infile)
-        manager = DashboardManager()
-        manager.prepare_data_get(session)
-        return render_template(
-            "dashboard.html", data=manager.provide_data_get(), job_id=job_id
+        JobRegistry(
+            path=current_app.config.get("UPLOAD_FOLDER") / ".jobs.sqlite3"
+        ).touch(job_id)
+
+        def _render() -> str:
+            start = time.perf_counter()
+            data = get_cache(job_id).provide()
+            metrics = current_app.extensions["metrics"]
+            metrics.observe("fermo_session_load_seconds", time.perf_counter() - start)
+            metrics.observe("fermo_session_bytes", sess_size)
+            return render_template("dashboard.html", data=data, job_id=job_id)
+
+        if request.method == "POST":
+            return _render()
+
+        # the page embeds the CSRF token of the session, which expires
+        csrf_token = session.get(
+            current_app.config.get("WTF_CSRF_FIELD_NAME", "csrf_token")
         )
-    elif fail_path.exists():
+        csrf_limit = current_app.config.get("WTF_CSRF_TIME_LIMIT", 3600)
+        csrf_window = int(time.time() // (csrf_limit / 2)) if csrf_limit else 0
+        return respond_conditionally(job_id, _render, str(csrf_token), str(csrf_window))
+
+    match job_state(job_id):
+        case "queued" | "running":
+            return redirect(url_for("routes.job_running", job_id=job_id))
+        case "failed":
+            return redirect(url_for("routes.job_failed", job_id=job_id))
+
+    if fail_path.exists():
         return redirect(url_for("routes.job_failed", job_id=job_id))
     elif log_path.exists():
         return redirect(url_for("routes.job_running", job_id=job_id))
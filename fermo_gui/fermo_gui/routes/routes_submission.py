@@ -28,11 +28,16 @@ from flask import (
     Response,
     current_app,
     flash,
+    jsonify,
     render_template,
     request,
 )
+from pydantic import ValidationError
 
+from fermo_gui.processing.blob_store import BlobStore
+from fermo_gui.processing.chunked_upload import ChunkedUpload
 from fermo_gui.processing.input_parser import InputParser
+from fermo_gui.processing.job_registry import JobRegistry
 from fermo_gui.routes import bp
 
 
@@ -75,6 +80,112 @@ def dispatch() -> str | Response:
 
 @bp.route("/analysis/job_submitted/<job_id>/", methods=["GET"])
 def job_submitted(job_id: str) -> str:
-    """Placeholder during calculation."""
+    """Placeholder during calculation, with the estimated run time if available"""
     online = current_app.config.get("ONLINE")
-    return render_template("job_submitted.html", job_id=job_id, online=online)
+    record = JobRegistry(
+        path=current_app.config.get("UPLOAD_FOLDER") / ".jobs.sqlite3"
+    ).get(job_id)
+    return render_template(
+        "job_submitted.html", job_id=job_id, online=online, record=record
+    )
+
+
+def get_upload(upload_id: str) -> ChunkedUpload:
+    """Create the chunked upload instance of the given upload id
+
+    Raises:
+        FileNotFoundError: invalid upload id
+    """
+    try:
+        return ChunkedUpload(
+            root=Path(current_app.config.get("UPLOAD_FOLDER")).joinpath(".chunks"),
+            upload_id=upload_id,
+        )
+    except ValidationError as e:
+        raise FileNotFoundError(f"Invalid upload ID '{upload_id}'.") from e
+
+
+@bp.route("/analysis/uploads/", methods=["POST"])
+def upload_create() -> tuple[Response, int]:
+    """Register a chunked upload of a single input file
+
+    Expects a JSON body with 'filename' and 'size' in bytes. The returned upload
+    ID is referenced in the dispatch form as '<field>Upload' instead of the file.
+    """
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        body = {}
+
+    filename = str(body.get("filename") or "")
+    size = body.get("size")
+    if filename.rsplit(".", 1)[-1].lower() not in current_app.config.get(
+        "ALLOWED_EXTENSIONS"
+    ):
+        return jsonify({"error": "File type not allowed"}), 400
+    elif not isinstance(size, int):
+        return jsonify({"error": "Invalid file size"}), 400
+    elif current_app.config.get("ONLINE") and size > current_app.config.get(
+        "MAX_CONTENT_LENGTH"
+    ):
+        return jsonify({"error": "File too large"}), 413
+
+    try:
+        upload = ChunkedUpload.create(
+            Path(current_app.config.get("UPLOAD_FOLDER")).joinpath(".chunks"),
+            filename,
+            size,
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify(
+        {**upload.status(), "chunk_size": current_app.config.get("UPLOAD_CHUNK_SIZE")}
+    ), 201
+
+
+@bp.route("/analysis/uploads/<upload_id>", methods=["GET"])
+def upload_status(upload_id: str) -> Response | tuple[Response, int]:
+    """Return the progress of a chunked upload, to resume it"""
+    try:
+        return jsonify(get_upload(upload_id).status())
+    except FileNotFoundError:
+        return jsonify({"error": "Upload not found"}), 404
+
+
+@bp.route("/analysis/uploads/<upload_id>", methods=["PUT"])
+def upload_chunk(upload_id: str) -> Response | tuple[Response, int]:
+    """Append a chunk to a chunked upload
+
+    The chunk is the raw request body; the 'offset' query parameter gives its
+    position in the file and the optional 'X-Chunk-SHA256' header its hex
+    digest. Returns 409 with the current status if the offset does not match the
+    received bytes.
+    """
+    if (request.content_length or 0) > current_app.config.get("UPLOAD_CHUNK_SIZE"):
+        return jsonify({"error": "Chunk too large"}), 413
+
+    try:
+        upload = get_upload(upload_id)
+        return jsonify(
+            upload.append(
+                request.stream,
+                offset=request.args.get("offset", -1, type=int),
+                sha256=request.headers.get("X-Chunk-SHA256"),
+                blobs=BlobStore(
+                    root=Path(current_app.config.get("UPLOAD_FOLDER")).joinpath(
+                        ".blobs"
+                    )
+                ),
+                max_size=current_app.config.get("UPLOAD_CHUNK_SIZE"),
+            )
+        )
+    except FileNotFoundError:
+        return jsonify({"error": "Upload not found"}), 404
+    except BlockingIOError:
+        return jsonify({"error": "Chunk upload in progress", **upload.status()}), 409
+    except ValueError as e:
+        status = upload.status()
+        code = (
+            409 if request.args.get("offset", type=int) != status["received"] else 400
+        )
+        return jsonify({"error": str(e), **status}), code
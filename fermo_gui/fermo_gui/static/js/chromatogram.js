@@ -22,14 +22,7 @@ SOFTWARE.
 */
 
 export function visualizeData(sampleData, networkType = "modified_cosine",
-                              isFeatureVisualization = false, minScore = 0, maxScore = 10, findFeatureId = false,
-                              minPhenotypeScore = 0, maxPhenotypeScore = 1, showOnlyPhenotypeFeatures = false,
-                              minMatchScore = 0, maxMatchScore = 1, showOnlyMatchFeatures = false,
-                              showOnlyAnnotationFeatures = false, showOnlyBlankFeatures = false,
-                              minMzScore = 0, maxMzScore = false,
-                              minSampleScore = 0, maxSampleScore = false,
-                              foldScore = null, foldGroup1 = false, foldGroup2 = false, foldSelectGroup = false,
-                              groupFilterValues = null, networkFilterValues = null, statsFIdGroups = null) {
+                              isFeatureVisualization = false, retainedIds = null) {
     const data = [];
     const maxPeaksPerSample = sampleData.traceInt.map(trace => Math.max(...trace));
     if (maxPeaksPerSample.length === 0 || maxPeaksPerSample.every(peak => isNaN(peak))) {
@@ -42,17 +35,7 @@ export function visualizeData(sampleData, networkType = "modified_cosine",
             featureId: sampleData.featureId[i],
             maxPeak: maxPeaksPerSample[i],
             chromColors: getChromColors(sampleData, i, isFeatureVisualization),
-            toolTip: getToolTip(sampleData, i),
-            novScore: sampleData.novScore[i],
-            phenotypeScore: sampleData.annotations?.[i]?.phenotypes?.[0]?.score ?? null,
-            matchScore: sampleData.annotations?.[i]?.matches?.[0]?.score ?? null,
-            annId: sampleData.annotations?.[i]?.adducts ?? null,
-            blankId: sampleData.blankAs?.[i] ?? null,
-            mz: sampleData.precMz[i],
-            sampleCount: sampleData.samples?.[i].length ?? null,
-            foldChange: sampleData.fGroupData?.[i]?.[foldSelectGroup] ?? [],
-            featureGroups: Object(statsFIdGroups)?.[sampleData.featureId[i]] ?? [],
-            networkFIds: networkType === 'modified_cosine' ? sampleData.fNetworkCosine?.[i] ?? [] : sampleData.fNetworkDeepScore?.[i] ?? []
+            toolTip: getToolTip(sampleData, i)
         })).sort((a, b) => b.maxPeak - a.maxPeak);
 
         combinedData.forEach(dataItem => {
@@ -76,45 +59,8 @@ export function visualizeData(sampleData, networkType = "modified_cosine",
                 },
             };
 
-            // Fold Score validation
-            let foldValid = foldScore === null || !foldSelectGroup || !foldGroup1 || !foldGroup2;
-            if (!foldValid) {
-                for (const foldChange of dataItem.foldChange) {
-                    if ((foldChange.group1 === foldGroup1 && foldChange.group2 === foldGroup2) ||
-                        (foldChange.group1 === foldGroup2 && foldChange.group2 === foldGroup1)) {
-                        if (foldChange.factor >= foldScore) {
-                            foldValid = true;
-                            break;
-                        }
-                    }
-                }
-            }
-            const groupFilterValid = groupFilterValues ?
-            groupFilterValues.some(value => dataItem.featureGroups.includes(value)) : true;
-
-            const featureIdToBlankId = Object.fromEntries(
-                sampleData.featureId.map((id, index) => [id, sampleData.blankAs?.[index]])
-            );
-            const networkFilterValid = networkFilterValues ? (dataItem.networkFIds.length > 0
-            && !dataItem.networkFIds.some(id =>
-                networkFilterValues.some(value =>
-                    (value === "blanks" && featureIdToBlankId[id] === true) ||
-                    (statsFIdGroups[id] && statsFIdGroups[id].includes(value))
-                ))) : true;
-
-            if (!isFeatureVisualization &&
-                ((dataItem.novScore < minScore || dataItem.novScore > maxScore) ||
-                (showOnlyPhenotypeFeatures && (dataItem.phenotypeScore === null ||
-                dataItem.phenotypeScore < minPhenotypeScore || dataItem.phenotypeScore > maxPhenotypeScore)) ||
-                (showOnlyMatchFeatures && (dataItem.matchScore === null ||
-                dataItem.matchScore < minMatchScore || dataItem.matchScore > maxMatchScore)) ||
-                (showOnlyAnnotationFeatures && (dataItem.annId === null)) ||
-                (showOnlyBlankFeatures && (dataItem.blankId === true)) ||
-                (findFeatureId && (dataItem.featureId !== findFeatureId)) ||
-                (maxMzScore && (dataItem.mz < minMzScore || dataItem.mz > maxMzScore)) ||
-                (maxSampleScore && (dataItem.sampleCount < minSampleScore || dataItem.sampleCount > maxSampleScore)) ||
-                !foldValid || !groupFilterValid || !networkFilterValid
-                )) {
+            // Features removed by the filters (see filters.js) are greyed out
+            if (!isFeatureVisualization && retainedIds && !retainedIds.has(dataItem.featureId)) {
                 result.line.color = 'rgba(212, 212, 212, 0.8)';
                 result.fillcolor = 'rgba(212, 212, 212, 0.3)';
             }
@@ -0,0 +1,172 @@
+/* Resumable chunked upload of input files for forms.html
+
+Copyright (c) 2025-present Mitja M. Zdouc, PhD
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+*/
+
+
+/**
+ * Computes the hex sha256 digest of a chunk, if the browser supports it.
+ * @param {Blob} chunk - The chunk to hash
+ * @returns {Promise<string|null>} The hex digest or null in insecure contexts
+ */
+async function chunkDigest(chunk) {
+  if (!window.crypto || !window.crypto.subtle) {
+    return null;
+  }
+  const digest = await window.crypto.subtle.digest("SHA-256", await chunk.arrayBuffer());
+  return Array.from(new Uint8Array(digest))
+    .map(byte => byte.toString(16).padStart(2, "0"))
+    .join("");
+}
+
+
+/**
+ * Uploads a file in chunks, resuming after failed or rejected chunks.
+ * Upload IDs are kept in the sessionStorage to resume after a page reload.
+ * @param {File} file - The file to upload
+ * @param {string} csrfToken - The CSRF token of the form
+ * @returns {Promise<string>} The upload ID
+ */
+async function uploadFileInChunks(file, csrfToken) {
+  const storageKey = `fermoUpload:${file.name}:${file.size}:${file.lastModified}`;
+  let status = null;
+
+  const storedId = sessionStorage.getItem(storageKey);
+  if (storedId) {
+    const response = await fetch(`/analysis/uploads/${storedId}`);
+    if (response.ok) {
+      status = await response.json();
+    }
+  }
+
+  if (!status) {
+    const response = await fetch("/analysis/uploads/", {
+      method: "POST",
+      headers: { "Content-Type": "application/json", "X-CSRFToken": csrfToken },
+      body: JSON.stringify({ filename: file.name, size: file.size })
+    });
+    status = await response.json();
+    if (!response.ok) {
+      throw new Error(`${file.name}: ${status.error}`);
+    }
+    sessionStorage.setItem(storageKey, status.upload_id);
+  }
+
+  const chunkSize = status.chunk_size || 8 * 1024 * 1024;
+  let retries = 0;
+  while (!status.complete) {
+    const chunk = file.slice(status.received, status.received + chunkSize);
+    const headers = { "X-CSRFToken": csrfToken };
+    const digest = await chunkDigest(chunk);
+    if (digest) {
+      headers["X-Chunk-SHA256"] = digest;
+    }
+
+    let response = null;
+    try {
+      response = await fetch(
+        `/analysis/uploads/${status.upload_id}?offset=${status.received}`,
+        { method: "PUT", headers: headers, body: chunk }
+      );
+    } catch (error) {
+      response = null;
+    }
+
+    if (response && (response.ok || response.status === 409)) {
+      const body = await response.json();
+      if (response.ok) {
+        retries = 0;
+      } else {
+        await new Promise(resolve => setTimeout(resolve, 500));
+      }
+      status = { ...status, ...body };
+      continue;
+    }
+
+    retries += 1;
+    if (retries > 3) {
+      throw new Error(`${file.name}: upload failed, please try again.`);
+    }
+    await new Promise(resolve => setTimeout(resolve, 1000 * retries));
+  }
+
+  sessionStorage.removeItem(storageKey);
+  return status.upload_id;
+}
+
+
+/**
+ * Sends the files of the new analysis form as chunked uploads before submission.
+ * The file inputs are replaced by hidden '<name>Upload' fields with the upload IDs.
+ * @param {SubmitEvent} event - The submit event of the form
+ */
+async function submitChunkedUploads(event) {
+  const form = event.target;
+  const submitButton = document.getElementById("submitNewAnalysis");
+  const fileInputs = Array.from(form.querySelectorAll("input[type=file]"))
+    .filter(input => input.files.length > 0);
+  if (fileInputs.length === 0) {
+    return;
+  }
+
+  event.preventDefault();
+  submitButton.disabled = true;
+  const csrfToken = form.querySelector("input[name=csrf_token]").value;
+
+  try {
+    for (const input of fileInputs) {
+      const uploadIds = [];
+      for (const file of Array.from(input.files)) {
+        submitButton.textContent = `Uploading ${file.name}...`;
+        uploadIds.push(await uploadFileInChunks(file, csrfToken));
+      }
+      const hidden = document.createElement("input");
+      hidden.type = "hidden";
+      hidden.name = `${input.name}Upload`;
+      hidden.value = uploadIds.join(",");
+      form.appendChild(hidden);
+      input.disabled = true;
+    }
+  } catch (error) {
+    alert(error.message);
+    fileInputs.forEach(input => { input.disabled = false; });
+    form.querySelectorAll("input[type=hidden][name$=Upload]").forEach(el => el.remove());
+    submitButton.disabled = false;
+    submitButton.textContent = "Start new analysis";
+    return;
+  }
+
+  // form.submit() does not send the submitter, which the route dispatches on
+  const submitter = document.createElement("input");
+  submitter.type = "hidden";
+  submitter.name = submitButton.name;
+  submitter.value = submitButton.value;
+  form.appendChild(submitter);
+  form.submit();
+}
+
+
+document.addEventListener("DOMContentLoaded", () => {
+  const submitButton = document.getElementById("submitNewAnalysis");
+  if (submitButton && submitButton.form && window.fetch) {
+    submitButton.form.addEventListener("submit", submitChunkedUploads);
+  }
+});
@@ -21,24 +21,28 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 */
 
-import { getSampleData, getFeatureData } from './parsing.js';
+import { loadSampleData, getSampleData, getFeatureData } from './parsing.js';
 import { updateFeatureTables, hideTables, clearHeatmaps } from './dynamic_tables.js';
 import { visualizeData, addBoxVisualization } from './chromatogram.js';
 import { visualizeNetwork, hideNetwork } from './network.js';
 import { enableDragAndDrop, disableDragAndDrop } from './dragdrop.js';
-import { getFeaturesWithinRange, getFilterGroupSelectionFields, populateDropdown } from './filters.js';
+import { plotDistributions } from './distplot.js';
+import { fetchFilterResult, getFilterGroupSelectionFields, populateDropdown } from './filters.js';
 
 document.addEventListener('DOMContentLoaded', function() {
     let dragged;
     let currentBoxParams = null;
     let sampleData;
-    let statsChromatogram;
-    let statsNetwork;
+    let activeSampleName;
     let statsGroups;
     let clickedOnPoint = false;
+    let filterRequest = 0;
 
     const getCurrentBoxParams = () => currentBoxParams;
 
+    plotDistributions();
+    document.getElementById('filters').addEventListener('shown.bs.collapse', plotDistributions);
+
     const allowDragAndDropCheckbox = document.getElementById('allowDragAndDrop');
     allowDragAndDropCheckbox.checked ? enableDragAndDrop() : disableDragAndDrop();
 
@@ -46,19 +50,17 @@ document.addEventListener('DOMContentLoaded', function() {
         this.checked ? enableDragAndDrop() : disableDragAndDrop();
     });
 
+    const jobId = document.querySelector('.container').getAttribute('data-job-id');
+    const csrfToken = document.querySelector('.container').getAttribute('data-csrf-token');
     const chromatogramElement = document.getElementById('mainChromatogram');
-    const networkElement = document.getElementById('cy');
     const groupElement = document.getElementById('groupInfo');
-    const featureGroupElement = document.getElementById('statsFIdGroups');
-    statsChromatogram = JSON.parse(chromatogramElement.getAttribute('data-stats-chromatogram'));
-    statsNetwork = JSON.parse(networkElement.getAttribute('data-stats-network'));
+    const rtRange = JSON.parse(chromatogramElement.getAttribute('data-rt-range'));
     statsGroups = JSON.parse(groupElement.getAttribute('data-stats-groups'));
-    const statsFIdGroups = JSON.parse(featureGroupElement.getAttribute('data-stats-fgroups'));
 
     const firstSample = document.querySelector('.select-sample');
     if (firstSample) {
         const firstSampleName = firstSample.getAttribute('data-sample-name');
-        sampleData = getSampleData(firstSampleName, statsChromatogram);
+        activeSampleName = firstSampleName;
         document.getElementById('activeSample').textContent = `Sample: ${firstSampleName}`;
 
         const networkType = 'modified_cosine';
@@ -66,7 +68,11 @@ document.addEventListener('DOMContentLoaded', function() {
         getFilterGroupSelectionFields(statsGroups);
         populateDropdown(statsGroups);
 
-        Plotly.newPlot(chromatogramElement, []).then(() => {
+        Promise.all([
+            loadSampleData(jobId, firstSampleName),
+            Plotly.newPlot(chromatogramElement, [])
+        ]).then(([activeSampleData]) => {
+            sampleData = getSampleData(activeSampleData, rtRange);
 
             chromatogramElement.addEventListener('click', function(evt) {
                 var bb = evt.target.getBoundingClientRect();
@@ -80,6 +86,7 @@ document.addEventListener('DOMContentLoaded', function() {
             });
 
             document.getElementById('networkSelect').addEventListener('change', handleNetworkTypeChange);
+            document.getElementById('networkHops').addEventListener('change', handleNetworkTypeChange);
             document.getElementById('showBlankFeatures').addEventListener('change', updateRange);
             document.getElementById('findInput').addEventListener('input', updateRange);
             document.getElementById('mz1Input').addEventListener('input', updateRange);
@@ -114,7 +121,7 @@ document.addEventListener('DOMContentLoaded', function() {
         const sampleId = updateFeatureTables(featureId, sampleData, filteredSampleData);
         currentBoxParams = { traceInt: sampleData.traceInt[sampleId], traceRt: sampleData.traceRt[sampleId] };
         addBoxVisualization(currentBoxParams.traceInt, currentBoxParams.traceRt);
-        visualizeNetwork(featureId, statsNetwork, filteredSampleData, sampleData, sampleId, statsChromatogram, networkType);
+        visualizeNetwork(featureId, filteredSampleData, sampleData, sampleId, networkType, jobId);
     }
 
     function unselectFeature() {
@@ -137,7 +144,7 @@ document.addEventListener('DOMContentLoaded', function() {
         const sampleId = updateFeatureTables(featureId, sampleData, filteredSampleData);
         updateRange();
         currentBoxParams = { traceInt: sampleData.traceInt[sampleId], traceRt: sampleData.traceRt[sampleId] };
-        visualizeNetwork(featureId, statsNetwork, filteredSampleData, sampleData, sampleId, statsChromatogram, networkType);
+        visualizeNetwork(featureId, filteredSampleData, sampleData, sampleId, networkType, jobId);
     }
 
     function toggleDropdown(containerId) {
@@ -145,35 +152,38 @@ document.addEventListener('DOMContentLoaded', function() {
         dropdownContainer.style.display = (dropdownContainer.style.display === "none" || dropdownContainer.style.display === "") ? "block" : "none";
     }
 
-    function checkAndEnableOption(jobId, filename, elementId) {
-        const url = `/check_file/${jobId}/${filename}`;
-        fetch(url)
+    function enableDownloadOptions(jobId, options) {
+        // A single status request lists the result files available for download
+        fetch(`/api/jobs/${jobId}`)
             .then(response => response.json())
             .then(data => {
-                const element = document.getElementById(elementId);
-                if (data.exists) {
-                    element.disabled = false;
-                    element.dataset.url = `/download/${jobId}/${filename}`;
-                } else {
-                    element.disabled = true;
-                    delete element.dataset.url;
-                }
+                const available = new Set(data.results || []);
+                Object.entries(options).forEach(([filename, elementId]) => {
+                    const element = document.getElementById(elementId);
+                    if (available.has(filename)) {
+                        element.disabled = false;
+                        element.dataset.url = `/download/${jobId}/${filename}`;
+                    } else {
+                        element.disabled = true;
+                        delete element.dataset.url;
+                    }
+                });
             })
             .catch(error => {
                 console.error('Error:', error);
             });
     }
 
-    const jobId = document.querySelector('.container').getAttribute('data-job-id');
-
     // Check and enable options based on file availability
-    checkAndEnableOption(jobId, 'out.fermo.summary.txt', 'summary');
-    checkAndEnableOption(jobId, 'out.fermo.abbrev.csv', 'abbrev');
-    checkAndEnableOption(jobId, 'out.fermo.log', 'log');
-    checkAndEnableOption(jobId, 'out.fermo.session.json', 'session');
-    checkAndEnableOption(jobId, 'out.fermo.full.csv', 'full');
-    checkAndEnableOption(jobId, 'out.fermo.modified_cosine.graphml', 'mod_cosine');
-    checkAndEnableOption(jobId, 'out.fermo.ms2deepscore.graphml', 'ms2deepscore');
+    enableDownloadOptions(jobId, {
+        'out.fermo.summary.txt': 'summary',
+        'out.fermo.abbrev.csv': 'abbrev',
+        'out.fermo.log': 'log',
+        'out.fermo.session.json': 'session',
+        'out.fermo.full.csv': 'full',
+        'out.fermo.modified_cosine.graphml': 'mod_cosine',
+        'out.fermo.ms2deepscore.graphml': 'ms2deepscore',
+    });
 
     // Add event listeners to download buttons
     document.querySelectorAll('.download-btn').forEach(function(button) {
@@ -194,27 +204,40 @@ document.addEventListener('DOMContentLoaded', function() {
     document.querySelectorAll('.select-sample').forEach(row => {
         row.addEventListener('click', function() {
             const sampleName = this.getAttribute('data-sample-name');
-            sampleData = getSampleData(sampleName, statsChromatogram);
-            hideNetwork();
-            hideTables();
-            document.getElementById('activeSample').textContent = `Sample: ${sampleName}`;
-            Plotly.purge('featureChromatogram');
-            document.getElementById('feature-general-info').textContent =
-            'Click on any feature in the main chromatogram overview.';
-            document.getElementById('feature-annotation').textContent =
-            'Click on any feature in the main chromatogram overview.';
-            clearHeatmaps();
-            const networkType = 'modified_cosine';
-            currentBoxParams = null;
-
-            initializeFilters(visualizeData, handleChromatogramClick, addBoxVisualization, updateRetainedFeatures,
-                sampleData, chromatogramElement, getCurrentBoxParams);
-
-            updateRange();
+            activeSampleName = sampleName;
+            loadSampleData(jobId, sampleName).then(activeSampleData => {
+                if (sampleName !== activeSampleName) {
+                    return;
+                }
+                selectSample(sampleName, activeSampleData);
+            });
         });
     });
 
+    function selectSample(sampleName, activeSampleData) {
+        sampleData = getSampleData(activeSampleData, rtRange);
+        hideNetwork();
+        hideTables();
+        document.getElementById('activeSample').textContent = `Sample: ${sampleName}`;
+        Plotly.purge('featureChromatogram');
+        document.getElementById('feature-general-info').textContent =
+        'Click on any feature in the main chromatogram overview.';
+        document.getElementById('feature-annotation').textContent =
+        'Click on any feature in the main chromatogram overview.';
+        clearHeatmaps();
+        const networkType = 'modified_cosine';
+        currentBoxParams = null;
+
+        initializeFilters(visualizeData, handleChromatogramClick, addBoxVisualization, updateRetainedFeatures,
+            sampleData, chromatogramElement, getCurrentBoxParams);
+
+        updateRange();
+    }
+
     function updateRange() {
+        if (!sampleData) {
+            return;
+        }
         const chromatogramElement = document.getElementById('mainChromatogram');
         let currentXRange = chromatogramElement.layout.xaxis.range;
         let currentYRange = chromatogramElement.layout.yaxis.range;
@@ -247,71 +270,76 @@ document.addEventListener('DOMContentLoaded', function() {
         const networkFilterValues = Array.from(networkFilterSelect.selectedOptions).map(option => option.value);
 
         const foldScoreInputsFilled = foldScore && foldGroup1 && foldGroup2 && foldSelectGroup;
+        const range = (low, high) => [isNaN(low) ? null : low, isNaN(high) ? null : high];
+
+        const spec = {
+            novelty: range(minScore, maxScore),
+            phenotype: showOnlyPhenotypeFeatures ? range(minPhenotypeScore, maxPhenotypeScore) : null,
+            match: showOnlyMatchFeatures ? range(minMatchScore, maxMatchScore) : null,
+            annotated: showOnlyAnnotationFeatures,
+            exclude_blanks: showOnlyBlankFeatures,
+            f_id: findFeatureId ? findFeatureId : null,
+            mz: (minMzScore || maxMzScore) ? range(minMzScore, maxMzScore) : null,
+            sample_count: (minSampleCount || maxSampleCount) ? range(minSampleCount, maxSampleCount) : null,
+            fold: foldScoreInputsFilled ? {
+                group: foldSelectGroup, group1: foldGroup1, group2: foldGroup2, factor: foldScore
+            } : null,
+            groups: groupFilterValues.length ? groupFilterValues : null,
+            network_exclude: networkFilterValues.length ? networkFilterValues : null,
+            network_type: networkType
+        };
 
-        visualizeData(sampleData, networkType, false, minScore, maxScore, findFeatureId,
-                      minPhenotypeScore, maxPhenotypeScore, showOnlyPhenotypeFeatures,
-                      minMatchScore, maxMatchScore, showOnlyMatchFeatures,
-                      showOnlyAnnotationFeatures, showOnlyBlankFeatures,
-                      minMzScore, maxMzScore ? maxMzScore : 10000,
-                      minSampleCount, maxSampleCount ? maxSampleCount : 100,
-                      foldScoreInputsFilled ? foldScore : null, foldGroup1, foldGroup2, foldSelectGroup,
-                      groupFilterValues.length ? groupFilterValues : null,
-                      networkFilterValues.length ? networkFilterValues : null, statsFIdGroups);
-
-        if (currentXRange[0] < 0) {
-            currentXRange = chromatogramElement.layout.xaxis.range;
-            currentYRange = chromatogramElement.layout.yaxis.range;
-        }
+        const request = ++filterRequest;
+        fetchFilterResult(jobId, csrfToken, spec, activeSampleName)
+            .catch(error => {
+                console.error('Error:', error);
+                return null;
+            })
+            .then(result => {
+                if (request !== filterRequest) {
+                    return;
+                }
+                const retainedIds = result ? new Set(result.f_ids) : null;
+                visualizeData(sampleData, networkType, false, retainedIds);
 
-        chromatogramElement.on('plotly_click', function(data) {
-            clickedOnPoint = true;
-            handleChromatogramClick(data);
-        });
+                if (currentXRange[0] < 0) {
+                    currentXRange = chromatogramElement.layout.xaxis.range;
+                    currentYRange = chromatogramElement.layout.yaxis.range;
+                }
 
-        const featureId = document.getElementById('activeFeature').textContent.split(': ')[1];
-        for (var i = 0; i < sampleData.featureId.length; i++) {
-            if (sampleData.featureId[i] == featureId) {
-                var currentBoxParams = { traceInt: sampleData.traceInt[i], traceRt: sampleData.traceRt[i] };
-            }
-        }
+                chromatogramElement.on('plotly_click', function(data) {
+                    clickedOnPoint = true;
+                    handleChromatogramClick(data);
+                });
 
-        if (currentBoxParams) {
-            addBoxVisualization(currentBoxParams.traceInt, currentBoxParams.traceRt);
-        }
+                const featureId = document.getElementById('activeFeature').textContent.split(': ')[1];
+                for (var i = 0; i < sampleData.featureId.length; i++) {
+                    if (sampleData.featureId[i] == featureId) {
+                        var currentBoxParams = { traceInt: sampleData.traceInt[i], traceRt: sampleData.traceRt[i] };
+                    }
+                }
 
-        updateRetainedFeatures(minScore, maxScore, findFeatureId,
-                               minPhenotypeScore, maxPhenotypeScore, showOnlyPhenotypeFeatures,
-                               minMatchScore, maxMatchScore, showOnlyMatchFeatures,
-                               showOnlyAnnotationFeatures, showOnlyBlankFeatures,
-                               minMzScore, maxMzScore, minSampleCount, maxSampleCount,
-                               foldScoreInputsFilled ? foldScore : null, foldGroup1, foldGroup2, foldSelectGroup,
-                               groupFilterValues.length ? groupFilterValues : null,
-                               networkFilterValues.length ? networkFilterValues : null, statsFIdGroups);
-
-        Plotly.relayout(chromatogramElement, {
-            'xaxis.range': currentXRange,
-            'yaxis.range': currentYRange
-        });
+                if (currentBoxParams) {
+                    addBoxVisualization(currentBoxParams.traceInt, currentBoxParams.traceRt);
+                }
+
+                if (result) {
+                    updateRetainedFeatures(result.counts);
+                }
+
+                Plotly.relayout(chromatogramElement, {
+                    'xaxis.range': currentXRange,
+                    'yaxis.range': currentYRange
+                });
+            });
     }
 
-    function updateRetainedFeatures(minScore, maxScore, findFeatureId,
-                                    minPhenotypeScore, maxPhenotypeScore, showOnlyPhenotypeFeatures,
-                                    minMatchRange, maxMatchRange, showOnlyMatchFeatures,
-                                    showAnnotationFeatures, showBlankFeatures,
-                                    minMzScore, maxMzScore, minSampleScore, maxSampleScore,
-                                    foldScore, foldGroup1, foldGroup2, foldSelectGroup,
-                                    groupFilterValues, networkFilterValues, statsFIdGroups) {
+    function updateRetainedFeatures(counts) {
         document.querySelectorAll('.select-sample').forEach(row => {
             const sampleName = row.getAttribute('data-sample-name');
-            const sampleData = getSampleData(sampleName, statsChromatogram);
-            const featuresWithinRange = getFeaturesWithinRange(sampleData, minScore, maxScore, findFeatureId,
-                minPhenotypeScore, maxPhenotypeScore, showOnlyPhenotypeFeatures,
-                minMatchRange, maxMatchRange, showOnlyMatchFeatures,
-                showAnnotationFeatures, showBlankFeatures,
-                minMzScore, maxMzScore, minSampleScore, maxSampleScore,
-                foldScore, foldGroup1, foldGroup2, foldSelectGroup,
-                groupFilterValues, networkFilterValues, statsFIdGroups);
-            row.children[2].textContent = featuresWithinRange;
+            if (sampleName in counts) {
+                row.children[2].textContent = counts[sampleName];
+            }
         });
     }
 
@@ -0,0 +1,67 @@
+/* Draws the pre-binned score distributions of the filter panel
+
+Copyright (c) 2026-present Mitja Maximilian Zdouc, PhD
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+*/
+
+const MIN_BIN_WIDTH = 3;
+
+function selectHistogram(distribution, width) {
+    // histograms are ordered from coarse to fine; use the finest that fits
+    const fitting = distribution.histograms.filter(
+        histogram => histogram.counts.length * MIN_BIN_WIDTH <= width
+    );
+    return fitting.length ? fitting[fitting.length - 1] : distribution.histograms[0];
+}
+
+export function plotDistribution(element) {
+    const distribution = JSON.parse(element.getAttribute('data-distribution'));
+    if (!distribution || !Array.isArray(distribution.histograms)) {
+        return;
+    }
+
+    const histogram = selectHistogram(distribution, element.clientWidth);
+    const trace = {
+        x: histogram.counts.map((_, idx) => histogram.start + (idx + 0.5) * histogram.size),
+        y: histogram.counts,
+        width: histogram.size,
+        type: "bar",
+        marker: { color: "#116789" },
+        hovertemplate: "%{y}<extra></extra>"
+    };
+    const layout = {
+        autosize: true,
+        bargap: 0,
+        margin: { l: 0, r: 0, t: 0, b: 0 },
+        xaxis: {
+            range: [0, 1.05],
+            showticklabels: false
+        },
+        yaxis: {
+            showticklabels: false,
+            type: "log"
+        }
+    };
+    Plotly.react(element, [trace], layout, { responsive: true });
+}
+
+export function plotDistributions() {
+    document.querySelectorAll('[data-distribution]').forEach(plotDistribution);
+}
@@ -32,7 +32,7 @@ export function updateFeatureTables(featureId, sampleData, filteredSampleData) {
             document.getElementById('activeFeature').textContent =
             'Network visualization of feature: ' + featureId;
             const networkType = document.getElementById('networkSelect').value;
-            visualizeData(filteredSampleData, networkType, true, 0, 1);
+            visualizeData(filteredSampleData, networkType, true);
             addBoxVisualization(sampleData.traceInt[i], sampleData.traceRt[i]);
             updateTableWithFeatureData(i, sampleData, networkType);
             updateTableWithGroupData(sampleData.fGroupData[i]);
@@ -21,62 +21,18 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 */
 
-export function getFeaturesWithinRange(sampleData, minScore, maxScore, findFeatureId,
-                                       minPhenotypeScore, maxPhenotypeScore, showOnlyPhenotypeFeatures,
-                                       minMatchScore, maxMatchScore, showOnlyMatchFeatures,
-                                       showOnlyAnnotationFeatures, showOnlyBlankFeatures,
-                                       minMzScore, maxMzScore, minSampleCount, maxSampleCount,
-                                       foldScore, foldGroup1, foldGroup2, foldSelectGroup,
-                                       groupFilterValues, networkFilterValues, statsFIdGroups, networkType) {
-    return sampleData.novScore.reduce((count, score, index) => {
-        const phenotypeScore = sampleData.annotations?.[index]?.phenotypes?.[0]?.score;
-        const matchScore = sampleData.annotations?.[index]?.matches?.[0]?.score;
-        const annotation = sampleData.annotations?.[index]?.adducts ?? null;
-        const mz = sampleData.precMz[index];
-        const blanks = sampleData.blankAs?.[index];
-        const findFeature = sampleData.featureId?.[index];
-        const sampleCount = sampleData.samples[index].length;
-        const foldChanges = sampleData.fGroupData?.[index]?.[foldSelectGroup] ?? [];
-        const featureGroups = Object(statsFIdGroups)?.[findFeature] ?? [];
-        const networkFIds = networkType === 'modified_cosine' ? sampleData.fNetworkCosine?.[index] ?? [] : sampleData.fNetworkDeepScore?.[index] ?? [];
-
-        const groupFilterValid = groupFilterValues ? groupFilterValues.some(value => featureGroups.includes(value)) : true;
-        const featureIdToBlankId = Object.fromEntries(
-            sampleData.featureId.map((id, index) => [id, sampleData.blankAs?.[index]])
-        );
-        const networkFilterValid = networkFilterValues ? (networkFIds.length > 0 && !networkFIds.some(id =>
-            networkFilterValues.some(value =>
-                (value === "blanks" && featureIdToBlankId[id] === true) ||
-                (statsFIdGroups[id] && statsFIdGroups[id].includes(value))
-            ))) : true;
-
-        let foldValid = !foldScore || !foldGroup1 || !foldGroup2 || !foldSelectGroup;
-        if (!foldValid) {
-            for (const foldChange of foldChanges) {
-                if ((foldChange.group1 === foldGroup1 && foldChange.group2 === foldGroup2) ||
-                    (foldChange.group1 === foldGroup2 && foldChange.group2 === foldGroup1)) {
-                    if (foldChange.factor >= foldScore) {
-                        foldValid = true;
-                        break;
-                    }
-                }
-            }
+export function fetchFilterResult(jobId, csrfToken, spec, sampleName) {
+    // Retained features are determined server-side from indexes of the session
+    return fetch(`/api/results/${jobId}/filter`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json', 'X-CSRFToken': csrfToken },
+        body: JSON.stringify({ spec: spec, sample: sampleName })
+    }).then(response => {
+        if (!response.ok) {
+            throw new Error('Could not apply filters');
         }
-
-        if ((score >= minScore && score <= maxScore) &&
-            (!showOnlyPhenotypeFeatures || (phenotypeScore !== null && phenotypeScore >= minPhenotypeScore && phenotypeScore <= maxPhenotypeScore)) &&
-            (!showOnlyMatchFeatures || (matchScore !== null && matchScore >= minMatchScore && matchScore <= maxMatchScore)) &&
-            (!showOnlyAnnotationFeatures || (annotation !== null)) &&
-            (!showOnlyBlankFeatures || (blanks !== true)) &&
-            (!findFeatureId || (findFeatureId === findFeature)) &&
-            (!maxMzScore || (mz >= minMzScore && mz <= maxMzScore)) &&
-            (!maxSampleCount || (sampleCount >= minSampleCount && sampleCount <= maxSampleCount))
-            && foldValid && groupFilterValid && networkFilterValid
-            ) {
-            return count + 1;
-        }
-        return count;
-    }, 0);
+        return response.json();
+    });
 }
 
 export function getFilterGroupSelectionFields(statsGroups) {
@@ -0,0 +1,73 @@
+/* Live update of the job log in job_running.html
+
+Copyright (c) 2025-present Mitja M. Zdouc, PhD
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+*/
+
+
+/**
+ * Long-polls the job log and appends new lines until the job has ended.
+ * Opens the results page once the job finished or failed.
+ * @param {HTMLElement} logContent - The element to append the log lines to
+ */
+async function followJobLog(logContent) {
+  const container = document.getElementById("logContainer");
+  let offset = 0;
+
+  while (true) {
+    let data = null;
+    try {
+      const response = await fetch(`${logContent.dataset.logUrl}?offset=${offset}&wait=20`);
+      if (response.ok) {
+        data = await response.json();
+      }
+    } catch (error) {
+      data = null;
+    }
+
+    if (!data) {
+      await new Promise(resolve => setTimeout(resolve, 5000));
+      continue;
+    }
+
+    const atBottom = container.scrollTop + container.clientHeight >= container.scrollHeight - 5;
+    if (data.reset) {
+      logContent.textContent = "";
+    }
+    logContent.textContent += data.text;
+    if (atBottom) {
+      container.scrollTop = container.scrollHeight;
+    }
+    offset = data.offset;
+
+    if (data.state !== "running" && !data.text) {
+      window.location.href = logContent.dataset.resultUrl;
+      return;
+    }
+  }
+}
+
+
+document.addEventListener("DOMContentLoaded", () => {
+  const logContent = document.getElementById("logContent");
+  if (logContent && window.fetch) {
+    followJobLog(logContent);
+  }
+});
@@ -21,29 +21,52 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 */
 
-import { getUniqueFeatureIds, getFeatureDetails, getFeatureData } from './parsing.js';
+import { getFeatureData } from './parsing.js';
 import { updateFeatureTables } from './dynamic_tables.js';
 
-export function visualizeNetwork(fId, statsNetwork, filteredSampleData, sampleData, sampleId, statsChromatogram, networkType) {
+const networkCache = new Map();
+let latestRequest = 0;
+
+function loadNetworkData(jobId, networkType, networkId, fId, hops) {
+    // Fetch a view of a subnetwork and the information on its features once
+    // Large subnetworks are reduced to the neighbourhood of the feature server-side
+    const params = new URLSearchParams({ f_id: fId, hops: hops });
+    const key = `${networkType}/${networkId}?${params}`;
+    if (!networkCache.has(key)) {
+        const request = fetch(`/api/results/${jobId}/networks/${networkType}/${encodeURIComponent(networkId)}?${params}`)
+            .then(response => response.ok ? response.json() : null)
+            .catch(() => {
+                networkCache.delete(key);
+                return null;
+            });
+        networkCache.set(key, request);
+    }
+    return networkCache.get(key);
+}
+
+export function visualizeNetwork(fId, filteredSampleData, sampleData, sampleId, networkType, jobId) {
     const cos_id = sampleData.idNetCos[sampleId];
     const ms_id = sampleData.idNetMs[sampleId];
     const networkId = networkType === 'modified_cosine' ? cos_id : ms_id;
+    const hops = document.getElementById('networkHops').value;
 
     const filteredFeatureIds = filteredSampleData.featureId.filter(id => id.toString() !== fId);
 
-    if (statsNetwork[networkType]) {
-        // Check the size of the network. Label set in the dashboard_manager.py
-        if (statsNetwork[networkType][networkId] === "large_network") {
-            hideNetwork();
-            document.getElementById('legend').style.display = '';
-            document.getElementById('activeFeature').textContent =
-            "Network is too big to render on the dashboard for feature: " + fId;;
+    if (networkId === null || typeof networkId === 'object') {
+        hideNetwork();
+        document.getElementById('activeFeature').textContent = "There are no networks found for this feature.";
+        return;
+    }
+
+    const request = ++latestRequest;
+    loadNetworkData(jobId, networkType, networkId, fId, hops).then(result => {
+        if (request !== latestRequest) {
             return;
-        } else if (statsNetwork[networkType][networkId]) {
-            const networkData = statsNetwork[networkType][networkId].elements;
-            const uniqueNIds = networkData.nodes.map(node => node.data.id);
-            const uniqueFIds = getUniqueFeatureIds(statsChromatogram);
-            const featureDetails = getFeatureDetails(uniqueNIds, statsChromatogram);
+        }
+        if (result) {
+            const networkData = result.network.elements;
+            const featureDetails = result.features;
+            const uniqueFIds = Object.keys(featureDetails).filter(id => featureDetails[id].samples?.length === 1);
 
             const cy = cytoscape({
                 container: document.getElementById('cy'),
@@ -53,16 +76,26 @@ export function visualizeNetwork(fId, statsNetwork, filteredSampleData, sampleDa
             });
 
             const tooltip = createTooltip();
-            setupCyEvents(cy, tooltip, featureDetails, sampleData, fId, statsNetwork, statsChromatogram, networkType);
+            setupCyEvents(cy, tooltip, featureDetails, sampleData, networkType, jobId);
             showNetwork();
+            describeView(result, hops);
         } else {
             hideNetwork();
             document.getElementById('activeFeature').textContent = "There are no networks found for this feature.";
         }
-    } else {
-        hideNetwork();
-        document.getElementById('activeFeature').textContent = "There are no networks found for this feature.";
+    });
+}
+
+function describeView(result, hops) {
+    // Indicate if only part of a large network is shown
+    const shown = result.network.elements.nodes.length;
+    let text = '';
+    if (result.mode === 'neighbourhood') {
+        text = `Showing ${shown} of ${result.total_nodes} nodes: ${hops}-hop neighbourhood of the selected feature.`;
+    } else if (result.mode === 'top_edges') {
+        text = `Showing ${shown} of ${result.total_nodes} nodes: highest-scoring edges only.`;
     }
+    document.getElementById('networkView').textContent = text;
 }
 
 function getCyStyles(fId, filteredFeatureIds, uniqueFIds) {
@@ -87,7 +120,7 @@ function createTooltip() {
     return tooltip;
 }
 
-function setupCyEvents(cy, tooltip, featureDetails, sampleData, fId, statsNetwork, statsChromatogram, networkType) {
+function setupCyEvents(cy, tooltip, featureDetails, sampleData, networkType, jobId) {
     cy.on('mouseover', 'node', event => showNodeTooltip(event.target, featureDetails, tooltip));
     cy.on('mousemove', 'node', event => moveTooltip(event, tooltip));
     cy.on('mouseout', 'node', () => hideTooltip(tooltip));
@@ -95,13 +128,13 @@ function setupCyEvents(cy, tooltip, featureDetails, sampleData, fId, statsNetwor
     cy.on('mousemove', 'edge', event => moveTooltip(event, tooltip));
     cy.on('mouseout', 'edge', () => hideTooltip(tooltip));
 
-    cy.on('select', 'node', event => handleNodeSelect(event.target, featureDetails, sampleData, fId, statsNetwork, statsChromatogram, networkType, tooltip));
+    cy.on('select', 'node', event => handleNodeSelect(event.target, sampleData, networkType, jobId, tooltip));
     document.getElementById('cy').addEventListener('mouseleave', () => hideTooltip(tooltip));
 }
 
 function showNodeTooltip(node, featureDetails, tooltip) {
     const featureId = node.id();
-    const featureDetail = featureDetails.find(feature => feature.f_id.toString() === featureId);
+    const featureDetail = featureDetails[featureId];
 
     if (featureDetail) {
         tooltip.innerHTML = `Feature ID: ${featureId}<br>
@@ -115,8 +148,8 @@ function showEdgeTooltip(edge, featureDetails, tooltip) {
     const edgeWeight = edge.data('weight').toFixed(2);
     const sourceId = edge.data('source').toString();
     const targetId = edge.data('target').toString();
-    const sourceFeature = featureDetails.find(feature => feature.f_id.toString() === sourceId);
-    const targetFeature = featureDetails.find(feature => feature.f_id.toString() === targetId);
+    const sourceFeature = featureDetails[sourceId];
+    const targetFeature = featureDetails[targetId];
 
     if (sourceFeature && targetFeature) {
         const mzDifference = Math.abs(sourceFeature.mz - targetFeature.mz).toFixed(4);
@@ -134,7 +167,7 @@ function hideTooltip(tooltip) {
     tooltip.style.display = 'none';
 }
 
-function handleNodeSelect(node, featureDetails, sampleData, fId, statsNetwork, statsChromatogram, networkType, tooltip) {
+function handleNodeSelect(node, sampleData, networkType, jobId, tooltip) {
     hideTooltip(tooltip);
     const featureId = node.id();
     const filteredSampleData = getFeatureData(featureId, sampleData, networkType);
@@ -143,7 +176,7 @@ function handleNodeSelect(node, featureDetails, sampleData, fId, statsNetwork, s
         alert('This feature is not found in this sample.');
     } else {
         const sampleId = updateFeatureTables(featureId, sampleData, filteredSampleData);
-        visualizeNetwork(featureId, statsNetwork, filteredSampleData, sampleData, sampleId, statsChromatogram, networkType);
+        visualizeNetwork(featureId, filteredSampleData, sampleData, sampleId, networkType, jobId);
     }
 }
 
@@ -161,4 +194,5 @@ export function hideNetwork() {
     document.getElementById('activeFeature').innerHTML =
     'Select any feature in the main chromatogram to visualize its network.';
     document.getElementById('legend').style.display = 'none';
+    document.getElementById('networkView').textContent = '';
 }
\ No newline at end of file
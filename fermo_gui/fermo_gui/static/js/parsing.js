@@ -21,36 +21,80 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 */
 
-export function getSampleData(sampleName, statsChromatogram) {
-    // Extract sample data for plotting chromatogram lines
-    var activeSampleData = statsChromatogram[sampleName];
+const sampleCache = new Map();
+let tablesRequest = null;
 
-    // Get the max and min RT across all samples to use as plot range
-    const allTraceRtValues = Object.values(statsChromatogram).
-    flatMap(sample => sample.flatMap(obj => obj.trace_rt));
-    const maxRt = Math.max(...allTraceRtValues);
-    const minRt = Math.min(...allTraceRtValues);
+function fetchJson(url) {
+    return fetch(url).then(response => {
+        if (!response.ok) {
+            throw new Error(`Could not load ${url}`);
+        }
+        return response.json();
+    });
+}
+
+function loadTables(jobId) {
+    // Fetch the feature table and network summaries shared by all samples once
+    if (!tablesRequest) {
+        tablesRequest = Promise.all([
+            fetchJson(`/api/results/${jobId}/features`),
+            fetchJson(`/api/results/${jobId}/networks`)
+        ])
+            .then(([features, networkSummary]) => ({ features, networkSummary }))
+            .catch(error => {
+                tablesRequest = null;
+                throw error;
+            });
+    }
+    return tablesRequest;
+}
+
+export function loadSampleData(jobId, sampleName) {
+    // Fetch the chromatogram data of a sample once, on first selection
+    if (!sampleCache.has(sampleName)) {
+        const url = `/api/results/${jobId}/samples/${encodeURIComponent(sampleName)}`;
+        const request = Promise.all([loadTables(jobId), fetchJson(url)])
+            .then(([tables, columns]) => ({ ...tables, columns }))
+            .catch(error => {
+                sampleCache.delete(sampleName);
+                throw error;
+            });
+        sampleCache.set(sampleName, request);
+    }
+    return sampleCache.get(sampleName);
+}
+
+export function getSampleData(activeSampleData, rtRange) {
+    // Extract sample data for plotting chromatogram lines
+    // General feature information is resolved via the feature index of the sample
+    // The max and min RT across all samples are used as plot range
+    const { columns, features, networkSummary } = activeSampleData;
+    const [minRt, maxRt] = rtRange.length ? rtRange : [0, 0];
+    const lookup = key => columns.f_idx.map(idx => features[key][idx]);
+    const members = (networkType, key) => columns.f_idx.map(
+        idx => networkSummary[networkType]?.[features[key][idx]] ?? {}
+    );
 
     return {
-        traceInt: activeSampleData.map(obj => obj.trace_int),
-        traceRt: activeSampleData.map(obj => obj.trace_rt),
-        featureId: activeSampleData.map(obj => obj.f_id),
-        absInt: activeSampleData.map(obj => obj.abs_int),
-        relInt: activeSampleData.map(obj => obj.rel_int),
-        retTime: activeSampleData.map(obj => obj.rt),
-        precMz: activeSampleData.map(obj => obj.mz),
-        novScore: activeSampleData.map(obj => obj.novelty),
-        blankAs: activeSampleData.map(obj => obj.blank),
-        fNetworkCosine: activeSampleData.map(obj => obj.n_features_cosine),
-        fNetworkDeepScore: activeSampleData.map(obj => obj.n_features_deepscore),
-        idNetCos: activeSampleData.map(obj => obj.n_cos_id),
-        idNetMs: activeSampleData.map(obj => obj.n_ms2d_id),
-        samples: activeSampleData.map(obj => obj.samples),
-        fGroupData: activeSampleData.map(obj => obj.f_group),
-        fSampleData: activeSampleData.map(obj => obj.f_sample),
-        aSampleData: activeSampleData.map(obj => obj.a_sample),
-        annotations: activeSampleData.map(obj => obj.annotations),
-        retTimeAvg: activeSampleData.map(obj => obj.rt_avg),
+        traceInt: columns.trace_int,
+        traceRt: columns.trace_rt,
+        featureId: lookup('f_id'),
+        absInt: columns.abs_int,
+        relInt: columns.rel_int,
+        retTime: columns.rt,
+        precMz: lookup('mz'),
+        novScore: lookup('novelty'),
+        blankAs: lookup('blank'),
+        fNetworkCosine: members('modified_cosine', 'n_cos_id'),
+        fNetworkDeepScore: members('ms2deepscore', 'n_ms2d_id'),
+        idNetCos: lookup('n_cos_id'),
+        idNetMs: lookup('n_ms2d_id'),
+        samples: lookup('samples'),
+        fGroupData: lookup('f_group'),
+        fSampleData: lookup('f_sample'),
+        aSampleData: lookup('a_sample'),
+        annotations: lookup('annotations'),
+        retTimeAvg: lookup('rt_avg'),
         upLowRange: [minRt - minRt * 0.05, maxRt + maxRt * 0.02]
     }
 }
@@ -105,52 +149,3 @@ export function getFeatureData(featureId, sampleData, networkType) {
     }
     return filteredData;
 }
-
-export function getUniqueFeatureIds(sampleData) {
-    const fIdCounts = {};
-
-    for (const sampleName in sampleData) {
-        if (sampleData.hasOwnProperty(sampleName)) {
-            const sampleFeatures = sampleData[sampleName];
-            sampleFeatures.forEach(feature => {
-                const fId = feature.f_id;
-                if (fIdCounts[fId]) {
-                    fIdCounts[fId]++;
-                } else {
-                    fIdCounts[fId] = 1;
-                }
-            });
-        }
-    }
-
-    const uniqueFIds = [];
-    for (const fId in fIdCounts) {
-        if (fIdCounts[fId] === 1) {
-            uniqueFIds.push(fId);
-        }
-    }
-
-    return uniqueFIds;
-}
-
-export function getFeatureDetails(uniqueNIds, sampleData) {
-    const result = [];
-    const seenIds = new Set();
-
-    const uniqueNIdsStr = uniqueNIds.map(id => id.toString());
-
-    for (const sampleName in sampleData) {
-        if (sampleData.hasOwnProperty(sampleName)) {
-            const features = sampleData[sampleName];
-            for (const feature of features) {
-                const featureIdStr = feature.f_id.toString();
-                if (uniqueNIdsStr.includes(featureIdStr) && !seenIds.has(featureIdStr)) {
-                    result.push(feature);
-                    seenIds.add(featureIdStr);
-                }
-            }
-        }
-    }
-
-    return result;
-}
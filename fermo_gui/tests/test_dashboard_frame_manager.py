@@ -0,0 +1,82 @@
+"""Parity tests of the DataFrame and the dict dashboard engines
+
+Copyright (c) 2026-present Mitja Maximilian Zdouc, PhD
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from fermo_gui.analysis.dashboard_frame_manager import DashboardFrameManager
+from fermo_gui.analysis.dashboard_manager import DashboardManager
+
+UPLOAD = Path(__file__).parents[1].joinpath("fermo_gui/upload")
+EXAMPLES = ("example1", "example2", "example3")
+
+
+def session_path(example: str) -> Path:
+    """Return the session file of an example job, skipping if not shipped"""
+    path = UPLOAD.joinpath(f"{example}/results/out.fermo.session.json")
+    if not path.exists():
+        pytest.skip(f"'{example}' has no session file")
+    return path
+
+
+def dump(manager: DashboardManager) -> str:
+    """Serialize the dashboard data as sent to the browser"""
+    return json.dumps(manager.provide_data_get(), sort_keys=True)
+
+
+@pytest.mark.parametrize("example", EXAMPLES)
+def test_parity_get(example):
+    with open(session_path(example)) as infile:
+        f_sess = json.load(infile)
+    expected = DashboardManager()
+    expected.prepare_data_get(f_sess)
+    actual = DashboardFrameManager()
+    actual.prepare_data_get(f_sess)
+    assert dump(actual) == dump(expected)
+
+
+@pytest.mark.parametrize("example", EXAMPLES)
+def test_parity_stream(example):
+    path = session_path(example)
+    expected = DashboardManager()
+    expected.prepare_data_stream(path)
+    actual = DashboardFrameManager()
+    actual.prepare_data_stream(path)
+    assert dump(actual) == dump(expected)
+
+
+@pytest.mark.parametrize(
+    "f_sess",
+    [
+        {"stats": {}, "general_features": {}, "samples": {}},
+        {"general_features": {}, "samples": {"s1": {"sample_spec_features": {}}}},
+    ],
+)
+def test_parity_empty(f_sess):
+    expected = DashboardManager()
+    expected.prepare_data_get(f_sess)
+    actual = DashboardFrameManager()
+    actual.prepare_data_get(f_sess)
+    assert dump(actual) == dump(expected)
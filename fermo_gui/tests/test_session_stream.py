@@ -0,0 +1,92 @@
+"""Tests of the member-wise reading of session files
+
+Copyright (c) 2026-present Mitja Maximilian Zdouc, PhD
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import gzip
+import json
+from pathlib import Path
+
+import pytest
+
+from fermo_gui.analysis.session_stream import SessionStream
+
+SESSION = (
+    Path(__file__)
+    .parents[1]
+    .joinpath("fermo_gui/upload/example3/results/out.fermo.session.json")
+)
+DESCEND = {
+    ("stats",),
+    ("stats", "networks"),
+    ("stats", "networks", "*"),
+    ("stats", "networks", "*", "subnetworks"),
+    ("general_features",),
+    ("samples",),
+}
+
+
+def assemble(stream: SessionStream, descend: set[tuple]) -> dict:
+    """Rebuild the session file from the streamed members"""
+    session = {}
+    for path, value in stream.iter_members(descend=descend):
+        target = session
+        for key in path[:-1]:
+            target = target.setdefault(key, {})
+        target[path[-1]] = value
+    return session
+
+
+@pytest.fixture(scope="module")
+def session() -> dict:
+    with open(SESSION) as infile:
+        return json.load(infile)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 7, 24, 289, 4096])
+def test_stream_chunk_sizes(session, chunk_size):
+    stream = SessionStream(path=SESSION, chunk_size=chunk_size)
+    assert assemble(stream, DESCEND) == session
+
+
+@pytest.mark.parametrize("chunk_size", [1, 24, 289])
+def test_stream_top_level(session, chunk_size):
+    stream = SessionStream(path=SESSION, chunk_size=chunk_size)
+    assert assemble(stream, set()) == session
+
+
+def test_stream_gzip(session, tmp_path):
+    path = tmp_path.joinpath("out.fermo.session.json.gz")
+    path.write_bytes(gzip.compress(SESSION.read_bytes()))
+    stream = SessionStream(path=path, chunk_size=24)
+    assert assemble(stream, DESCEND) == session
+
+
+@pytest.mark.parametrize(
+    "text",
+    ['{"a": 1.52, "b": -0.5e-3, "c": [1e10, 2.0]}', '{"a": 12345678901234567890}'],
+)
+def test_stream_split_numbers(tmp_path, text):
+    path = tmp_path.joinpath("out.fermo.session.json")
+    path.write_text(text)
+    for chunk_size in range(1, len(text) + 1):
+        stream = SessionStream(path=path, chunk_size=chunk_size)
+        assert assemble(stream, set()) == json.loads(text)